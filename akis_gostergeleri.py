@@ -0,0 +1,379 @@
+"""
+AKIŞ (ARTIMLI) GÖSTERGELER
+==========================
+EMA, SMA, RSI, MACD ve ATR için durum tutan gösterge nesneleri. Her yeni bar
+O(1) işlemle eklenir; durum JSON'a yazılıp bir sonraki çalıştırmada kalınan
+yerden devam edilir. Alarm döngüsü her tikte 60 günlük 30 dakikalık seriyi
+baştan hesaplamak yerine sadece yeni barları işler.
+
+Tam eşitlik:
+  Güncelleme adımları pandas'ın rolling().mean() (Kahan toplamı, ardışık eş
+  değer kısayolu) ve ewm().mean() (adjust=True/False) döngülerinin birebir
+  kopyasıdır. Aynı geçmişle tohumlanan nesnenin değerleri toplu fonksiyonlarla
+  (rsi_serisi, s.ewm(...).mean(), rolling ATR) bit düzeyinde aynıdır.
+  Wilder/EWM tabanlı göstergelerde durum, toplu hesabın pencere başından
+  değil ilk tohumlamadan itibaren biriktiği için uzun vadede sabit bir
+  pencereyle yapılan hesaptan çok az ayrışabilir (daha uzun geçmiş).
+
+Kapalı / geçici bar:
+  guncelle(...) kapanmış barı kalıcı olarak işler; tahmin(...) henüz
+  kapanmamış son bar için değeri durumu değiştirmeden hesaplar.
+
+Kalıcı durum:
+  akis_takip(anahtar, df, kurucu) → .onbellek/akis/<anahtar>.json
+  Kayıtlı son kapalı bar df içinde aynı kapanışla bulunamazsa (veri
+  düzeltmesi, uzun ara) göstergeler df'den yeniden tohumlanır.
+  Kayıt/oynatma modunda disk kullanılmaz.
+
+Kullanım:
+    from akis_gostergeleri import AkisRSI, AkisMACD, akis_takip
+    rsi = AkisRSI(14, wilder=True).tohumla(kapanis)        # geçmişle başlat
+    rsi.guncelle(yeni_kapanis)                             # O(1)
+    d = akis_takip("GC=F_4h", df_4h, lambda: {"rsi": AkisRSI(14), "macd": AkisMACD()})
+    d["rsi"][-1], d["macd"][-2]                            # son (geçici) ve önceki değer
+"""
+
+import os, copy, json, math, re, threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+import kayit_oynat
+
+AKIS_DIZIN = Path(os.getenv("BIST_ONBELLEK_DIZIN", ".onbellek")) / "akis"
+GECMIS     = 8          # her göstergenin sakladığı son kapalı bar değeri sayısı
+ESLESME_TOLERANS = 1e-9 # kayıtlı son kapanışla veri arasındaki izinli göreli fark
+
+_NAN = float("nan")
+_SINIFLAR: dict = {}
+
+
+def _kayitli(sinif):
+    _SINIFLAR[sinif.__name__] = sinif
+    return sinif
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# TEMEL SINIF
+# ════════════════════════════════════════════════════════════════════════════
+
+class AkisGosterge:
+    """
+    Ortak arayüz. Alt sınıflar GIRDI (OHLC sütunları) ve _adim(*bar) tanımlar;
+    _adim durumu günceller ve o barın gösterge değerini döner.
+    """
+    GIRDI = ("Close",)
+
+    def __init__(self, gecmis: int = GECMIS):
+        self.gecmis = deque(maxlen=gecmis)
+
+    def _adim(self, *bar):
+        raise NotImplementedError
+
+    def guncelle(self, *bar):
+        """Kapanmış bir barı işler, değerini döner."""
+        deger = self._adim(*bar)
+        self.gecmis.append(deger)
+        return deger
+
+    def tahmin(self, *bar):
+        """Henüz kapanmamış bar için değer — durum değişmez."""
+        return copy.deepcopy(self)._adim(*bar)
+
+    def tohumla(self, *seriler):
+        """Geçmiş seri(ler)i bar bar işler. Çok sütunlu göstergelerde GIRDI sırasıyla."""
+        for bar in zip(*(np.asarray(s, dtype=float).tolist() for s in seriler)):
+            self.guncelle(*bar)
+        return self
+
+    # ── Serileştirme ────────────────────────────────────────────────────────
+    def durum(self) -> dict:
+        return {"sinif": type(self).__name__, "alanlar": {k: _kodla(v) for k, v in vars(self).items()}}
+
+    @staticmethod
+    def durumdan(d: dict) -> "AkisGosterge":
+        nesne = _SINIFLAR[d["sinif"]].__new__(_SINIFLAR[d["sinif"]])
+        for k, v in d["alanlar"].items():
+            setattr(nesne, k, _coz(v))
+        return nesne
+
+    def imza(self) -> str:
+        """Parametre imzası — kayıtlı durumun bu göstergeye ait olup olmadığını anlamak için."""
+        return type(self).__name__ + repr(sorted(
+            (k, v.imza() if isinstance(v, AkisGosterge) else v)
+            for k, v in vars(self).items() if k in self._PARAMETRELER))
+
+    _PARAMETRELER: tuple = ()
+
+
+def _kodla(v):
+    if isinstance(v, AkisGosterge):
+        return {"__gosterge__": v.durum()}
+    if isinstance(v, deque):
+        return {"__deque__": [_kodla(x) for x in v], "maxlen": v.maxlen}
+    if isinstance(v, tuple):
+        return {"__tuple__": [_kodla(x) for x in v]}
+    if isinstance(v, float) and not math.isfinite(v):
+        return {"__float__": repr(v)}
+    return v
+
+def _coz(v):
+    if isinstance(v, dict):
+        if "__gosterge__" in v:
+            return AkisGosterge.durumdan(v["__gosterge__"])
+        if "__deque__" in v:
+            return deque((_coz(x) for x in v["__deque__"]), maxlen=v["maxlen"])
+        if "__tuple__" in v:
+            return tuple(_coz(x) for x in v["__tuple__"])
+        if "__float__" in v:
+            return float(v["__float__"])
+    return v
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ÇEKİRDEKLER — pandas döngülerinin kopyası
+# ════════════════════════════════════════════════════════════════════════════
+
+@_kayitli
+class AkisEMA(AkisGosterge):
+    """s.ewm(span=.. | alpha=.., adjust=..).mean() — ignore_na=False, min_periods=0."""
+    _PARAMETRELER = ("span", "alpha", "adjust")
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None,
+                 adjust: bool = False, gecmis: int = GECMIS):
+        super().__init__(gecmis)
+        self.span = span; self.alpha = alpha; self.adjust = adjust
+        com = (span - 1) / 2 if span is not None else 1 / alpha - 1
+        self._a = 1. / (1. + com)          # pandas alpha'yı com üzerinden hesaplar
+        self.deger = _NAN
+        self.agirlik = 1.
+
+    def _adim(self, x):
+        x = float(x)
+        gozlem = x == x
+        if self.deger == self.deger:
+            self.agirlik *= 1. - self._a
+            if gozlem:
+                yeni = 1. if self.adjust else self._a
+                if self.deger != x:
+                    if not self.adjust and self._a == .5:
+                        # pandas com=1, adjust=False: boşluk sonrası eski ağırlık (1-a)^(k+1)
+                        self.deger = self.agirlik * self.deger + (1. - self.agirlik) * x
+                    else:
+                        self.deger = (self.agirlik * self.deger + yeni * x) / (self.agirlik + yeni)
+                if self.adjust:
+                    self.agirlik += yeni
+                else:
+                    self.agirlik = 1.
+        elif gozlem:
+            self.deger = x
+        return self.deger
+
+
+@_kayitli
+class AkisSMA(AkisGosterge):
+    """s.rolling(w).mean() — min_periods=w."""
+    _PARAMETRELER = ("w",)
+
+    def __init__(self, w: int, gecmis: int = GECMIS):
+        super().__init__(gecmis)
+        self.w = w
+        self.pencere = deque()
+        self._sifirla()
+
+    def _sifirla(self):
+        self.nobs = 0; self.toplam = 0.; self.negatif = 0
+        self.tel_ekle = 0.; self.tel_cikar = 0.
+        self.ardisik = 0; self.onceki = _NAN
+
+    def _ekle(self, x):
+        if x == x:
+            self.nobs += 1
+            y = x - self.tel_ekle
+            t = self.toplam + y
+            self.tel_ekle = t - self.toplam - y
+            self.toplam = t
+            if math.copysign(1., x) < 0: self.negatif += 1
+            if x == self.onceki: self.ardisik += 1
+            else: self.ardisik = 1
+            self.onceki = x
+
+    def _cikar(self, x):
+        if x == x:
+            self.nobs -= 1
+            y = -x - self.tel_cikar
+            t = self.toplam + y
+            self.tel_cikar = t - self.toplam - y
+            self.toplam = t
+            if math.copysign(1., x) < 0: self.negatif -= 1
+
+    def _adim(self, x):
+        x = float(x)
+        if self.w == 1:            # pandas: ardışık pencereler örtüşmüyorsa sıfırdan kurar
+            self.pencere.clear(); self._sifirla()
+            self.onceki = x
+        elif len(self.pencere) == self.w:
+            self._cikar(self.pencere.popleft())
+        elif not self.pencere:
+            self.onceki = x
+        self.pencere.append(x)
+        self._ekle(x)
+        if self.nobs >= self.w and self.nobs > 0:
+            sonuc = self.toplam / self.nobs
+            if self.ardisik >= self.nobs: sonuc = self.onceki
+            elif self.negatif == 0 and sonuc < 0: sonuc = 0.
+            elif self.negatif == self.nobs and sonuc > 0: sonuc = 0.
+            return sonuc
+        return _NAN
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# GÖSTERGELER
+# ════════════════════════════════════════════════════════════════════════════
+
+@_kayitli
+class AkisRSI(AkisGosterge):
+    """indikatorler.rsi_serisi(s, p, wilder, sifir_yerine) ile aynı."""
+    _PARAMETRELER = ("p", "wilder", "sifir_yerine")
+
+    def __init__(self, p: int = 14, wilder: bool = False,
+                 sifir_yerine: Optional[float] = None, gecmis: int = GECMIS):
+        super().__init__(gecmis)
+        self.p = p; self.wilder = wilder; self.sifir_yerine = sifir_yerine
+        yeni = (lambda: AkisEMA(alpha=1/p, adjust=False, gecmis=0)) if wilder else (lambda: AkisSMA(p, gecmis=0))
+        self.kazanc = yeni(); self.kayip = yeni()
+        self.onceki = _NAN
+
+    def _adim(self, c):
+        c = float(c)
+        d = c - self.onceki
+        self.onceki = c
+        g = self.kazanc._adim(d if not d < 0 else 0.)            # clip(lower=0)
+        k = self.kayip._adim(-(d if not d > 0 else 0.))          # -clip(upper=0)
+        if self.sifir_yerine is not None and k == 0:
+            k = self.sifir_yerine
+        with np.errstate(all="ignore"):
+            return float(100 - 100 / (1 + np.float64(g) / np.float64(k)))
+
+
+@_kayitli
+class AkisMACD(AkisGosterge):
+    """(macd, sinyal, histogram) — ema(hizli) - ema(yavas), sinyal = ema(macd)."""
+    _PARAMETRELER = ("hizli", "yavas", "sinyal", "adjust")
+
+    def __init__(self, hizli: int = 12, yavas: int = 26, sinyal: int = 9,
+                 adjust: bool = False, gecmis: int = GECMIS):
+        super().__init__(gecmis)
+        self.hizli = hizli; self.yavas = yavas; self.sinyal = sinyal; self.adjust = adjust
+        self.ema_h = AkisEMA(hizli, adjust=adjust, gecmis=0)
+        self.ema_y = AkisEMA(yavas, adjust=adjust, gecmis=0)
+        self.ema_s = AkisEMA(sinyal, adjust=adjust, gecmis=0)
+
+    def _adim(self, c):
+        m = self.ema_h._adim(c) - self.ema_y._adim(c)
+        s = self.ema_s._adim(m)
+        return (m, s, m - s)
+
+
+@_kayitli
+class AkisATR(AkisGosterge):
+    """gercek_aralik(h, l, c).rolling(p).mean()"""
+    GIRDI = ("High", "Low", "Close")
+    _PARAMETRELER = ("p",)
+
+    def __init__(self, p: int = 14, gecmis: int = GECMIS):
+        super().__init__(gecmis)
+        self.p = p
+        self.ort = AkisSMA(p, gecmis=0)
+        self.onceki = _NAN
+
+    def _adim(self, h, l, c):
+        h, l, c = float(h), float(l), float(c)
+        tr = float(np.fmax(np.fmax(h - l, abs(h - self.onceki)), abs(l - self.onceki)))
+        self.onceki = c
+        return self.ort._adim(tr)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# KALICI TAKİP
+# ════════════════════════════════════════════════════════════════════════════
+
+_KILIT = threading.Lock()
+
+def _yol(anahtar: str) -> Path:
+    return AKIS_DIZIN / (re.sub(r"[^A-Za-z0-9_.=-]", "_", anahtar) + ".json")
+
+def _oku(anahtar: str) -> Optional[dict]:
+    if kayit_oynat.aktif():
+        return None
+    try:
+        return json.loads(_yol(anahtar).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+def _yaz(anahtar: str, kayit: dict):
+    if kayit_oynat.aktif():
+        return
+    yol = _yol(anahtar)
+    try:
+        yol.parent.mkdir(parents=True, exist_ok=True)
+        gecici = yol.with_suffix(f".{threading.get_ident()}.tmp")
+        gecici.write_text(json.dumps(kayit), encoding="utf-8")
+        os.replace(gecici, yol)
+    except Exception as e:
+        print(f"  Akış durumu yazılamadı ({anahtar}): {e}")
+
+def _devam_konumu(kayit: Optional[dict], df: pd.DataFrame, imzalar: dict) -> Optional[int]:
+    """Kayıtlı son kapalı barın df içindeki konumu; devam edilemiyorsa None."""
+    if not kayit or kayit.get("imzalar") != imzalar:
+        return None
+    if kayit.get("tz") != (df.index.tz is not None):
+        return None
+    zamanlar = df.index.asi8
+    konum = int(np.searchsorted(zamanlar, kayit["son_ns"]))
+    if konum >= len(df) or zamanlar[konum] != kayit["son_ns"]:
+        return None
+    kapanis = float(df["Close"].iloc[konum])
+    if abs(kapanis - kayit["son_kapanis"]) > ESLESME_TOLERANS * abs(kayit["son_kapanis"]):
+        return None
+    return konum
+
+def akis_takip(anahtar: str, df: pd.DataFrame, kurucu: Callable[[], dict],
+               gecici_son: bool = True) -> dict:
+    """
+    df'nin kapalı barlarını (gecici_son=True ise son bar hariç) kayıtlı duruma
+    ekler, durumu kaydeder ve her gösterge için son değerleri döner.
+    Dönüş: {ad: [... , önceki kapalı bar, son bar]} — en fazla GECMIS+1 eleman;
+    liste[-k], toplu serideki seri.iloc[-k] karşılığıdır.
+    """
+    with _KILIT:
+        gostergeler = kurucu()
+        imzalar = {ad: g.imza() for ad, g in gostergeler.items()}
+        kapali = df.iloc[:-1] if gecici_son else df
+        kayit = _oku(anahtar)
+        konum = _devam_konumu(kayit, kapali, imzalar)
+        if konum is None:
+            yeni = kapali
+        else:
+            gostergeler = {ad: AkisGosterge.durumdan(d) for ad, d in kayit["gostergeler"].items()}
+            yeni = kapali.iloc[konum + 1:]
+        for ad, g in gostergeler.items():
+            g.tohumla(*(yeni[s] for s in g.GIRDI))
+        if len(kapali):
+            _yaz(anahtar, {
+                "son_ns": int(kapali.index.asi8[-1]),
+                "tz": kapali.index.tz is not None,
+                "son_kapanis": float(kapali["Close"].iloc[-1]),
+                "imzalar": imzalar,
+                "gostergeler": {ad: g.durum() for ad, g in gostergeler.items()},
+            })
+        sonuc = {}
+        for ad, g in gostergeler.items():
+            degerler = list(g.gecmis)
+            if gecici_son and len(df):
+                degerler.append(g.tahmin(*(float(df[s].iloc[-1]) for s in g.GIRDI)))
+            sonuc[ad] = degerler
+        return sonuc
@@ -26,16 +26,22 @@ from typing import Optional, Tuple
 warnings.filterwarnings("ignore")
 
 try:
-    import yfinance as yf
     import pandas as pd
     import numpy as np
-    import requests
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError as e:
     print(f"Eksik: {e}\npip install yfinance pandas numpy requests python-dotenv")
     sys.exit(1)
 
+from fiyat_onbellek import fiyat_gecmisi
+import http_istemci
+import kayit_oynat
+from veri_saglayici import StooqSaglayici, saglayici
+from indikatorler import rsi_serisi
+from akis_gostergeleri import AkisRSI, AkisMACD, akis_takip
+from haber_toplayici import kaynaklari_getir
+
 try:
     from groq import Groq
     GROQ_AKTIF = True
@@ -85,20 +91,17 @@ ENSTRUMANLAR = {
 
 def _stooq_gunluk(sembol: str, gun: int = 60) -> Optional[pd.DataFrame]:
     """Stooq.com'dan temiz günlük spot veri çek (rollover yok)."""
-    from io import StringIO
     try:
-        url = f"https://stooq.com/q/d/l/?s={sembol}&i=d"
-        r = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        if r.status_code != 200 or "Date" not in r.text:
+        stooq = saglayici("stooq") or StooqSaglayici()
+        df = stooq.gecmis(sembol, interval="1d")
+        if df is None:
             return None
-        df = pd.read_csv(StringIO(r.text))
-        df["Date"] = pd.to_datetime(df["Date"])
-        df = df.sort_values("Date").reset_index(drop=True)
+        df = df.tz_localize(None)
 
         # Bugünün kısmi barını çıkar — sadece dün ve öncesi tam kapanışlar
         bugun = pd.Timestamp.now().normalize()
-        df = df[df["Date"] < bugun].tail(gun).reset_index(drop=True)
-        df.index = pd.DatetimeIndex(df["Date"])
+        df = df[df.index < bugun].tail(gun)
+        df.insert(0, "Date", df.index)
         return df
     except:
         return None
@@ -108,19 +111,15 @@ def _stooq_gunluk(sembol: str, gun: int = 60) -> Optional[pd.DataFrame]:
 def _indir(symbol: str, interval: str = "1h", period: str = "1mo",
            retries: int = 4) -> Optional[pd.DataFrame]:
     for _ in range(retries):
-        try:
-            df = yf.Ticker(symbol).history(interval=interval, period=period,
-                                           auto_adjust=True)
-            if not df.empty:
-                return df
-        except:
-            pass
+        df = fiyat_gecmisi(symbol, period=period, interval=interval, auto_adjust=True)
+        if df is not None:
+            return df
         time.sleep(1.5)
     return None
 
 def _spot_fiyat(url: str) -> Optional[float]:
     try:
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=6)
+        r = http_istemci.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=6)
         if r.status_code == 200:
             return float(r.json().get("price", 0)) or None
     except:
@@ -138,7 +137,7 @@ def _telegram(mesaj: str) -> bool:
         print("⚠️  Telegram token eksik\n" + mesaj)
         return False
     try:
-        r = requests.post(
+        r = http_istemci.post(
             f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
             json={"chat_id": TELEGRAM_CHAT_ID, "text": mesaj, "parse_mode": "HTML"},
             timeout=15,
@@ -223,16 +222,21 @@ def s2_hacim_artisi(df_futures_gun: pd.DataFrame) -> Tuple[bool, str]:
     return sinyal, detay
 
 
+def _rsi_seri(seri: pd.Series, period: int = 14) -> pd.Series:
+    """Wilder RSI — tüm seri."""
+    return rsi_serisi(seri, period, wilder=True, sifir_yerine=1e-9)
+
 def _rsi(seri: pd.Series, period: int = 14) -> float:
     """RSI hesapla, son değeri döndür."""
-    delta = seri.diff()
-    gain  = delta.clip(lower=0)
-    loss  = -delta.clip(upper=0)
-    avg_g = gain.ewm(alpha=1/period, adjust=False).mean()
-    avg_l = loss.ewm(alpha=1/period, adjust=False).mean()
-    rs    = avg_g / avg_l.replace(0, 1e-9)
-    rsi_s = 100 - (100 / (1 + rs))
-    return float(rsi_s.iloc[-1])
+    return float(_rsi_seri(seri, period).iloc[-1])
+
+def _akis_rsi(sembol: str, aralik: str, kapanis: pd.Series, period: int = 14) -> list:
+    """
+    Wilder RSI'ın son değerleri (liste[-k] == _rsi_seri(kapanis).iloc[-k]).
+    Durum .onbellek/akis altında saklanır; her tikte sadece yeni barlar işlenir.
+    """
+    return akis_takip(f"{sembol}_{aralik}_rsi", kapanis.to_frame("Close"),
+                      lambda: {"rsi": AkisRSI(period, wilder=True, sifir_yerine=1e-9)})["rsi"]
 
 
 def s3_rsi_cift_zaman(sembol: str) -> Tuple[bool, str]:
@@ -248,8 +252,9 @@ def s3_rsi_cift_zaman(sembol: str) -> Tuple[bool, str]:
     if df_1h is None or len(df_1h) < 20:
         return False, "1H veri yetersiz"
     k_1h = pd.to_numeric(df_1h["Close"], errors="coerce").dropna()
-    rsi_1h_son = _rsi(k_1h)
-    rsi_1h_dun = _rsi(k_1h.iloc[:-3])
+    rsi_1h     = _akis_rsi(sembol, "1h", k_1h)
+    rsi_1h_son = float(rsi_1h[-1])
+    rsi_1h_dun = float(rsi_1h[-4])
 
     # 4H veri — 30 dakikadan OHLCV resample (daha doğru)
     df_30m = _indir(sembol, interval="30m", period="60d")
@@ -265,8 +270,9 @@ def s3_rsi_cift_zaman(sembol: str) -> Tuple[bool, str]:
     if len(df_4h) < 10:
         return False, "4H resample yetersiz"
     k_4h = pd.to_numeric(df_4h["Close"], errors="coerce").dropna()
-    rsi_4h_son = _rsi(k_4h)
-    rsi_4h_dun = _rsi(k_4h.iloc[:-2])
+    rsi_4h     = _akis_rsi(sembol, "4h", k_4h)
+    rsi_4h_son = float(rsi_4h[-1])
+    rsi_4h_dun = float(rsi_4h[-3])
 
     # Trend takibi: her ikisi >45 ve yukseliyor (50 beklemek gec olabilir)
     # Guclu sinyal: ikisi de >50
@@ -274,7 +280,7 @@ def s3_rsi_cift_zaman(sembol: str) -> Tuple[bool, str]:
     trend_1h_guclu = rsi_1h_son > 50 and rsi_1h_son > rsi_1h_dun
     trend_4h_guclu = rsi_4h_son > 50 and rsi_4h_son > rsi_4h_dun
 
-    rsi_1h_3bar = _rsi(k_1h.iloc[:-5]) if len(k_1h) > 5 else rsi_1h_dun
+    rsi_1h_3bar = float(rsi_1h[-6]) if len(k_1h) > 5 else rsi_1h_dun
     trend_1h_erken = rsi_1h_son > 45 and rsi_1h_son > rsi_1h_dun > rsi_1h_3bar
     trend_4h_erken = rsi_4h_son > 45 and rsi_4h_son > rsi_4h_dun
 
@@ -297,24 +303,29 @@ def s3_rsi_cift_zaman(sembol: str) -> Tuple[bool, str]:
     return sinyal, detay
 
 
-def s4_macd_kesimi(df_1h: pd.DataFrame) -> Tuple[bool, str]:
+def s4_macd_kesimi(df_1h: pd.DataFrame, sembol: Optional[str] = None) -> Tuple[bool, str]:
     """
     S4: 1H MACD, sinyal çizgisini yukarı kesiyor mu?
     Hem kesim hem histogram pozitife dönüş aranır.
+    sembol verilirse MACD durumu akış göstergesinde saklanır (sadece yeni barlar).
     """
     if df_1h is None or len(df_1h) < 35:
         return False, "1H veri yetersiz"
 
     kapanis = pd.to_numeric(df_1h["Close"], errors="coerce").dropna()
-    macd_h, sinyal, histo = _macd(kapanis)
+    if sembol:
+        macd_h, sinyal, histo = zip(*akis_takip(f"{sembol}_4h_macd", kapanis.to_frame("Close"),
+                                                lambda: {"macd": AkisMACD()})["macd"])
+    else:
+        macd_h, sinyal, histo = (x.tolist() for x in _macd(kapanis))
 
-    histo_son     = float(histo.iloc[-1])
-    histo_dun     = float(histo.iloc[-2])
-    histo_evvelsi = float(histo.iloc[-3])
-    histo_3oncesi = float(histo.iloc[-4])
+    histo_son     = float(histo[-1])
+    histo_dun     = float(histo[-2])
+    histo_evvelsi = float(histo[-3])
+    histo_3oncesi = float(histo[-4])
 
-    macd_son   = float(macd_h.iloc[-1])
-    sinyal_son = float(sinyal.iloc[-1])
+    macd_son   = float(macd_h[-1])
+    sinyal_son = float(sinyal[-1])
 
     # Guclu kesim: negatiften pozitife dondu
     kesim = histo_dun <= 0 and histo_son > 0
@@ -338,7 +349,7 @@ def s4_macd_kesimi(df_1h: pd.DataFrame) -> Tuple[bool, str]:
 def _dxy_cek() -> Optional[float]:
     """DXY değerini Yahoo Finance API'den direkt çek (DX-Y.NYB)."""
     try:
-        r = requests.get(
+        r = http_istemci.get(
             "https://query1.finance.yahoo.com/v8/finance/chart/DX-Y.NYB?interval=1d&range=5d",
             headers={"User-Agent": "Mozilla/5.0"},
             timeout=8
@@ -351,7 +362,7 @@ def _dxy_cek() -> Optional[float]:
     except:
         pass
     try:
-        r = requests.get("https://open.er-api.com/v6/latest/USD", timeout=6)
+        r = http_istemci.get("https://open.er-api.com/v6/latest/USD", timeout=6)
         if r.status_code == 200:
             eur = r.json().get("rates", {}).get("EUR", 0)
             if eur:
@@ -364,7 +375,7 @@ def _dxy_cek() -> Optional[float]:
 def _dxy_gecmis_cek(gun: int = 30) -> Optional[pd.DataFrame]:
     """DXY geçmiş veriyi Yahoo Finance API'den çek."""
     try:
-        r = requests.get(
+        r = http_istemci.get(
             "https://query1.finance.yahoo.com/v8/finance/chart/DX-Y.NYB?interval=1d&range=3mo",
             headers={"User-Agent": "Mozilla/5.0"},
             timeout=8
@@ -547,7 +558,7 @@ def enstruman_analiz(isim: str, cfg: dict) -> dict:
     s1, d1 = s1_momentum_kirilmasi(df_stooq, s1_ref)
     s2, d2 = s2_hacim_artisi(df_gun)
     s3, d3 = s3_rsi_cift_zaman(futures_sym)
-    s4, d4 = s4_macd_kesimi(df_4h_futures)
+    s4, d4 = s4_macd_kesimi(df_4h_futures, futures_sym)
     s5, d5 = s5_makro_dolar(df_gun)
 
     ACIKLAMALAR = {
@@ -708,7 +719,7 @@ def makro_yorum_uret(sonuclar: list) -> str:
     yorumlar = []
     try:
         # Petrol fiyatı
-        brent = yf.Ticker("BZ=F").history(period="5d", interval="1d")
+        brent = fiyat_gecmisi("BZ=F", period="5d", interval="1d")
         if brent is not None and len(brent) >= 2:
             brent_son  = float(brent["Close"].iloc[-1])
             brent_prev = float(brent["Close"].iloc[-2])
@@ -742,7 +753,7 @@ def makro_yorum_uret(sonuclar: list) -> str:
 
     try:
         # VIX
-        vix_data = yf.Ticker("^VIX").history(period="3d", interval="1d")
+        vix_data = fiyat_gecmisi("^VIX", period="3d", interval="1d")
         if vix_data is not None and len(vix_data) >= 1:
             vix = float(vix_data["Close"].iloc[-1])
             if vix > 25:
@@ -917,24 +928,46 @@ def telegram_mesaj_olustur(sonuclar: list, tarih: str,
     return mesaj
 
 
-def ekonomik_takvim_cek() -> list:
+HABER_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Investing.com ekonomik takvim RSS
+TAKVIM_KAYNAKLAR = [
+    "https://tr.investing.com/rss/economic_calendar.rss",
+    "https://www.investing.com/rss/economic_calendar.rss",
+]
+
+METAL_HABER_KAYNAKLAR = [
+    {"isim": "AA Ekonomi",    "url": "https://www.aa.com.tr/tr/rss/default?cat=ekonomi"},
+    {"isim": "Reuters",       "url": "https://feeds.reuters.com/reuters/businessNews"},
+    {"isim": "Borsa Gündem",  "url": "https://www.borsagundem.com/feed"},
+    {"isim": "Para Analiz",   "url": "https://www.paraanaliz.com/feed/"},
+    {"isim": "Ekonomim",      "url": "https://www.ekonomim.com/rss/son-dakika-haberleri.xml"},
+]
+
+
+def haber_kaynaklarini_getir() -> dict:
+    """Takvim + metal haber RSS'lerini tek seferde paralel ister (ortak son süre)."""
+    urller = TAKVIM_KAYNAKLAR + [k["url"] for k in METAL_HABER_KAYNAKLAR]
+    return kaynaklari_getir([(u, HABER_HEADERS) for u in urller])
+
+
+def ekonomik_takvim_cek(yanitlar: Optional[dict] = None) -> list:
     """
     Kritik ekonomik olayları çek.
     Fed, ECB, TCMB toplantıları + CPI, NFP, PCE gibi veriler.
     """
     olaylar = []
     bugun = datetime.now()
+    if yanitlar is None:
+        yanitlar = kaynaklari_getir([(u, HABER_HEADERS) for u in TAKVIM_KAYNAKLAR])
 
-    # Investing.com ekonomik takvim RSS
-    takvim_kaynaklar = [
-        "https://tr.investing.com/rss/economic_calendar.rss",
-        "https://www.investing.com/rss/economic_calendar.rss",
-    ]
-
-    for url in takvim_kaynaklar:
+    for url in TAKVIM_KAYNAKLAR:
         try:
             import feedparser
-            feed = feedparser.parse(url)
+            r = yanitlar.get(url)
+            if r is None:
+                continue
+            feed = feedparser.parse(r.content)
             for e in feed.entries[:20]:
                 baslik = e.get("title", "")
                 ozet   = e.get("summary", "")
@@ -980,16 +1013,11 @@ def ekonomik_takvim_cek() -> list:
     return olaylar
 
 
-def metal_haber_cek() -> list:
+def metal_haber_cek(yanitlar: Optional[dict] = None) -> list:
     """Metal piyasaları için özel haber kaynakları."""
     haberler = []
-    kaynaklar = [
-        {"isim": "AA Ekonomi",    "url": "https://www.aa.com.tr/tr/rss/default?cat=ekonomi"},
-        {"isim": "Reuters",       "url": "https://feeds.reuters.com/reuters/businessNews"},
-        {"isim": "Borsa Gündem",  "url": "https://www.borsagundem.com/feed"},
-        {"isim": "Para Analiz",   "url": "https://www.paraanaliz.com/feed/"},
-        {"isim": "Ekonomim",      "url": "https://www.ekonomim.com/rss/son-dakika-haberleri.xml"},
-    ]
+    if yanitlar is None:
+        yanitlar = kaynaklari_getir([(k["url"], HABER_HEADERS) for k in METAL_HABER_KAYNAKLAR])
 
     METAL_ANAHTAR = [
         "ALTIN", "GÜMÜŞ", "GOLD", "SILVER", "METAL", "EMTIA",
@@ -1000,10 +1028,13 @@ def metal_haber_cek() -> list:
         "ÇİN", "CHINA", "TALEP", "DEMAND",
     ]
 
-    for kaynak in kaynaklar:
+    for kaynak in METAL_HABER_KAYNAKLAR:
         try:
             import feedparser
-            feed = feedparser.parse(kaynak["url"])
+            r = yanitlar.get(kaynak["url"])
+            if r is None:
+                continue
+            feed = feedparser.parse(r.content)
             for e in feed.entries[:20]:
                 baslik = e.get("title", "")
                 ozet   = e.get("summary", "")[:150]
@@ -1065,7 +1096,7 @@ def ai_tahmin_uret(sonuclar: list, takvim: list, haberler: list) -> str:
             model_adi = "llama-3.3-70b-versatile"
         except:
             pass
-    if client is None:
+    if client is None and not kayit_oynat.oynatiliyor():
         return ""
 
     # ── Veri hazırla ────────────────────────────────────────────
@@ -1178,17 +1209,22 @@ GÜNCEL HABERLER:
 
 Yukarıdaki verilere dayanarak her iki metal için derinlemesine analiz yap."""
 
-    try:
-        r = client.chat.completions.create(
-            model=model_adi,
+    # Prompt tarih içerdiği için kaset anahtarı çağrı sırasıdır (yedek LLM aynı anahtarı kullanır)
+    llm_anahtar = kayit_oynat.sirali_anahtar("llm")
+
+    def _tamamla(cl, model):
+        return kayit_oynat.kayitli("llm", llm_anahtar, lambda: cl.chat.completions.create(
+            model=model,
             messages=[
                 {"role": "system", "content": sistem},
                 {"role": "user",   "content": kullanici_mesaji}
             ],
             temperature=0.4,
             max_tokens=1200,
-        )
-        return r.choices[0].message.content.strip()
+        ).choices[0].message.content.strip())
+
+    try:
+        return _tamamla(client, model_adi)
 
     except Exception as e:
         hata = str(e)
@@ -1210,13 +1246,7 @@ Yukarıdaki verilere dayanarak her iki metal için derinlemesine analiz yap."""
                 except: pass
             if diger_client:
                 try:
-                    r2 = diger_client.chat.completions.create(
-                        model=diger_model,
-                        messages=[{"role":"system","content":sistem},
-                                  {"role":"user","content":kullanici_mesaji}],
-                        temperature=0.4, max_tokens=1200,
-                    )
-                    return r2.choices[0].message.content.strip()
+                    return _tamamla(diger_client, diger_model)
                 except Exception as e2:
                     print(f"  Yedek LLM hata: {e2}")
         print(f"  AI analiz hatası: {hata[:100]}")
@@ -1230,10 +1260,10 @@ def alarm_calistir(ai_aktif: bool = False):
     print(f"{'='*55}")
 
     # Ekonomik takvim + metal haberleri
-    print("  📅 Ekonomik takvim çekiliyor...")
-    takvim  = ekonomik_takvim_cek()
-    print(f"  📰 Metal haberleri çekiliyor...")
-    haberler = metal_haber_cek()
+    print("  📅 Ekonomik takvim + 📰 metal haberleri çekiliyor...")
+    yanitlar = haber_kaynaklarini_getir()
+    takvim   = ekonomik_takvim_cek(yanitlar)
+    haberler = metal_haber_cek(yanitlar)
 
     kritik_takvim = [t for t in takvim if t.get("oncelik") == "KRITIK"]
     if kritik_takvim:
@@ -1279,5 +1309,6 @@ def alarm_calistir(ai_aktif: bool = False):
 
 if __name__ == "__main__":
     import sys
+    kayit_oynat.argv_isle()
     ai_aktif = "--ai" in sys.argv
     alarm_calistir(ai_aktif=ai_aktif)
@@ -26,14 +26,16 @@ Kurulum:
 Kullanım:
     .env → GROQ_API_KEY=gsk_...
     python bist_agents.py
+    python bist_agents.py --kural-gecmisi    # günlük kural puanı geçmişi + KP≥70 ileri getiri
 """
 
-import os, json, time, requests, feedparser, warnings
+import os, sys, json, time, feedparser, warnings, threading
 import numpy as np
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 warnings.filterwarnings("ignore")
 
@@ -52,6 +54,22 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import print as rprint
 from dotenv import load_dotenv
 
+from fiyat_onbellek import fiyat_gecmisi, toplu_fiyat_gecmisi, donem_kes
+from temel_onbellek import temel_bilgi, temel_isit, temel_istatistik
+from haber_toplayici import kaynaklari_getir
+import kayit_oynat
+from veri_saglayici import gecikme_raporu
+from kural_motoru import (tablo_olustur as kural_tablosu_olustur, puanla as kural_puanla,
+                          aciklamalar as kural_aciklamalari)
+from kural_derleyici import plan_yukle_yedekli
+from kesit_matrisi import PiyasaMatrisi
+from hedef_motoru import girdi_tablosu as hedef_girdi_tablosu, hedefleri_hesapla, hedef_sonucu, holding_mi
+import kural_gecmisi
+from indikatorler import (rsi_serisi, parabolic_sar_serisi, pivot_noktalari, destek_direnc_bolgeleri,
+                          gercek_aralik, obv_serisi, sma_bankasi, uc_bankasi, kesisimler,
+                          mum_formasyon_taramasi, formasyon_istatistikleri,
+                          iraksama_taramasi, iraksama_durumu)
+
 load_dotenv()
 console = Console()
 
@@ -61,8 +79,8 @@ console = Console()
 
 def bist100_tickers_cek() -> list:
     try:
-        xu100 = yf.Ticker("XU100.IS")
-        components = xu100.components
+        components = kayit_oynat.kayitli("fiyat", ("XU100.IS", "components"),
+                                         lambda: yf.Ticker("XU100.IS").components)
         if components is not None and len(components) > 50:
             tickers = [t if t.endswith(".IS") else t + ".IS" for t in components.index.tolist()]
             print(f"  XU100 bileşenleri dinamik çekildi: {len(tickers)} hisse")
@@ -101,11 +119,16 @@ PORTFOY_BUYUKLUGU   = 100_000
 MODEL               = "llama-3.3-70b-versatile"
 PERIOD              = "6mo"
 FILTRE_LIMIT        = 35
+DERIN_PARALEL       = int(os.getenv("BIST_DERIN_PARALEL", "6"))
 MANIPULASYON_ESIK   = 65
 BALON_ESIK          = 65
+BALON_KALITE_CEZA   = 40       # balon şüphesinde kalite skorundan düşülür
+ELINEN_GOSTER       = 10       # Agent 1'e elenme sebebiyle gönderilen hisse sayısı
 MAX_SEKTOR_AGIRLIK  = 30
 MAX_KOR_AGIRLIK     = 12
 RISKSIZ_FAIZ        = 0.42
+MUM_UFUK            = 5        # mum formasyonu geçmiş istatistiğinde ileri getiri (bar)
+KURAL_GECMISI_YIL   = int(os.getenv("BIST_KURAL_GECMISI_YIL", "5"))   # 0 → sabah güncellemesi kapalı
 PORTFOY_KAYIT_DOSYA = "portfoy_pozisyonlar.json"
 
 RISK_MODU = "dengeli"   # "muhafazakar" | "dengeli" | "agresif"
@@ -138,7 +161,7 @@ ZORUNLU_GECIS = [
     "BANVT","PENGD","GESAN",
 ]
 
-HOLDING_SEKTORLER = {"holding", "conglomerates", "diversified"}
+KURAL_PLANI = plan_yukle_yedekli()   # kurallar.json — kural/filtre puanları (kural_derleyici)
 SAVUNMA_SEKTORLER = {"defense", "aerospace & defense", "industrials"}
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
@@ -167,16 +190,6 @@ SEKTOR_GRUPLAR = {
     "telekom":    {"TCELL","TTKOM"},
 }
 
-# Sektör bazlı F/K hedefleri — hedef_fiyat_hesapla() tarafından kullanılır
-SEKTOR_FK_HEDEF = {
-    "Banking": 8, "Financial Services": 10, "Insurance": 9,
-    "Energy": 10, "Utilities": 12, "Basic Materials": 8,
-    "Technology": 25, "Communication Services": 18,
-    "Consumer Defensive": 14, "Consumer Cyclical": 12,
-    "Industrials": 12, "Real Estate": 15,
-    "Healthcare": 20, "default": 12,
-}
-
 # ════════════════════════════════════════════════════════════════
 # YARDIMCI FONKSİYONLAR
 # ════════════════════════════════════════════════════════════════
@@ -189,12 +202,16 @@ def _fmt(v, fmt="{:.2f}"):
     try: return fmt.format(float(v)) if v is not None else "N/A"
     except: return "N/A"
 
+def _ira(durum: str) -> str:
+    """Iraksama durumunun kısa etiketi: POZ / NEG / PGZ / NGZ (gizli) / YOK."""
+    return {"POZ_GIZLI": "PGZ", "NEG_GIZLI": "NGZ"}.get(durum, str(durum)[:3])
+
 def _to_float(val):
     try: return float(val) if val is not None else None
     except: return None
 
 def _is_holding(sektor: str) -> bool:
-    return sektor.lower() in HOLDING_SEKTORLER or "holding" in sektor.lower()
+    return holding_mi(sektor)
 
 def _is_savunma(sektor: str) -> bool:
     return any(k in sektor.lower() for k in ("defense","aerospace","savunma"))
@@ -207,35 +224,34 @@ def _is_zorunlu(ticker: str) -> bool:
 # ════════════════════════════════════════════════════════════════
 
 def hesapla_rsi(s: pd.Series, p=14) -> float:
-    d = s.diff(); g = d.clip(lower=0).rolling(p).mean()
-    k = (-d.clip(upper=0)).rolling(p).mean()
-    return round((100 - 100/(1+g/k)).iloc[-1], 2)
+    return round(rsi_serisi(s, p).iloc[-1], 2)
 
 def hesapla_macd(s: pd.Series):
     m = s.ewm(span=12,adjust=False).mean() - s.ewm(span=26,adjust=False).mean()
     sg = m.ewm(span=9,adjust=False).mean()
     return round(m.iloc[-1],4), round(sg.iloc[-1],4), round((m-sg).iloc[-1],4), m, sg
 
-def hesapla_bollinger(s: pd.Series, w=20):
-    o=s.rolling(w).mean(); st=s.rolling(w).std()
+def hesapla_bollinger(s: pd.Series, w=20, ort=None):
+    o=s.rolling(w).mean() if ort is None else ort; st=s.rolling(w).std()
     u=o+2*st; l=o-2*st
     return round(u.iloc[-1],2), round(o.iloc[-1],2), round(l.iloc[-1],2), round(((s-l)/(u-l)).iloc[-1],3)
 
-def hesapla_stochastic(h,l,c,k=14,d=3):
-    hi=h.rolling(k).max(); lo=l.rolling(k).min()
+def hesapla_stochastic(h,l,c,k=14,d=3, hi=None, lo=None):
+    if hi is None: hi=h.rolling(k).max()
+    if lo is None: lo=l.rolling(k).min()
     pk=100*(c-lo)/(hi-lo)
     return round(pk.iloc[-1],2), round(pk.rolling(d).mean().iloc[-1],2)
 
-def hesapla_atr(h,l,c,p=14) -> float:
-    tr=pd.concat([h-l,(h-c.shift()).abs(),(l-c.shift()).abs()],axis=1).max(axis=1)
+def hesapla_atr(h,l,c,p=14, tr=None) -> float:
+    if tr is None: tr=gercek_aralik(h,l,c)
     return round(tr.rolling(p).mean().iloc[-1],4)
 
-def hesapla_adx(h,l,c,p=14) -> float:
-    tr = pd.concat([h-l,(h-c.shift()).abs(),(l-c.shift()).abs()],axis=1).max(axis=1)
-    dm_pos = (h.diff()).clip(lower=0)
-    dm_neg = (-l.diff()).clip(lower=0)
-    dm_pos = dm_pos.where(dm_pos > (-l.diff()).clip(lower=0), 0)
-    dm_neg = dm_neg.where(dm_neg > (h.diff()).clip(lower=0), 0)
+def hesapla_adx(h,l,c,p=14, tr=None) -> float:
+    if tr is None: tr=gercek_aralik(h,l,c)
+    yukari = h.diff().clip(lower=0)
+    asagi  = (-l.diff()).clip(lower=0)
+    dm_pos = yukari.where(yukari > asagi, 0)
+    dm_neg = asagi.where(asagi > yukari, 0)
     atr_s  = tr.rolling(p).mean()
     di_pos = 100 * dm_pos.rolling(p).mean() / atr_s
     di_neg = 100 * dm_neg.rolling(p).mean() / atr_s
@@ -243,30 +259,31 @@ def hesapla_adx(h,l,c,p=14) -> float:
     adx    = dx.rolling(p).mean()
     return round(adx.iloc[-1], 2) if not adx.isna().iloc[-1] else 0.0
 
-def hesapla_obv(c,v) -> float:
-    yon = c.diff().apply(lambda x: 1 if x>0 else(-1 if x<0 else 0))
-    ob  = (yon*v).cumsum()
+def hesapla_obv(c,v, ob=None) -> float:
+    if ob is None: ob=obv_serisi(c,v)
     return round(ob.iloc[-1]-ob.iloc[-20],0) if len(ob)>=20 else 0.0
 
-def hesapla_destek_direnc(c,w=20):
-    s=c.tail(w*2); mx=[]; mn=[]
-    for i in range(w,len(s)-w):
-        d=s.iloc[i-w:i+w]
-        if s.iloc[i]==d.max(): mx.append(round(s.iloc[i],2))
-        if s.iloc[i]==d.min(): mn.append(round(s.iloc[i],2))
-    return (min(mn) if mn else round(c.tail(20).min(),2),
-            max(mx) if mx else round(c.tail(20).max(),2))
-
-def hesapla_fibonacci(c,p=60):
-    s=c.tail(p); hi=s.max(); lo=s.min(); r=hi-lo
+def hesapla_destek_direnc(c,w=20, uc=None):
+    s=c.tail(w*2); tepe,dip=pivot_noktalari(s,w)
+    mx=s.to_numpy()[tepe].round(2); mn=s.to_numpy()[dip].round(2)
+    yedek_mx, yedek_mn = (uc[0].iloc[-1], uc[1].iloc[-1]) if uc else (c.tail(20).max(), c.tail(20).min())
+    return (mn.min() if len(mn) else round(yedek_mn,2),
+            mx.max() if len(mx) else round(yedek_mx,2))
+
+def hesapla_fibonacci(c,p=60, uc=None):
+    if uc is None: s=c.tail(p); hi=s.max(); lo=s.min()
+    else:          hi=uc[0].iloc[-1]; lo=uc[1].iloc[-1]
+    r=hi-lo
     levels = {k:round(lo+v*r,2) for k,v in
               [("0.0",0),("0.236",.236),("0.382",.382),("0.5",.5),("0.618",.618),("1.0",1)]}
     levels["1.272"] = round(hi + 0.272*r, 2)
     levels["1.618"] = round(hi + 0.618*r, 2)
     return levels
 
-def hesapla_ichimoku(h,l,c):
-    def mid(s, p): return (s.rolling(p).max() + s.rolling(p).min()) / 2
+def hesapla_ichimoku(h,l,c, uclar=None):
+    def mid(s, p):
+        if uclar and p in uclar: return (uclar[p][0] + uclar[p][1]) / 2
+        return (s.rolling(p).max() + s.rolling(p).min()) / 2
     tenkan   = mid(h, 9)
     kijun    = mid(h, 26)
     senkou_a = ((tenkan + kijun) / 2).shift(26)
@@ -289,104 +306,54 @@ def hesapla_ichimoku(h,l,c):
             "bulut_ust":bulut_ust,"bulut_alt":bulut_alt}
 
 def hesapla_parabolic_sar(h,l,c, af=0.02, max_af=0.2):
-    sar = l.copy(); trend = 1; ep = h.iloc[0]; af_cur = af
-    for i in range(2, len(c)):
-        if trend == 1:
-            sar.iloc[i] = sar.iloc[i-1] + af_cur*(ep - sar.iloc[i-1])
-            sar.iloc[i] = min(sar.iloc[i], l.iloc[i-1], l.iloc[i-2])
-            if l.iloc[i] < sar.iloc[i]:
-                trend=-1; sar.iloc[i]=ep; ep=l.iloc[i]; af_cur=af
-        else:
-            sar.iloc[i] = sar.iloc[i-1] + af_cur*(ep - sar.iloc[i-1])
-            sar.iloc[i] = max(sar.iloc[i], h.iloc[i-1], h.iloc[i-2])
-            if h.iloc[i] > sar.iloc[i]:
-                trend=1; sar.iloc[i]=ep; ep=h.iloc[i]; af_cur=af
-        if trend==1  and h.iloc[i]>ep: ep=h.iloc[i]; af_cur=min(af_cur+af,max_af)
-        if trend==-1 and l.iloc[i]<ep: ep=l.iloc[i]; af_cur=min(af_cur+af,max_af)
-    son_sar = round(sar.iloc[-1], 2)
+    sar, _ = parabolic_sar_serisi(h.to_numpy()[:len(c)], l.to_numpy()[:len(c)], af, max_af)
+    son_sar = round(sar[-1], 2)
     return son_sar, "YUKARI" if c.iloc[-1] > son_sar else "ASAGI"
 
-def golden_death_cross(c: pd.Series):
+def golden_death_cross(c: pd.Series, sma: Optional[dict] = None):
+    """
+    sma: {pencere: hareketli ortalama serisi} — verilmeyen pencereler
+    sma_bankasi ile tek geçişte hesaplanır. Kesişim: son 4 bar içinde fark
+    işaret değiştirdiyse (kesisimler(..., geri=4)).
+    """
     if len(c) < 50: return "VERI_YOK", 0, 0
-    if len(c) < 200:
-        sma20 = c.rolling(20).mean(); sma50 = c.rolling(50).mean()
-        son20 = round(sma20.iloc[-1], 2); son50 = round(sma50.iloc[-1], 2)
-        for i in range(2, min(6, len(c))):
-            prev_diff = sma20.iloc[-i] - sma50.iloc[-i]
-            curr_diff = sma20.iloc[-1] - sma50.iloc[-1]
-            if prev_diff < 0 and curr_diff > 0: return "GOLDEN_CROSS(20/50)", son20, son50
-            if prev_diff > 0 and curr_diff < 0: return "DEATH_CROSS(20/50)", son20, son50
-        if son20 > son50: return "SMA20_USTUNDE", son20, son50
-        return "SMA20_ALTINDA", son20, son50
-    sma50  = c.rolling(50).mean(); sma200 = c.rolling(200).mean()
-    son50  = round(sma50.iloc[-1], 2); son200 = round(sma200.iloc[-1], 2)
-    for i in range(2, min(6, len(c))):
-        prev_diff = sma50.iloc[-i] - sma200.iloc[-i]
-        curr_diff = sma50.iloc[-1] - sma200.iloc[-1]
-        if prev_diff < 0 and curr_diff > 0: return "GOLDEN_CROSS", son50, son200
-        if prev_diff > 0 and curr_diff < 0: return "DEATH_CROSS", son50, son200
-    if son50 > son200: return "SMA50_USTUNDE", son50, son200
-    return "SMA50_ALTINDA", son50, son200
-
-# ── Iraksama Analizleri ────────────────────────────────────────
-
-def rsi_iraksama(c: pd.Series, rsi_s: pd.Series, pencere=20) -> str:
-    if len(c) < pencere: return "YOK"
-    f_trend = c.iloc[-1] - c.iloc[-pencere]
-    r_trend = rsi_s.iloc[-1] - rsi_s.iloc[-pencere]
-    if f_trend < 0 and r_trend > 3:  return "POZ_IRAKSAMA"
-    if f_trend > 0 and r_trend < -3: return "NEG_IRAKSAMA"
-    return "YOK"
-
-def macd_iraksama(c: pd.Series, macd_s: pd.Series, pencere=20) -> str:
-    if len(c) < pencere: return "YOK"
-    f_trend = c.iloc[-1] - c.iloc[-pencere]
-    m_trend = macd_s.iloc[-1] - macd_s.iloc[-pencere]
-    if f_trend < 0 and m_trend > 0: return "POZ_IRAKSAMA"
-    if f_trend > 0 and m_trend < 0: return "NEG_IRAKSAMA"
-    return "YOK"
-
-def obv_iraksama(c: pd.Series, v: pd.Series, pencere=20) -> str:
-    if len(c) < pencere: return "YOK"
-    yon = c.diff().apply(lambda x: 1 if x>0 else(-1 if x<0 else 0))
-    ob  = (yon*v).cumsum()
-    f_trend = c.iloc[-1] - c.iloc[-pencere]
-    o_trend = ob.iloc[-1] - ob.iloc[-pencere]
-    if f_trend < 0 and o_trend > 0: return "POZ_IRAKSAMA"
-    if f_trend > 0 and o_trend < 0: return "NEG_IRAKSAMA"
-    return "YOK"
+    hizli, yavas = (20, 50) if len(c) < 200 else (50, 200)
+    sma = dict(sma or {})
+    eksik = [p for p in (hizli, yavas) if p not in sma]
+    if eksik: sma.update(sma_bankasi(c, eksik))
+    son_h = round(sma[hizli].iloc[-1], 2); son_y = round(sma[yavas].iloc[-1], 2)
+    olay  = kesisimler(sma[hizli], sma[yavas], geri=4).iloc[-1]
+    ek    = f"({hizli}/{yavas})" if yavas == 50 else ""
+    if olay > 0: return f"GOLDEN_CROSS{ek}", son_h, son_y
+    if olay < 0: return f"DEATH_CROSS{ek}", son_h, son_y
+    if son_h > son_y: return f"SMA{hizli}_USTUNDE", son_h, son_y
+    return f"SMA{hizli}_ALTINDA", son_h, son_y
 
 # ── Mum Formasyonları ─────────────────────────────────────────
 
-def mum_formasyonlari(o: pd.Series, h: pd.Series, l: pd.Series, c: pd.Series) -> list:
-    formasyonlar = []
-    if len(c) < 3: return formasyonlar
-    o1,h1,l1,c1 = o.iloc[-1],h.iloc[-1],l.iloc[-1],c.iloc[-1]
-    o2,h2,l2,c2 = o.iloc[-2],h.iloc[-2],l.iloc[-2],c.iloc[-2]
-    o3,h3,l3,c3 = o.iloc[-3],h.iloc[-3],l.iloc[-3],c.iloc[-3]
-    govde1=abs(c1-o1); govde2=abs(c2-o2); govde3=abs(c3-o3)
-    range1=h1-l1; range2=h2-l2
-    if range1 > 0:
-        alt_fitil = min(o1,c1) - l1; ust_fitil = h1 - max(o1,c1)
-        if alt_fitil >= 2*govde1 and ust_fitil < govde1*0.3: formasyonlar.append("HAMMER(AL)")
-        if ust_fitil >= 2*govde1 and alt_fitil < govde1*0.3: formasyonlar.append("SHOOTING_STAR(SAT)")
-    if range1 > 0 and govde1 < range1 * 0.1: formasyonlar.append("DOJI(KARARSIZ)")
-    if c2 < o2 and c1 > o1 and o1 < c2 and c1 > o2: formasyonlar.append("BULLISH_ENGULFING(AL)")
-    if c2 > o2 and c1 < o1 and o1 > c2 and c1 < o2: formasyonlar.append("BEARISH_ENGULFING(SAT)")
-    if (c3 < o3 and govde3 > (h3-l3)*0.5 if (h3-l3)>0 else False):
-        if govde2 < range2 * 0.3:
-            if c1 > o1 and c1 > (o3+c3)/2: formasyonlar.append("MORNING_STAR(AL)")
-    if (c3 > o3 and govde3 > (h3-l3)*0.5):
-        if govde2 < range2 * 0.3:
-            if c1 < o1 and c1 < (o3+c3)/2: formasyonlar.append("EVENING_STAR(SAT)")
-    if c1>o1 and c2>o2 and c3>o3 and c1>c2>c3 and o1>o2>o3: formasyonlar.append("THREE_WHITE_SOLDIERS(GUCLU_AL)")
-    if c1<o1 and c2<o2 and c3<o3 and c1<c2<c3 and o1<o2<o3: formasyonlar.append("THREE_BLACK_CROWS(GUCLU_SAT)")
-    return formasyonlar
+def mum_formasyonlari(o: pd.Series, h: pd.Series, l: pd.Series, c: pd.Series,
+                      tarama: Optional[dict] = None) -> list:
+    """
+    Son bardaki mum formasyonları. tarama: mum_formasyon_taramasi sonucu
+    (tüm geçmiş); verilmezse sadece son üç bar taranır.
+    """
+    if len(c) < 3: return []
+    if tarama is None:
+        tarama = mum_formasyon_taramasi(o.iloc[-3:], h.iloc[-3:], l.iloc[-3:], c.iloc[-3:])
+    return [ad for ad, maske in tarama.items() if maske[-1]]
+
+def mum_gecmisi(c: pd.Series, tarama: dict, formasyonlar: list, ufuk: int = MUM_UFUK) -> dict:
+    """
+    Bugünkü formasyonların bu hissedeki geçmiş performansı:
+    {ad: {"ornek", "ort", "medyan", "pozitif"} | None} — ufuk bar sonraki getiri.
+    """
+    ist = formasyon_istatistikleri(c, {ad: tarama[ad] for ad in formasyonlar}, (ufuk,))
+    return {ad: ist[ad]["ileri"][ufuk] for ad in formasyonlar}
 
 # ── Portföy Metrikleri ─────────────────────────────────────────
 
-def hesapla_sharpe(c: pd.Series, risksiz=RISKSIZ_FAIZ) -> float:
-    gunluk = c.pct_change().dropna()
+def hesapla_sharpe(c: pd.Series, risksiz=RISKSIZ_FAIZ, getiri=None) -> float:
+    gunluk = (c.pct_change() if getiri is None else getiri).dropna()
     if len(gunluk) < 10: return 0.0
     yillik_getiri = gunluk.mean() * 252
     yillik_std    = gunluk.std() * (252**0.5)
@@ -404,94 +371,148 @@ def kelly_criterion(beklenen_getiri: float, volatilite: float,
     f = f / 2
     return round(min(max(f, 0.02), 0.25), 3)
 
+# ════════════════════════════════════════════════════════════════
+# GÖSTERGE MOTORU — tek geçiş, ortak ara değerler
+# ════════════════════════════════════════════════════════════════
+# True range (ATR+ADX), OBV (trend+iraksama), getiri serisi (volatilite,
+# Sharpe), SMA20 (Bollinger+kesişim), MACD EWM'leri (değer+iraksama) ve
+# fiyat pivotları (RSI/MACD/OBV ıraksamaları)
+# bir kez hesaplanıp ilgili göstergelere verilir. Sonuç değerleri tek tek
+# hesapla_* çağrılarıyla birebir aynıdır.
+
+@dataclass
+class GostergeSonuc:
+    fiyat: float; degisim_1g: float; degisim_1h: Optional[float]; degisim_6ay: float
+    rsi_14: float; stoch_k: float; stoch_d: float
+    macd: float; macd_sinyal: float; macd_hist: float
+    sma_50: Optional[float]; sma_200: Optional[float]
+    bb_ust: float; bb_orta: float; bb_alt: float; bb_pct: float
+    atr: float; adx: float; obv_trend: float
+    volatilite: float; yillik_getiri: float          # yıllık, oran (0.35 = %35)
+    destek: float; direnc: float; sd_bolgeleri: dict; fib: dict
+    golden_cross_durum: str; ichimoku: dict; sar_deger: float; sar_yon: str
+    rsi_iraksama: str; macd_iraksama: str; obv_iraksama: str
+    mum_formasyonlari: list; mum_istatistik: dict
+    sharpe: float; max_drawdown: float; kelly_f: float
+    sureler: dict = field(default_factory=dict)       # gösterge → ms
+
+_GOSTERGE_SURE: dict = {}
+_GOSTERGE_ADET = 0
+_GOSTERGE_KILIT = threading.Lock()
+
+def gostergeleri_hesapla(hist: pd.DataFrame) -> GostergeSonuc:
+    """
+    HisseDerin'in ihtiyaç duyduğu tüm teknik göstergeleri tek OHLCV bloğundan
+    hesaplar. Gösterge başına süre sonuc.sureler'e ve süreç geneli toplama yazılır.
+    """
+    sure = {}
+    def olc(ad, fn, *a, **k):
+        t0 = time.perf_counter()
+        sonuc = fn(*a, **k)
+        sure[ad] = sure.get(ad, 0.0) + (time.perf_counter() - t0) * 1000
+        return sonuc
+
+    blok = hist[["Open","High","Low","Close","Volume"]]
+    o, h, l, c, v = (blok[k] for k in blok.columns)
+
+    # Ortak ara değerler
+    tr     = olc("ortak:tr",     gercek_aralik, h, l, c)
+    ob     = olc("ortak:obv",    obv_serisi, c, v)
+    getiri = olc("ortak:getiri", c.pct_change)
+    sma    = olc("ortak:sma",    sma_bankasi, c, [p for p in (20, 50, 200) if len(c) >= p])
+    # Kayan tepe/dip: yüksek → Ichimoku (9/26/52) + stokastik tepe (14), düşük → stokastik dip,
+    # kapanış → destek/direnç yedeği (20) + Fibonacci (60)
+    ust    = olc("ortak:uclar",  uc_bankasi, h, (9, 14, 26, 52))
+    alt    = olc("ortak:uclar",  uc_bankasi, l, (14,))
+    kap    = olc("ortak:uclar",  uc_bankasi, c, (20, 60), kisa_pencere=True)
+
+    mv, ms, mh, macd_s, _ = olc("macd", hesapla_macd, c)
+    bu, bo, ba, bp        = olc("bollinger", hesapla_bollinger, c, ort=sma.get(20))
+    sk, sd                = olc("stochastic", hesapla_stochastic, h, l, c, hi=ust[14][0], lo=alt[14][1])
+    at                    = olc("atr", hesapla_atr, h, l, c, tr=tr)
+    adx_v                 = olc("adx", hesapla_adx, h, l, c, tr=tr)
+    obv_t                 = olc("obv", hesapla_obv, c, v, ob=ob)
+    de, di                = olc("destek_direnc", hesapla_destek_direnc, c, uc=kap[20])
+    sdb                   = olc("sd_bolgeleri", destek_direnc_bolgeleri, c, h, l)
+    fi                    = olc("fibonacci", hesapla_fibonacci, c, uc=kap[60])
+    ich                   = olc("ichimoku", hesapla_ichimoku, h, l, c, uclar=ust)
+    sar_v, sar_y          = olc("sar", hesapla_parabolic_sar, h, l, c)
+    gc, sma50, sma200     = olc("kesisim", golden_death_cross, c, sma=sma)
+    rsi_s                 = olc("rsi", lambda: rsi_serisi(c).round(2))
+    ira                   = olc("iraksama", iraksama_taramasi, c, {"RSI": rsi_s, "MACD": macd_s, "OBV": ob})
+    ri, mi, oi            = (iraksama_durumu(ira[k]) for k in ("RSI", "MACD", "OBV"))
+    mt                    = olc("mum", mum_formasyon_taramasi, o, h, l, c)
+    mf                    = mum_formasyonlari(o, h, l, c, tarama=mt)
+    mg                    = olc("mum:gecmis", mum_gecmisi, c, mt, mf)
+    sh                    = olc("sharpe", hesapla_sharpe, c, getiri=getiri)
+    md                    = olc("drawdown", hesapla_max_drawdown, c)
+    vol    = round(getiri.std()*(252**0.5),4)
+    yillik = round(getiri.mean()*252, 4)
+
+    global _GOSTERGE_ADET
+    with _GOSTERGE_KILIT:
+        _GOSTERGE_ADET += 1
+        for ad, ms_ in sure.items():
+            _GOSTERGE_SURE[ad] = _GOSTERGE_SURE.get(ad, 0.0) + ms_
+
+    return GostergeSonuc(
+        fiyat=round(c.iloc[-1],2),
+        degisim_1g=round((c.iloc[-1]/c.iloc[-2]-1)*100,2),
+        degisim_1h=round((c.iloc[-1]/c.iloc[-5]-1)*100,2) if len(c)>=5 else None,
+        degisim_6ay=round((c.iloc[-1]/c.iloc[0]-1)*100,2),
+        rsi_14=rsi_s.iloc[-1], stoch_k=sk, stoch_d=sd,
+        macd=mv, macd_sinyal=ms, macd_hist=mh,
+        sma_50=round(sma50,2) if sma50 else None,
+        sma_200=round(sma200,2) if sma200 else None,
+        bb_ust=bu, bb_orta=bo, bb_alt=ba, bb_pct=bp,
+        atr=at, adx=adx_v, obv_trend=obv_t,
+        volatilite=vol, yillik_getiri=yillik,
+        destek=de, direnc=di, sd_bolgeleri=sdb, fib=fi,
+        golden_cross_durum=gc, ichimoku=ich, sar_deger=sar_v, sar_yon=sar_y,
+        rsi_iraksama=ri, macd_iraksama=mi, obv_iraksama=oi,
+        mum_formasyonlari=mf, mum_istatistik=mg,
+        sharpe=sh, max_drawdown=md, kelly_f=kelly_criterion(yillik, vol),
+        sureler=sure,
+    )
+
+def gosterge_sure_raporu() -> str:
+    """gostergeleri_hesapla çağrılarında gösterge başına ortalama süre (pahalıdan ucuza)."""
+    with _GOSTERGE_KILIT:
+        adet = _GOSTERGE_ADET; toplam = dict(_GOSTERGE_SURE)
+    if not adet:
+        return "  (gösterge hesaplanmadı)"
+    genel = sum(toplam.values())
+    satirlar = [f"  {ad:<16} {ms/adet:7.3f} ms  %{ms/genel*100:4.1f}"
+                for ad, ms in sorted(toplam.items(), key=lambda x: -x[1])]
+    satirlar.append(f"  {'TOPLAM':<16} {genel/adet:7.3f} ms  ({adet} hisse)")
+    return "\n".join(satirlar)
+
 # ════════════════════════════════════════════════════════════════
 # HEDEF FİYAT — Çoklu Yöntem Konsensüsü (v4.1 YENİ)
 # ════════════════════════════════════════════════════════════════
 
 def hedef_fiyat_hesapla(h, bilgi: dict = None) -> dict:
     """
-    6 farklı yöntemle hedef fiyat hesaplar, ağırlıklı konsensüs alır.
+    6 farklı yöntemle hedef fiyatı hesaplar, ağırlıklı konsensüs alır — tek
+    hisse için hedef_motoru sarmalayıcısı; toplu hesap için hedef_toplu().
     h: HisseDerin nesnesi
     bilgi: yfinance info dict (analist hedefi için) — opsiyonel
     Döner: {"hedef": float, "yontem": str, "detay": dict}
     """
-    fiyat = h.fiyat
-    hedefler = {}
-    agirliklar = {}
-
-    # ── 1. Fibonacci 1.272 Uzantısı (%20) ─────────────────────────────────────
-    if h.fib:
-        f127 = h.fib.get("1.272")
-        f162 = h.fib.get("1.618")
-        if f127 and f127 > fiyat:
-            hedefler["fib127"] = f127
-            agirliklar["fib127"] = 0.20
-        if f162 and f162 > fiyat:
-            hedefler["fib162"] = f162
-            agirliklar["fib162"] = 0.10  # daha uzak hedef, düşük ağırlık
-
-    # ── 2. Direnç Seviyesi (%20) ───────────────────────────────────────────────
-    if h.direnc and h.direnc > fiyat:
-        hedefler["direnc"] = h.direnc
-        agirliklar["direnc"] = 0.20
-
-    # ── 3. ATR Bazlı Hedef — R/R 1:3 (%15) ───────────────────────────────────
-    if h.atr:
-        stop_mesafe = 1.5 * h.atr
-        atr_hedef   = round(fiyat + 3 * stop_mesafe, 2)
-        if atr_hedef > fiyat:
-            hedefler["atr_rr3"] = atr_hedef
-            agirliklar["atr_rr3"] = 0.15
-
-    # ── 4. Bollinger Band Üst (%10) ────────────────────────────────────────────
-    if h.bb_ust and h.bb_ust > fiyat:
-        hedefler["bollinger"] = h.bb_ust
-        agirliklar["bollinger"] = 0.10
-
-    # ── 5. Analist Konsensüsü (%25 — en yüksek ağırlık) ──────────────────────
-    if bilgi:
-        analyst_target = _to_float(bilgi.get("targetMeanPrice"))
-        if analyst_target and analyst_target > fiyat:
-            hedefler["analist"] = round(analyst_target, 2)
-            agirliklar["analist"] = 0.25
-
-    # ── 6. F/K Değerleme — Sektör Ortalama F/K (%20) ─────────────────────────
-    if h.fk_orani and h.fk_orani > 0 and not _is_holding(h.sektor):
-        hedef_fk = SEKTOR_FK_HEDEF.get(h.sektor, SEKTOR_FK_HEDEF["default"])
-        if h.fk_orani < hedef_fk * 0.80:  # en az %20 ucuz
-            duzeltme = hedef_fk / h.fk_orani
-            fk_hedef = round(fiyat * duzeltme, 2)
-            if fk_hedef > fiyat:
-                hedefler["fk_deger"] = fk_hedef
-                agirliklar["fk_deger"] = 0.20
-
-    # ── Konsensüs hesapla ─────────────────────────────────────────────────────
-    if not hedefler:
-        # Hiçbir yöntem çalışmadıysa: +8% varsayılan
-        return {
-            "hedef": round(fiyat * 1.08, 2),
-            "yontem": "varsayilan_+8pct",
-            "detay": {}
-        }
-
-    toplam_agirlik  = sum(agirliklar.values())
-    agirlikli_hedef = sum(hedefler[k] * agirliklar[k] for k in hedefler) / toplam_agirlik
+    girdi = hedef_girdi_tablosu([h], {h.ticker: bilgi} if bilgi else None, holding=_is_holding)
+    return hedef_sonucu(hedefleri_hesapla(girdi)[0])
 
-    # Minimum %5 upside garantisi
-    son_hedef = max(round(agirlikli_hedef, 2), round(fiyat * 1.05, 2))
-
-    detay = {
-        k: {"fiyat": round(hedefler[k], 2),
-            "agirlik_pct": round(agirliklar[k]*100),
-            "upside_pct": round((hedefler[k]/fiyat-1)*100, 1)}
-        for k in hedefler
-    }
-
-    return {
-        "hedef": son_hedef,
-        "yontem": "agirlikli_konsensus",
-        "detay": detay
-    }
+def hedef_toplu(hisseler: list, bilgiler: dict = None) -> np.ndarray:
+    """
+    Tüm derin hisselerin hedeflerini tek vektörel geçişte hesaplar, her
+    hissenin hedef_analiz alanını doldurur ve yöntem başına hedefleri taşıyan
+    diziyi döndürür (P&L hedef/trailing güncellemesi aynı diziyi kullanır).
+    bilgiler: {ticker.IS: yfinance info}
+    """
+    hedefler = hedefleri_hesapla(hedef_girdi_tablosu(hisseler, bilgiler, holding=_is_holding))
+    for h, kayit in zip(hisseler, hedefler):
+        h.hedef_analiz = hedef_sonucu(kayit)
+    return hedefler
 
 # ════════════════════════════════════════════════════════════════
 # KURAL MOTORU — Deterministik Puanlama
@@ -513,128 +534,80 @@ class KuralMotorSonuc:
     sar_yon: str
     aciklamalar: list
 
-def kural_motoru_hesapla(h) -> KuralMotorSonuc:
-    puan = 0.0; acik = []
-
-    gc = h.golden_cross_durum
-    if gc == "GOLDEN_CROSS":     puan += 30; acik.append("✅ Golden Cross (güçlü AL)")
-    elif gc == "SMA50_USTUNDE":  puan += 18; acik.append("✅ SMA50 > SMA200 (pozitif trend)")
-    elif gc == "DEATH_CROSS":    puan -= 25; acik.append("❌ Death Cross (güçlü SAT)")
-    elif gc == "SMA50_ALTINDA":  puan -= 10; acik.append("⚠️ SMA50 < SMA200 (negatif trend)")
-
-    adx_v = _f(h.adx)
-    if adx_v:
-        if adx_v > 50:   puan += 8; acik.append(f"✅ ADX:{adx_v:.0f} çok güçlü trend")
-        elif adx_v > 25: puan += 4; acik.append(f"✅ ADX:{adx_v:.0f} güçlü trend")
-        else:            acik.append(f"⚠️ ADX:{adx_v:.0f} zayıf/yok trend")
-
-    ich = h.ichimoku
-    if ich:
-        if ich["durum"] == "BULUT_USTU":
-            puan += 15; acik.append(f"✅ Ichimoku: bulut üstünde ({ich['tenkan_kijun']})")
-        elif ich["durum"] == "BULUT_ALTI":
-            puan -= 12; acik.append(f"❌ Ichimoku: bulut altında")
-        else:
-            acik.append(f"⚠️ Ichimoku: bulut içinde (kararsız)")
-        if ich["tenkan_kijun"] == "YUKARI":
-            puan += 5; acik.append("✅ Tenkan > Kijun (kısa vade pozitif)")
-
-    if h.sar_yon == "YUKARI": puan += 8; acik.append("✅ Parabolic SAR: yükseliş")
-    else:                     puan -= 5; acik.append("❌ Parabolic SAR: düşüş")
-
-    rsi_v = _f(h.rsi_14)
-    if rsi_v:
-        if 30 <= rsi_v <= 50:   puan += 10; acik.append(f"✅ RSI:{rsi_v} alım fırsatı bölgesi")
-        elif 50 < rsi_v <= 65:  puan += 6;  acik.append(f"✅ RSI:{rsi_v} momentum pozitif")
-        elif rsi_v > 75:        puan -= 8;  acik.append(f"⚠️ RSI:{rsi_v} aşırı alım")
-        elif rsi_v < 30:        puan += 12; acik.append(f"✅ RSI:{rsi_v} aşırı satım (dip fırsatı)")
-
-    macd_v = _f(h.macd); macd_s = _f(h.macd_sinyal)
-    if macd_v is not None and macd_s is not None:
-        if macd_v > macd_s: puan += 6; acik.append("✅ MACD: sinyal üstünde")
-        else:               puan -= 4; acik.append("❌ MACD: sinyal altında")
-
-    stoch_k = _f(h.stoch_k)
-    if stoch_k:
-        if stoch_k < 20:  puan += 8; acik.append(f"✅ Stoch:{stoch_k:.0f} aşırı satım")
-        elif stoch_k > 80: puan -= 6; acik.append(f"⚠️ Stoch:{stoch_k:.0f} aşırı alım")
-
-    ira_sayisi = 0
-    for ira_tip, ira_val in [("RSI",h.rsi_iraksama),("MACD",h.macd_iraksama),("OBV",h.obv_iraksama)]:
-        if ira_val == "POZ_IRAKSAMA":
-            puan += 5; ira_sayisi += 1; acik.append(f"✅ {ira_tip} pozitif ıraksama")
-        elif ira_val == "NEG_IRAKSAMA":
-            puan -= 5; acik.append(f"❌ {ira_tip} negatif ıraksama (tepe sinyali)")
-    if ira_sayisi >= 2:
-        puan += 5; acik.append("✅✅ Çoklu pozitif ıraksama — güçlü dip onayı")
-
-    for form in h.mum_formasyonlari:
-        if "AL" in form:      puan += 6; acik.append(f"✅ Mum: {form}")
-        elif "SAT" in form:   puan -= 5; acik.append(f"❌ Mum: {form}")
-        elif "KARARSIZ" in form: acik.append(f"⚠️ Mum: {form}")
-
-    if h.obv_trend and h.obv_trend > 0: puan += 8; acik.append("✅ OBV: para girişi var")
-    elif h.obv_trend and h.obv_trend < 0: puan -= 5; acik.append("❌ OBV: para çıkışı var")
-
-    bb_p = _f(h.bb_pct)
-    if bb_p is not None:
-        if bb_p < 0.1:   puan += 8; acik.append(f"✅ BB%:{bb_p:.2f} alt band (alım bölgesi)")
-        elif bb_p > 0.9: puan -= 6; acik.append(f"⚠️ BB%:{bb_p:.2f} üst band (satım bölgesi)")
-
-    teknik_puan = max(0, min(100, 50 + puan))
-
-    t_puan = 50.0; t_acik = []
-    fk = _f(h.fk_orani)
-    if fk:
-        if 4 < fk < 12:    t_puan += 20; t_acik.append(f"✅ F/K:{fk:.1f} değer hissesi")
-        elif 12 <= fk < 20: t_puan += 10; t_acik.append(f"✅ F/K:{fk:.1f} makul")
-        elif fk >= 50:      t_puan -= 15; t_acik.append(f"❌ F/K:{fk:.1f} pahalı")
-    roe = _f(h.roe)
-    if roe:
-        if roe > 20:   t_puan += 15; t_acik.append(f"✅ ROE:{roe:.1f}% yüksek karlılık")
-        elif roe > 10: t_puan += 8;  t_acik.append(f"✅ ROE:{roe:.1f}% iyi karlılık")
-        elif roe < 0:  t_puan -= 15; t_acik.append(f"❌ ROE:{roe:.1f}% zararda")
-    de = _f(h.borc_ozsermaye)
-    if de:
-        if de < 0.5:   t_puan += 10; t_acik.append(f"✅ D/E:{de:.2f} düşük borç")
-        elif de > 2.0: t_puan -= 10; t_acik.append(f"❌ D/E:{de:.2f} yüksek borç")
-    fcf = _f(h.fcf_m)
-    if fcf and fcf > 0:  t_puan += 10; t_acik.append(f"✅ FCF:{fcf:,.0f}M pozitif")
-    elif fcf and fcf < 0: t_puan -= 8; t_acik.append(f"❌ FCF negatif")
-    yoy = _f(h.gelir_buyume_yoy)
-    if yoy:
-        if yoy > 30:   t_puan += 10; t_acik.append(f"✅ YoY büyüme:{yoy:.1f}%")
-        elif yoy > 10: t_puan += 5;  t_acik.append(f"✅ YoY büyüme:{yoy:.1f}%")
-        elif yoy < 0:  t_puan -= 8;  t_acik.append(f"❌ Gelir düşüyor:{yoy:.1f}%")
-    sharpe = _f(h.sharpe)
-    if sharpe:
-        if sharpe > 1.5:  t_puan += 8; t_acik.append(f"✅ Sharpe:{sharpe:.2f} iyi risk-getiri")
-        elif sharpe < 0:  t_puan -= 5; t_acik.append(f"❌ Sharpe:{sharpe:.2f} negatif")
-    temel_puan = max(0, min(100, t_puan))
-    acik.extend(t_acik)
-
-    ticker_kisa = h.ticker.replace(".IS","")
-    SEKTOR_AGIRLIK = {
-        "GARAN":0.50,"AKBNK":0.50,"YKBNK":0.50,"ISCTR":0.50,"HALKB":0.50,"VAKBN":0.50,"SKBNK":0.50,"TSKB":0.50,
-        "ISMEN":0.45,"DSTKF":0.45,"SAHOL":0.45,"KCHOL":0.45,"ALARK":0.45,"ANSGR":0.45,"TURSG":0.45,"KTLEV":0.45,"ECILC":0.45,
-        "ENKAI":0.20,"TKFEN":0.20,"EKGYO":0.20,"GLRMK":0.20,"DAPGM":0.20,"TUPRS":0.20,"PETKM":0.20,
-        "ODAS":0.20,"AKSEN":0.20,"ENJSA":0.20,"ENERY":0.20,"CWENE":0.20,"CANTE":0.20,"IZENR":0.20,
-        "ZOREN":0.20,"KRDMD":0.20,"EREGL":0.20,"GUBRF":0.20,"BRSAN":0.20,"KCAER":0.20,"TRMET":0.20,
-        "EUPWR":0.20,"ASTOR":0.20,"MAGEN":0.20,"YEOTK":0.20,"TRENJ":0.20,"TRALT":0.20,
-        "ASELS":0.30,"ALTNY":0.30,"MIATK":0.30,"REEDR":0.30,"PATEK":0.30,
-    }
-    temel_agirlik  = SEKTOR_AGIRLIK.get(ticker_kisa, 0.40)
-    teknik_agirlik = 1.0 - temel_agirlik
-    toplam = round((teknik_puan * teknik_agirlik + temel_puan * temel_agirlik), 1)
-
-    return KuralMotorSonuc(
-        ticker=h.ticker, teknik_puan=round(teknik_puan,1), temel_puan=round(temel_puan,1),
-        toplam_puan=toplam, golden_cross=h.golden_cross_durum,
+def kural_motoru_toplu(hisseler, aciklama: bool = True) -> list:
+    """
+    Hisselerin hepsini tek kural tablosunda puanlar (kural_motoru.puanla).
+    aciklama=False ise açıklama metinleri üretilmez (sadece sıralama için).
+    """
+    tablo = kural_tablosu_olustur(hisseler)
+    puan  = kural_puanla(tablo).to_dict("records")
+    metin = list(kural_aciklamalari(tablo)) if aciklama else [[]] * len(hisseler)
+    return [KuralMotorSonuc(
+        ticker=h.ticker, teknik_puan=p["teknik_puan"], temel_puan=p["temel_puan"],
+        toplam_puan=p["toplam_puan"], golden_cross=h.golden_cross_durum,
         adx=_f(h.adx) or 0, rsi_iraksama=h.rsi_iraksama, macd_iraksama=h.macd_iraksama,
         obv_iraksama=h.obv_iraksama, mum_formasyonlar=h.mum_formasyonlari,
         ichimoku_durum=h.ichimoku.get("durum","?") if h.ichimoku else "?",
-        sar_yon=h.sar_yon, aciklamalar=acik,
-    )
+        sar_yon=h.sar_yon, aciklamalar=list(m),
+    ) for h, p, m in zip(hisseler, puan, metin)]
+
+def kural_motoru_hesapla(h) -> KuralMotorSonuc:
+    return kural_motoru_toplu([h])[0]
+
+def kural_gecmisi_guncelle(tickers: list = None, yil: int = KURAL_GECMISI_YIL) -> tuple:
+    """
+    Evrenin günlük kural puanı geçmişini (kural_gecmisi) artımlı günceller.
+    Temel alanlar bugünkü info'dan gelir. Dönüş: ({"teknik", "toplam"}, veriler)
+    """
+    tickers = tickers or BIST100_TICKERS
+    veriler = toplu_fiyat_gecmisi(tickers, period=f"{yil}y")
+    temel_isit(tickers)
+    temel = pd.DataFrame({t: _temel_alanlari(info) for t in veriler
+                          if (info := temel_bilgi(t))}).T
+    return kural_gecmisi.guncelle(veriler, temel=temel, risksiz=RISKSIZ_FAIZ), veriler
+
+def kural_gecmisi_raporu(gecmis: dict, veriler: dict, esik: float = 70):
+    """
+    Teknik puan ≥ esik gözlemlerinin ileri getirisi, eşik altıyla karşılaştırmalı.
+    Toplam puan bugünkü temel verileri geçmişe uyguladığından (ileriye bakma)
+    kullanılmaz.
+    """
+    kapanis = PiyasaMatrisi(veriler).close
+    t = Table(title=f"📈 Kural Puanı Geçmişi — Teknik≥{esik:.0f} ileri getiri", border_style="green")
+    for col in ("Ufuk", "Grup", "Örnek", "Ort%", "Medyan%", "Pozitif"):
+        t.add_column(col, justify="right")
+    for ufuk in (5, 20):
+        for grup, ist in kural_gecmisi.esik_analizi(gecmis["teknik"], kapanis, esik, ufuk).items():
+            t.add_row(f"{ufuk}g", f"Teknik≥{esik:.0f}" if grup == "ust" else f"Teknik<{esik:.0f}",
+                      str(ist["ornek"]), _fmt(ist["ort"]), _fmt(ist["medyan"]), _fmt(ist["pozitif"]))
+    console.print(t)
+
+def mum_istatistik_raporu(m: PiyasaMatrisi, ufuk: int = MUM_UFUK) -> dict:
+    """
+    Evren geneli mum formasyonu performansı (PiyasaMatrisi.mum_istatistikleri
+    üzerinden, hisseler havuzlanarak). Dönüş: {ad: {"bugun", "adet", "ornek",
+    "ort", "pozitif"}} — ort yüzde, pozitif oran; bugun = son barında formasyon
+    olan hisse sayısı.
+    """
+    tarama = m.mum_taramasi()
+    sonuc = {}
+    for ad, df in m.mum_istatistikleri(ufuk).items():
+        ornek = int(df["ornek"].sum())
+        sonuc[ad] = {
+            "bugun":   int(m.son(tarama[ad]).fillna(0).astype(bool).sum()),
+            "adet":    int(df["adet"].sum()),
+            "ornek":   ornek,
+            "ort":     round(float((df["ort"] * df["ornek"]).sum() / ornek), 2) if ornek else None,
+            "pozitif": round(float((df["pozitif"] * df["ornek"]).sum() / ornek), 2) if ornek else None,
+        }
+    t = Table(title=f"🕯️ Mum Formasyonları — {len(m)} hisse, {ufuk}G ileri getiri", border_style="green")
+    for col in ("Formasyon", "Bugün", "Adet", "Örnek", "Ort%", "Pozitif"):
+        t.add_column(col, justify="left" if col == "Formasyon" else "right")
+    for ad, ist in sonuc.items():
+        t.add_row(ad, str(ist["bugun"]), str(ist["adet"]), str(ist["ornek"]),
+                  _fmt(ist["ort"]), _fmt(ist["pozitif"]))
+    console.print(t)
+    return sonuc
 
 # ════════════════════════════════════════════════════════════════
 # VERİ SINIFLARI
@@ -665,11 +638,13 @@ class HisseDerin:
     obv_trend: Optional[float]; hacim_ort: Optional[float]
     destek: Optional[float]; direnc: Optional[float]; fib: Optional[dict]
     adx: Optional[float]
+    sd_bolgeleri: Optional[dict] = None
     golden_cross_durum: str = "VERI_YOK"
     ichimoku: Optional[dict] = None
     sar_deger: Optional[float] = None; sar_yon: str = "?"
     rsi_iraksama: str = "YOK"; macd_iraksama: str = "YOK"; obv_iraksama: str = "YOK"
     mum_formasyonlari: list = field(default_factory=list)
+    mum_istatistik: dict = field(default_factory=dict)   # formasyon → geçmiş ileri getiri
     fk_orani: Optional[float] = None; pd_dd: Optional[float] = None
     temettü_verimi: Optional[float] = None; piyasa_degeri_m: Optional[float] = None
     roe: Optional[float] = None; roa: Optional[float] = None
@@ -686,20 +661,90 @@ class HisseDerin:
 # VERİ ÇEKME
 # ════════════════════════════════════════════════════════════════
 
-def hisse_ozet_cek(ticker: str) -> Optional[HisseOzet]:
+class VeriPaketi:
+    """
+    Bir çalıştırma boyunca her ticker için en uzun pencere (PERIOD) fiyat
+    geçmişini ve info sözlüğünü bir kez çeker; filtre (3mo), derin analiz
+    (6mo) ve korelasyon aşamaları aynı veriden dilim alır. info sözlükleri
+    temel_onbellek üzerinden gelir (TTL'li disk önbelleği).
+    """
+    def __init__(self, period: str = PERIOD):
+        self.period   = period
+        self.fiyatlar: dict = {}
+        self.bilgiler: dict = {}
+
+    def fiyatlari_yukle(self, tickers: list):
+        eksik = [t for t in tickers if t not in self.fiyatlar]
+        if eksik:
+            self.fiyatlar.update(toplu_fiyat_gecmisi(eksik, period=self.period))
+
+    def bilgileri_yukle(self, tickers: list):
+        temel_isit(tickers)
+
+    def fiyat(self, ticker: str, period: Optional[str] = None) -> Optional[pd.DataFrame]:
+        hist = self.fiyatlar.get(ticker)
+        if hist is None:
+            hist = fiyat_gecmisi(ticker, period=self.period)
+            if hist is None: return None
+            self.fiyatlar[ticker] = hist
+        return donem_kes(hist, period) if period else hist
+
+    def matris(self, period: Optional[str] = None) -> PiyasaMatrisi:
+        """Yüklü fiyatlardan (period dilimi) tarih × ticker matrisi."""
+        return PiyasaMatrisi({t: donem_kes(df, period) if period else df
+                              for t, df in self.fiyatlar.items()})
+
+    def bilgi(self, ticker: str) -> Optional[dict]:
+        if ticker not in self.bilgiler:
+            self.bilgiler[ticker] = temel_bilgi(ticker)
+        return self.bilgiler[ticker]
+
+def _ozet_teknik(hist: pd.DataFrame) -> dict:
+    c=hist["Close"]; v=hist["Volume"]
+    return dict(
+        fiyat=round(c.iloc[-1],2),
+        degisim_1ay=round((c.iloc[-1]/c.iloc[-22]-1)*100,2) if len(c)>=22 else 0,
+        degisim_3ay=round((c.iloc[-1]/c.iloc[0]-1)*100,2),
+        hacim_son=round(v.iloc[-1],0), hacim_ort=round(v.mean(),0),
+        hacim_anomali=round(v.iloc[-1]/v.mean(),2) if v.mean()>0 else 0,
+        rsi_14=hesapla_rsi(c),
+    )
+
+def filtre_teknikleri(m: PiyasaMatrisi) -> dict:
+    """
+    Filtre aşamasının fiyat/hacim/RSI alanları — tüm evren için sütun bazlı,
+    _ozet_teknik ile aynı formüller. Sadece kesintisiz ve ≥20 barlık tickerlar
+    döner; diğerleri için hisse_ozet_cek kendi geçmişinden hesaplar.
+    Dönüş: {ticker: {alan: değer}}
+    """
+    c=m.close; v=m.volume; n=m.bar_sayisi
+    if not len(c): return {}
+    son=m.son(c); hacim_son=m.son(v); hacim_ort=v.mean()
+    ay1=c.iloc[-22] if len(c)>=22 else pd.Series(np.nan, index=c.columns)
+    tablo=pd.DataFrame({
+        "fiyat":         son.round(2),
+        "degisim_1ay":   ((son/ay1-1)*100).round(2).where(n>=22, 0),
+        "degisim_3ay":   ((son/c.bfill().iloc[0]-1)*100).round(2),
+        "hacim_son":     hacim_son.round(0),
+        "hacim_ort":     hacim_ort.round(0),
+        "hacim_anomali": (hacim_son/hacim_ort).round(2).where(hacim_ort>0, 0),
+        "rsi_14":        m.son(m.rsi()).round(2),
+    })
+    return tablo[m.kesintisiz & (n>=20)].to_dict("index")
+
+def hisse_ozet_cek(ticker: str, hist: Optional[pd.DataFrame] = None,
+                   info: Optional[dict] = None, teknik: Optional[dict] = None) -> Optional[HisseOzet]:
     try:
-        t=yf.Ticker(ticker); info=t.info; hist=t.history(period="3mo")
-        if hist.empty or len(hist)<20: return None
-        c=hist["Close"]; v=hist["Volume"]
+        if info is None: info=temel_bilgi(ticker)
+        if info is None: return None
+        if teknik is None:
+            if hist is None: hist=fiyat_gecmisi(ticker, period="3mo")
+            if hist is None or len(hist)<20: return None
+            teknik=_ozet_teknik(hist)
         return HisseOzet(
             ticker=ticker.replace(".IS",""), isim=info.get("longName",ticker),
             sektor=info.get("sector","Bilinmiyor"),
-            fiyat=round(c.iloc[-1],2),
-            degisim_1ay=round((c.iloc[-1]/c.iloc[-22]-1)*100,2) if len(c)>=22 else 0,
-            degisim_3ay=round((c.iloc[-1]/c.iloc[0]-1)*100,2),
-            hacim_son=round(v.iloc[-1],0), hacim_ort=round(v.mean(),0),
-            hacim_anomali=round(v.iloc[-1]/v.mean(),2) if v.mean()>0 else 0,
-            rsi_14=hesapla_rsi(c),
+            **teknik,
             fk_orani=_to_float(info.get("trailingPE")),
             pd_dd=_to_float(info.get("priceToBook")),
             piyasa_degeri_m=round(info.get("marketCap",0)/1e6,0) if info.get("marketCap") else None,
@@ -708,138 +753,103 @@ def hisse_ozet_cek(ticker: str) -> Optional[HisseOzet]:
         )
     except: return None
 
+OZET_SAYISAL = ["degisim_1ay", "degisim_3ay", "hacim_anomali", "rsi_14", "fk_orani", "pd_dd",
+                "piyasa_degeri_m", "serbest_dolasim", "gelir_m"]
+
+def ozet_tablosu(ozetler) -> pd.DataFrame:
+    """
+    Filtre skorlarının kural tablosu (satır = HisseOzet, indeks ticker):
+    OZET_SAYISAL alanları float (eksik → NaN) + zorunlu/holding/savunma bayrakları.
+    """
+    tablo = pd.DataFrame({a: [_to_float(getattr(h, a)) for h in ozetler] for a in OZET_SAYISAL},
+                         index=[h.ticker for h in ozetler], dtype=float)
+    tablo["zorunlu"] = [_is_zorunlu(h.ticker) for h in ozetler]
+    tablo["holding"] = [_is_holding(h.sektor) for h in ozetler]
+    tablo["savunma"] = [_is_savunma(h.sektor) for h in ozetler]
+    return tablo
+
+# Puanlar ve eşikler kurallar.json'un "manipulasyon" / "balon" / "kalite" bölümlerinde
 def manipulasyon_skoru_hesapla(h: HisseOzet) -> float:
-    s=0.0
-    if h.hacim_anomali>10: s+=35
-    elif h.hacim_anomali>5: s+=20
-    elif h.hacim_anomali>3: s+=10
-    if h.rsi_14>85: s+=20
-    elif h.rsi_14>80: s+=12
-    if h.degisim_1ay>200: s+=25
-    elif h.degisim_1ay>100: s+=18
-    elif h.degisim_1ay>50: s+=8
-    if h.serbest_dolasim and h.serbest_dolasim<5_000_000: s+=20
-    elif h.serbest_dolasim and h.serbest_dolasim<20_000_000: s+=10
-    return min(s,100.0)
+    return float(KURAL_PLANI.puanla("manipulasyon", ozet_tablosu([h]))[0])
 
 def balon_skoru_hesapla(h: HisseOzet) -> float:
-    if _is_zorunlu(h.ticker): return 0.0
-    s=0.0
-    fk=_to_float(h.fk_orani); pddd=_to_float(h.pd_dd)
-    pdm=_to_float(h.piyasa_degeri_m); gelir=_to_float(h.gelir_m)
-    sektor = h.sektor.lower()
-    is_hold = _is_holding(sektor); is_savun = _is_savunma(sektor)
-    if fk is not None:
-        if fk < 0:       s += 30
-        elif fk > 200:   s += 30
-        elif fk > 100 and not (is_hold or is_savun): s += 20
-        elif fk > 50  and not (is_hold or is_savun): s += 10
-    elif not is_hold:    s += 15
-    if pddd:
-        if pddd > 50:    s += 25
-        elif pddd > 20:  s += 15
-        elif pddd > 10:  s += 8
-    if pdm and gelir and gelir > 0:
-        pg = pdm / gelir
-        if pg > 100:     s += 30
-        elif pg > 50:    s += 20
-        elif pg > 20 and not is_hold: s += 8
-    if h.degisim_3ay > 300:   s += 15
-    elif h.degisim_3ay > 150: s += 8
-    return min(s, 100.0)
+    return float(KURAL_PLANI.puanla("balon", ozet_tablosu([h]))[0])
 
 def kalite_skoru_hesapla(h: HisseOzet) -> float:
-    if _is_zorunlu(h.ticker): return 88.0
-    sektor = h.sektor.lower()
-    is_hold = _is_holding(sektor); is_savun = _is_savunma(sektor)
-    s = 50.0
-    fk = _to_float(h.fk_orani); pddd = _to_float(h.pd_dd)
-    if fk is not None:
-        if is_hold:   pass
-        elif is_savun:
-            if 15 < fk < 120: s += 15
-            elif fk < 0:       s -= 15
-        else:
-            if 4 < fk < 15:    s += 20
-            elif 15 <= fk < 25: s += 10
-            elif fk >= 25:      s -= 5
-    elif is_hold: s += 5
-    if pddd:
-        if pddd < 1.5:   s += 15
-        elif pddd < 3.0: s += 8
-        elif pddd > 8.0 and not is_hold: s -= 8
-    if 40 < h.rsi_14 < 60:    s += 10
-    elif 30 < h.rsi_14 <= 40: s += 15
-    elif h.rsi_14 > 70:        s -= 10
-    if 5 < h.degisim_3ay < 40:  s += 10
-    elif h.degisim_3ay < 0:     s -= 5
-    if 0.5 < h.hacim_anomali < 3: s += 5
-    return min(max(s, 0), 100.0)
-
-def hisse_derin_cek(ticker: str, ozet: HisseOzet) -> Optional[HisseDerin]:
+    return float(KURAL_PLANI.puanla("kalite", ozet_tablosu([h]))[0])
+
+def filtre_skorla(ozetler: list) -> pd.DataFrame:
+    """
+    Filtre Agent'ın tek geçişlik puanlaması: ozet_tablosu üzerinde üç skor,
+    manipülasyon/balon kalite cezası ve seçim maskesi.
+    Satırlar kalite skoruna göre sıralıdır (eşitlikte tarama sırası korunur);
+    "konum" satırın ozetler listesindeki yeri; "secildi" zorunlular + eşikleri
+    geçen en iyi (FILTRE_LIMIT - zorunlu sayısı) hisse. Derin analize önce
+    zorunlular girer.
+    """
+    tablo = ozet_tablosu(ozetler)
+    m = KURAL_PLANI.puanla("manipulasyon", tablo)
+    b = KURAL_PLANI.puanla("balon", tablo)
+    k = KURAL_PLANI.puanla("kalite", tablo)
+    k = np.where(m >= MANIPULASYON_ESIK, 0.0,
+                 np.where(b >= BALON_ESIK, np.maximum(0.0, k - BALON_KALITE_CEZA), k))
+    tablo["manipulasyon_skoru"], tablo["balon_skoru"], tablo["kalite_skoru"] = m, b, k
+    tablo["konum"] = np.arange(len(tablo))
+    tablo = tablo.iloc[np.argsort(-k, kind="stable")]
+
+    zorunlu = tablo["zorunlu"].to_numpy(dtype=bool)
+    aday = (~zorunlu & (tablo["manipulasyon_skoru"].to_numpy() < MANIPULASYON_ESIK)
+                     & (tablo["balon_skoru"].to_numpy() < BALON_ESIK))
+    aday &= np.cumsum(aday) <= max(FILTRE_LIMIT - zorunlu.sum(), 0)
+    tablo["secildi"] = zorunlu | aday
+    return tablo
+
+def _temel_alanlari(info: dict) -> dict:
+    """Kural motorunun temel puan alanları (HisseDerin birimleriyle)."""
+    roe=_to_float(info.get("returnOnEquity")); de2=_to_float(info.get("debtToEquity"))
+    fcf=info.get("freeCashflow"); rg=_to_float(info.get("revenueGrowth"))
+    return dict(
+        fk_orani=_to_float(info.get("trailingPE")),
+        roe=round(roe*100,1) if roe else None,
+        borc_ozsermaye=round(de2,2) if de2 else None,
+        fcf_m=round(fcf/1e6,0) if fcf else None,
+        gelir_buyume_yoy=round(rg*100,1) if rg else None,
+    )
+
+def hisse_derin_cek(ticker: str, ozet: HisseOzet, hist: Optional[pd.DataFrame] = None,
+                    info: Optional[dict] = None, paket: Optional[VeriPaketi] = None) -> Optional[HisseDerin]:
     try:
-        t=yf.Ticker(ticker); info=t.info; hist=t.history(period=PERIOD)
-        if hist.empty or len(hist)<60: return None
-        c=hist["Close"]; v=hist["Volume"]; h=hist["High"]; l=hist["Low"]; o=hist["Open"]
-        fiyat=c.iloc[-1]
-        mv,ms,mh,macd_s,_ = hesapla_macd(c)
-        bu,bo,ba,bp       = hesapla_bollinger(c)
-        sk,sd             = hesapla_stochastic(h,l,c)
-        at                = hesapla_atr(h,l,c)
-        adx_v             = hesapla_adx(h,l,c)
-        ob                = hesapla_obv(c,v)
-        de,di             = hesapla_destek_direnc(c)
-        fi                = hesapla_fibonacci(c)
-        ich               = hesapla_ichimoku(h,l,c)
-        sar_v, sar_y      = hesapla_parabolic_sar(h,l,c)
-        gc, sma50, sma200 = golden_death_cross(c)
-        rsi_s = pd.Series([hesapla_rsi(c.iloc[:i+1]) for i in range(len(c))])
-        ri = rsi_iraksama(c, rsi_s)
-        mi = macd_iraksama(c, macd_s)
-        oi = obv_iraksama(c, v)
-        mf = mum_formasyonlari(o,h,l,c)
-        sh = hesapla_sharpe(c)
-        md = hesapla_max_drawdown(c)
-        vol    = round(c.pct_change().std()*(252**0.5),4)
-        yillik = round(c.pct_change().mean()*252, 4)
-        kf = kelly_criterion(yillik, vol)
-        roe=_to_float(info.get("returnOnEquity")); roa=_to_float(info.get("returnOnAssets"))
-        de2=_to_float(info.get("debtToEquity")); fcf=info.get("freeCashflow"); rg=_to_float(info.get("revenueGrowth"))
+        if info is None: info=temel_bilgi(ticker)
+        if info is None: return None
+        # paket verildiyse fiyat (gerekirse indirme dahil) iş parçacığının içinde alınır
+        if hist is None: hist=paket.fiyat(ticker) if paket else fiyat_gecmisi(ticker, period=PERIOD)
+        if hist is None or len(hist)<60: return None
+        g=gostergeleri_hesapla(hist)
+        roa=_to_float(info.get("returnOnAssets"))
 
         hisse = HisseDerin(
             ticker=ticker.replace(".IS",""), isim=ozet.isim, sektor=ozet.sektor,
-            fiyat=round(fiyat,2),
-            degisim_1g=round((c.iloc[-1]/c.iloc[-2]-1)*100,2),
-            degisim_1h=round((c.iloc[-1]/c.iloc[-5]-1)*100,2) if len(c)>=5 else None,
-            degisim_6ay=round((c.iloc[-1]/c.iloc[0]-1)*100,2),
-            rsi_14=hesapla_rsi(c), stoch_k=sk, stoch_d=sd,
-            macd=mv, macd_sinyal=ms, macd_hist=mh,
-            sma_50=round(sma50,2) if sma50 else None,
-            sma_200=round(sma200,2) if sma200 else None,
-            bb_ust=bu, bb_orta=bo, bb_alt=ba, bb_pct=bp,
-            atr=at, volatilite=round(vol*100,2), yillik_getiri=round(yillik*100,2),
-            obv_trend=ob, hacim_ort=info.get("averageVolume"),
-            destek=de, direnc=di, fib=fi,
-            adx=adx_v, golden_cross_durum=gc,
-            ichimoku=ich, sar_deger=sar_v, sar_yon=sar_y,
-            rsi_iraksama=ri, macd_iraksama=mi, obv_iraksama=oi,
-            mum_formasyonlari=mf,
-            fk_orani=_to_float(info.get("trailingPE")),
+            fiyat=g.fiyat, degisim_1g=g.degisim_1g, degisim_1h=g.degisim_1h, degisim_6ay=g.degisim_6ay,
+            rsi_14=g.rsi_14, stoch_k=g.stoch_k, stoch_d=g.stoch_d,
+            macd=g.macd, macd_sinyal=g.macd_sinyal, macd_hist=g.macd_hist,
+            sma_50=g.sma_50, sma_200=g.sma_200,
+            bb_ust=g.bb_ust, bb_orta=g.bb_orta, bb_alt=g.bb_alt, bb_pct=g.bb_pct,
+            atr=g.atr, volatilite=round(g.volatilite*100,2), yillik_getiri=round(g.yillik_getiri*100,2),
+            obv_trend=g.obv_trend, hacim_ort=info.get("averageVolume"),
+            destek=g.destek, direnc=g.direnc, fib=g.fib, sd_bolgeleri=g.sd_bolgeleri,
+            adx=g.adx, golden_cross_durum=g.golden_cross_durum,
+            ichimoku=g.ichimoku, sar_deger=g.sar_deger, sar_yon=g.sar_yon,
+            rsi_iraksama=g.rsi_iraksama, macd_iraksama=g.macd_iraksama, obv_iraksama=g.obv_iraksama,
+            mum_formasyonlari=g.mum_formasyonlari, mum_istatistik=g.mum_istatistik,
+            **_temel_alanlari(info),
             pd_dd=_to_float(info.get("priceToBook")),
             temettü_verimi=round(info.get("dividendYield",0)*100,2) if info.get("dividendYield") else None,
             piyasa_degeri_m=round(info.get("marketCap",0)/1e6,0) if info.get("marketCap") else None,
-            roe=round(roe*100,1) if roe else None,
             roa=round(roa*100,1) if roa else None,
-            borc_ozsermaye=round(de2,2) if de2 else None,
-            fcf_m=round(fcf/1e6,0) if fcf else None,
-            gelir_buyume_yoy=round(rg*100,1) if rg else None,
-            sharpe=sh, max_drawdown=md, kelly_f=kf,
+            sharpe=g.sharpe, max_drawdown=g.max_drawdown, kelly_f=g.kelly_f,
             manipulasyon_skoru=ozet.manipulasyon_skoru,
             balon_skoru=ozet.balon_skoru,
         )
-        # Çoklu yöntem hedef fiyat — info dict'i de geçir (analist konsensüsü için)
-        hisse.hedef_analiz = hedef_fiyat_hesapla(hisse, bilgi=info)
-        hisse.kural_sonuc  = kural_motoru_hesapla(hisse)
         return hisse
     except Exception as e:
         console.print(f"[yellow]Derin: {ticker} → {e}[/yellow]")
@@ -847,12 +857,13 @@ def hisse_derin_cek(ticker: str, ozet: HisseOzet) -> Optional[HisseDerin]:
 
 # ── Korelasyon Matrisi ─────────────────────────────────────────
 
-def korelasyon_matrisi_hesapla(hisseler: list) -> pd.DataFrame:
+def korelasyon_matrisi_hesapla(hisseler: list, paket: Optional[VeriPaketi] = None) -> pd.DataFrame:
     veriler = {}
     for h in hisseler:
         try:
-            hist = yf.Ticker(h.ticker+".IS").history(period="3mo")
-            if not hist.empty:
+            if paket is not None: hist = paket.fiyat(h.ticker+".IS", period="3mo")
+            else:                 hist = fiyat_gecmisi(h.ticker+".IS", period="3mo")
+            if hist is not None:
                 veriler[h.ticker] = hist["Close"].pct_change().dropna()
         except: pass
     if len(veriler) < 2: return pd.DataFrame()
@@ -891,11 +902,42 @@ def ticker_tespit(metin: str) -> list:
     up=metin.upper()
     return [t.replace(".IS","") for t in BIST100_TICKERS if t.replace(".IS","") in up]
 
-def rss_cek() -> list:
+KAP_API_ADRESLERI = [
+    "https://www.kap.org.tr/tr/api/disclosureQuery?startFrom=0&take=50",
+    "https://www.kap.org.tr/tr/api/disclosure?index=0&count=50",
+]
+KAP_RSS_ADRESLERI = ["https://www.kap.org.tr/tr/rss/ozel-durum","https://www.kap.org.tr/tr/rss/finansal-rapor"]
+KAP_SORGU_ADRESI  = "https://www.kap.org.tr/tr/bildirim-sorgu"
+KAP_API_HEADERS   = {**HEADERS,"Accept":"application/json, text/plain, */*",
+                     "Referer":"https://www.kap.org.tr/tr/bildirim-sorgu"}
+
+def _rss_istekleri() -> list:
+    return [(k["url"],HEADERS) for k in RSS_KAYNAKLARI]
+
+def _resmi_istekleri() -> list:
+    return [(k["url"],HEADERS) for k in RESMI_KAYNAKLAR]
+
+def _kap_istekleri() -> list:
+    return ([(u,KAP_API_HEADERS) for u in KAP_API_ADRESLERI] +
+            [(u,HEADERS) for u in KAP_RSS_ADRESLERI] + [(KAP_SORGU_ADRESI,HEADERS)])
+
+def haberleri_topla(portfoy_tickers: list = None) -> tuple:
+    """
+    RSS + resmi kurum + KAP kaynaklarını tek seferde paralel ister
+    (haber_toplayici, ortak son süre). Dönüş: (tüm haberler, KAP haberleri)
+    """
+    yanitlar = kaynaklari_getir(_rss_istekleri() + _resmi_istekleri() + _kap_istekleri())
+    kap_h = kap_bildirim_cek(portfoy_tickers, yanitlar)
+    return rss_cek(yanitlar) + resmi_cek(yanitlar) + kap_h, kap_h
+
+def rss_cek(yanitlar: Optional[dict] = None) -> list:
+    if yanitlar is None: yanitlar = kaynaklari_getir(_rss_istekleri())
     haberler=[]
     for k in RSS_KAYNAKLARI:
         try:
-            feed=feedparser.parse(k["url"])
+            r=yanitlar.get(k["url"])
+            if r is None: continue
+            feed=feedparser.parse(r.content)
             for e in feed.entries[:25]:
                 baslik=e.get("title","")
                 ozet=BeautifulSoup(e.get("summary",e.get("description","")),"html.parser").get_text()[:300]
@@ -905,21 +947,17 @@ def rss_cek() -> list:
         except: pass
     return haberler
 
-def kap_bildirim_cek(portfoy_tickers: list = None) -> list:
+def kap_bildirim_cek(portfoy_tickers: list = None, yanitlar: Optional[dict] = None) -> list:
+    if yanitlar is None: yanitlar = kaynaklari_getir(_kap_istekleri())
     haberler = []
     KRITIK_TIPLER = {
         "FR":"Finansal Rapor","DD":"Özel Durum","DP":"Temettü","GG":"Genel Kurul",
         "PA":"Pay Alım","SR":"Sözleşme","BF":"Bilanço","MK":"Önemli Gelişme",
     }
-    kap_endpoints = [
-        "https://www.kap.org.tr/tr/api/disclosureQuery?startFrom=0&take=50",
-        "https://www.kap.org.tr/tr/api/disclosure?index=0&count=50",
-    ]
-    for endpoint in kap_endpoints:
+    for endpoint in KAP_API_ADRESLERI:
         try:
-            r = requests.get(endpoint, headers={**HEADERS,"Accept":"application/json, text/plain, */*",
-                             "Referer":"https://www.kap.org.tr/tr/bildirim-sorgu"}, timeout=12)
-            if r.status_code == 200 and r.text.strip().startswith("["):
+            r = yanitlar.get(endpoint)
+            if r is not None and r.status_code == 200 and r.text.strip().startswith("["):
                 for b in r.json()[:60]:
                     baslik = (b.get("headline") or b.get("title") or b.get("disclosureClass") or "")[:200]
                     ticker = (b.get("stockCode") or b.get("memberCode") or "").strip()
@@ -935,9 +973,11 @@ def kap_bildirim_cek(portfoy_tickers: list = None) -> list:
                         ilgili_hisseler=[ticker] if ticker else ticker_tespit(baslik)))
                 if haberler: return haberler
         except: continue
-    for rss_url in ["https://www.kap.org.tr/tr/rss/ozel-durum","https://www.kap.org.tr/tr/rss/finansal-rapor"]:
+    for rss_url in KAP_RSS_ADRESLERI:
         try:
-            feed = feedparser.parse(rss_url)
+            r = yanitlar.get(rss_url)
+            if r is None: continue
+            feed = feedparser.parse(r.content)
             for e in feed.entries[:30]:
                 baslik = e.get("title","")
                 ozet   = BeautifulSoup(e.get("summary",e.get("description","")),"html.parser").get_text()[:300]
@@ -952,7 +992,8 @@ def kap_bildirim_cek(portfoy_tickers: list = None) -> list:
         except: continue
     if haberler: return haberler
     try:
-        r = requests.get("https://www.kap.org.tr/tr/bildirim-sorgu", headers=HEADERS, timeout=12)
+        r = yanitlar.get(KAP_SORGU_ADRESI)
+        if r is None: return haberler
         soup = BeautifulSoup(r.text, "html.parser")
         for sel in ["div.comp-row","div.w-clearfix.w-inline-block","tr.disclosure-row"]:
             satirlar = soup.select(sel)[:25]
@@ -970,11 +1011,13 @@ def kap_bildirim_cek(portfoy_tickers: list = None) -> list:
     except: pass
     return haberler
 
-def resmi_cek() -> list:
+def resmi_cek(yanitlar: Optional[dict] = None) -> list:
+    if yanitlar is None: yanitlar = kaynaklari_getir(_resmi_istekleri())
     haberler=[]
     for k in RESMI_KAYNAKLAR:
         try:
-            r=requests.get(k["url"],headers=HEADERS,timeout=12)
+            r=yanitlar.get(k["url"])
+            if r is None: continue
             soup=BeautifulSoup(r.text,"html.parser")
             for satir in soup.select(k["selector"])[:15]:
                 metin=satir.get_text(" ",strip=True)
@@ -1028,11 +1071,20 @@ class FinansalAjanlar:
                 console.print("[dim]LLM: Cerebras aktif[/dim]")
             except Exception as e:
                 console.print(f"[yellow]Cerebras başlatılamadı: {e}[/yellow]")
-        if not self.groq_client and not self.cerebras_client:
+        if not self.groq_client and not self.cerebras_client and not kayit_oynat.oynatiliyor():
             raise EnvironmentError("Ne GROQ_API_KEY ne de CEREBRAS_API_KEY bulunamadı.")
         self.hafiza = []
 
     def _llm(self, sistem, mesaj, sicaklik=0.3, max_token=1500):
+        # Prompt'lar tarih içerdiği için kaset anahtarı çağrı sırasıdır
+        try:
+            return kayit_oynat.kayitli("llm", kayit_oynat.sirali_anahtar("llm"),
+                                       lambda: self._llm_cagir(sistem, mesaj, sicaklik, max_token))
+        except kayit_oynat.KasetEksik as e:
+            console.print(f"[yellow]{e}[/yellow]")
+            return ""
+
+    def _llm_cagir(self, sistem, mesaj, sicaklik, max_token):
         if self.groq_client:
             try:
                 r = self.groq_client.chat.completions.create(
@@ -1116,7 +1168,7 @@ Hedef fiyatlar artık 6 yöntem konsensüsüne (Fib, Direnç, ATR 1:3, BB, Anali
 Görev: 1.BIST genel 2.Sektör+korelasyon 3.Elinen kısa not 4.Top8 detay 5.Kelly ağırlıkları 6.Görünüm
 Türkçe, profesyonel yaz."""
         mesaj=(f"BIST100 GENEL:\n{bist_ozet}\n\nKORELASYON: {kor_ozet}\n\n"
-               f"ELİNEN:{', '.join([e['ticker'] for e in elinen[:10]])}\n\n"
+               f"ELİNEN:{', '.join([e['ticker'] for e in elinen[:ELINEN_GOSTER]])}\n\n"
                f"TOP HİSSELER (kural puanı sıralı):\n{piyasa_oz}\n\n"
                f"PIYASA DURUMU:{sentiment.get('genel_durum','?')} | "
                f"KRİTİK:{' | '.join(sentiment.get('kritik',[])[:2])}")
@@ -1160,12 +1212,17 @@ YANIT FORMAT:
                     if abs(float(kor_df.loc[a,b]))>0.8]
             if yuksek: kor_str="Yüksek korelasyon: " + ", ".join([f"{a}-{b}:{c}" for a,b,c in yuksek[:8]])
 
+        def _mum_etiket(h, f):
+            ist = (h.mum_istatistik or {}).get(f)
+            if not ist: return f
+            return f + f"[{ist['ornek']}x {MUM_UFUK}G:{ist['ort']:+.1f}% ↑%{ist['pozitif']*100:.0f}]"
+
         def _hs(h):
             kr  = h.kural_sonuc
             ich = h.ichimoku or {}
             ha  = h.hedef_analiz or {}
-            form = ",".join(h.mum_formasyonlari[:2]) if h.mum_formasyonlari else "Yok"
-            ira  = f"RSI:{h.rsi_iraksama[:3]} MACD:{h.macd_iraksama[:3]} OBV:{h.obv_iraksama[:3]}"
+            form = ",".join(_mum_etiket(h, f) for f in h.mum_formasyonlari[:2]) if h.mum_formasyonlari else "Yok"
+            ira  = f"RSI:{_ira(h.rsi_iraksama)} MACD:{_ira(h.macd_iraksama)} OBV:{_ira(h.obv_iraksama)}"
             # Hedef detay özeti
             hedef_kons = ha.get("hedef","N/A")
             hedef_yont = ha.get("yontem","?")
@@ -1174,9 +1231,13 @@ YANIT FORMAT:
             fib127_h   = detay.get("fib127",{}).get("fiyat","N/A") if detay else "N/A"
             direnc_h   = detay.get("direnc",{}).get("fiyat","N/A") if detay else "N/A"
             fib_raw    = h.fib or {}
+            sdb        = h.sd_bolgeleri or {}
+            bolge_d    = ",".join(str(b["seviye"]) for b in sdb.get("destekler",[])[:2]) or "N/A"
+            bolge_r    = ",".join(str(b["seviye"]) for b in sdb.get("direncler",[])[:2]) or "N/A"
             return (
                 h.ticker + ":" + str(h.fiyat) + "TL"
                 + f" | ATR:{h.atr} | Destek:{h.destek} | Direnc:{h.direnc}"
+                + f" | PivotD:{bolge_d} | PivotR:{bolge_r}"
                 + f" | HedefKons:{hedef_kons}({hedef_yont})"
                 + f" | H_Analist:{analist_h} | H_Fib127:{fib127_h} | H_Direnc:{direnc_h}"
                 + f" | H_Fib162:{fib_raw.get('1.618','N/A')}"
@@ -1346,7 +1407,7 @@ def portfoy_kurallari_uygula(portfoy: dict, hisseler: list, kor_df) -> dict:
         ha = hedef_map.get(t) or {}
         yontem = ha.get("yontem","?")
         ek = (f"KP:{kp:.0f} ADX:{_fmt(adx,'{:.0f}')} Ich:{ich} SAR:{sar} "
-              f"Ira[RSI:{rsi_ira[:3]} MACD:{macd_ira[:3]} OBV:{obv_ira[:3]}] "
+              f"Ira[RSI:{_ira(rsi_ira)} MACD:{_ira(macd_ira)} OBV:{_ira(obv_ira)}] "
               f"Form:{form_s} Sharpe:{_fmt(sh,'{:.2f}')} HedefYont:{yontem}")
         mevcut = k.get("gerekce","")
         if "KP:" not in mevcut:
@@ -1367,8 +1428,9 @@ def filtre_tablosu(ozetler, secilen, elinen):
                    ("Balon",{"justify":"right"}),("Kalite",{"justify":"right"}),
                    ("Sonuç",{"justify":"center"})]:
         t.add_column(col,**kw)
+    secilen_t={s.ticker for s in secilen}
     for h in sorted(ozetler,key=lambda x:x.kalite_skoru,reverse=True):
-        secildi=h.ticker in [s.ticker for s in secilen]
+        secildi=h.ticker in secilen_t
         rm="red" if h.manipulasyon_skoru>50 else "yellow" if h.manipulasyon_skoru>30 else "green"
         rb="red" if h.balon_skoru>50 else "yellow" if h.balon_skoru>30 else "green"
         t.add_row(h.ticker,f"{h.degisim_1ay:+.1f}%",f"{h.rsi_14:.0f}",f"{h.hacim_anomali:.1f}x",
@@ -1378,7 +1440,7 @@ def filtre_tablosu(ozetler, secilen, elinen):
             "[green]✓[/green]" if secildi else "[red]✗[/red]")
     console.print(t)
     ym=[h for h in elinen if h.manipulasyon_skoru>=MANIPULASYON_ESIK]
-    yb=[h for h in elinen if h.balon_skoru>=BALON_ESIK and h not in ym]
+    yb=[h for h in elinen if h.balon_skoru>=BALON_ESIK and h.manipulasyon_skoru<MANIPULASYON_ESIK]
     if ym: rprint(f"\n[bold red]⚠️  Manipülasyon ({len(ym)}):[/bold red] "+", ".join([f"{h.ticker}({h.manipulasyon_skoru:.0f})" for h in ym]))
     if yb: rprint(f"[bold yellow]🫧  Balon ({len(yb)}):[/bold yellow] "+", ".join([f"{h.ticker}({h.balon_skoru:.0f})" for h in yb]))
 
@@ -1397,7 +1459,7 @@ def kural_tablosu(hisseler):
         gc_renk="green" if "GOLDEN" in kr.golden_cross else "red" if "DEATH" in kr.golden_cross else "white"
         sar_renk="green" if kr.sar_yon=="YUKARI" else "red"
         formlar=", ".join(kr.mum_formasyonlar[:2]) if kr.mum_formasyonlar else "—"
-        ira_str=f"R:{kr.rsi_iraksama[:3]} M:{kr.macd_iraksama[:3]} O:{kr.obv_iraksama[:3]}"
+        ira_str=f"R:{_ira(kr.rsi_iraksama)} M:{_ira(kr.macd_iraksama)} O:{_ira(kr.obv_iraksama)}"
         hedef_k = str(h.hedef_analiz.get("hedef","N/A")) if h.hedef_analiz else "N/A"
         t.add_row(h.ticker,f"{kr.teknik_puan:.0f}",f"{kr.temel_puan:.0f}",
             f"[{rt}]{kr.toplam_puan:.0f}[/]",
@@ -1499,7 +1561,7 @@ def portfoy_kaydet(portfoy: dict, hisseler: list):
         json.dump(kayit, f, ensure_ascii=False, indent=2)
     return kayit
 
-def pnl_hesapla_goster(hisseler: list):
+def pnl_hesapla_goster(hisseler: list, hedefler: np.ndarray = None):
     if not os.path.exists(PORTFOY_KAYIT_DOSYA):
         rprint("[yellow]📋 Kayıtlı portföy bulunamadı — ilk çalıştırma.[/yellow]")
         return
@@ -1508,9 +1570,17 @@ def pnl_hesapla_goster(hisseler: list):
     if not kayit.get("pozisyonlar"): return
 
     fiyat_map = {h.ticker: h.fiyat for h in hisseler}
-    fib_map   = {h.ticker: h.fib   for h in hisseler if h.fib}
-    atr_map   = {h.ticker: h.atr   for h in hisseler if h.atr}
     ha_map    = {h.ticker: h.hedef_analiz for h in hisseler if h.hedef_analiz}
+    # Yöntem hedefleri ve ATR hedef motorunun dizisinden (verilmediyse info'suz hesap)
+    if hedefler is None:
+        hedefler = hedefleri_hesapla(hedef_girdi_tablosu(hisseler, holding=_is_holding))
+    hedef_satir = {str(t): i for i, t in enumerate(hedefler["ticker"])}
+
+    def _alan(ticker, ad):
+        i = hedef_satir.get(ticker)
+        if i is None: return None
+        v = float(hedefler[ad][i])
+        return v if v and not np.isnan(v) else None
 
     # ── Hedef & Trailing Stop Güncelleme (v4.1) ───────────────────────────────
     for ticker, poz in kayit["pozisyonlar"].items():
@@ -1523,12 +1593,10 @@ def pnl_hesapla_goster(hisseler: list):
         hedef_eski = poz.get("hedef") or 0
         if hedef_eski and guncel >= hedef_eski:
             ha  = ha_map.get(ticker, {})
-            fib = fib_map.get(ticker, {})
-            detay = ha.get("detay",{}) if ha else {}
             # Öncelik sırası: konsensüs → Fib162 → Fib127 → +12%
-            konsensus = ha.get("hedef") if ha else None
-            fib162    = fib.get("1.618") if fib else None
-            fib127    = fib.get("1.272") if fib else None
+            konsensus = _alan(ticker, "hedef")
+            fib162    = _alan(ticker, "fib162")
+            fib127    = _alan(ticker, "fib127")
             yeni_hedef = None
             if konsensus and konsensus > guncel:
                 yeni_hedef = konsensus
@@ -1545,7 +1613,7 @@ def pnl_hesapla_goster(hisseler: list):
             poz["hedef"] = yeni_hedef
 
         # Trailing Stop — kâr %15+ ise yukarı taşı
-        atr      = atr_map.get(ticker)
+        atr      = _alan(ticker, "atr")
         stop_eski = poz.get("stop") or 0
         if pnl_pct > 30 and atr:
             trailing = round(guncel - 1.0 * atr, 2)
@@ -1716,58 +1784,79 @@ def main():
     # ── 1. Filtre Agent ──────────────────────────────────────
     console.rule("[bold cyan]🔍 FİLTRE AGENT[/bold cyan]")
     ozetler=[]
+    paket=VeriPaketi()
+    with console.status("[cyan]Fiyat geçmişi toplu indiriliyor...[/cyan]"):
+        paket.fiyatlari_yukle(BIST100_TICKERS)
+    with console.status("[cyan]Temel veriler (info) önbellekten yükleniyor...[/cyan]"):
+        paket.bilgileri_yukle(BIST100_TICKERS)
+    # Fiyat/hacim/RSI alanları tüm evren için tek matristen
+    teknikler=filtre_teknikleri(paket.matris("3mo"))
     with Progress(SpinnerColumn(),TextColumn("{task.description}"),console=console) as prog:
         task=prog.add_task("Taranıyor...",total=len(BIST100_TICKERS))
         for ticker in BIST100_TICKERS:
             prog.update(task,description=f"Tarıyor: {ticker}")
-            ozet=hisse_ozet_cek(ticker)
-            if ozet:
-                ozet.manipulasyon_skoru=manipulasyon_skoru_hesapla(ozet)
-                ozet.balon_skoru=balon_skoru_hesapla(ozet)
-                ozet.kalite_skoru=kalite_skoru_hesapla(ozet)
-                if ozet.manipulasyon_skoru>=MANIPULASYON_ESIK: ozet.kalite_skoru=0
-                elif ozet.balon_skoru>=BALON_ESIK: ozet.kalite_skoru=max(0,ozet.kalite_skoru-40)
-                ozetler.append(ozet)
-            time.sleep(0.2); prog.advance(task)
-
-    ozetler.sort(key=lambda x:x.kalite_skoru,reverse=True)
-    zorunlu_oz = [o for o in ozetler if _is_zorunlu(o.ticker)]
-    normal_oz  = [o for o in ozetler if not _is_zorunlu(o.ticker)
-                  and o.manipulasyon_skoru < MANIPULASYON_ESIK
-                  and o.balon_skoru < BALON_ESIK]
-    kalan_slot = FILTRE_LIMIT - len(zorunlu_oz)
-    secilen_oz = zorunlu_oz + normal_oz[:max(kalan_slot, 0)]
-    elinen_oz  = [o for o in ozetler if o not in secilen_oz]
-
-    pozitif=sum(1 for o in ozetler if o.degisim_3ay>0)
+            tk=teknikler.get(ticker)
+            ozet=hisse_ozet_cek(ticker, hist=None if tk else paket.fiyat(ticker, period="3mo"),
+                                info=paket.bilgi(ticker), teknik=tk)
+            if ozet: ozetler.append(ozet)
+            prog.advance(task)
+
+    # Üç skor + seçim maskesi tüm evren için tek tabloda
+    ftablo=filtre_skorla(ozetler)
+    ozetler=[ozetler[i] for i in ftablo["konum"]]
+    for o, m, b, k in zip(ozetler, ftablo["manipulasyon_skoru"], ftablo["balon_skoru"], ftablo["kalite_skoru"]):
+        o.manipulasyon_skoru, o.balon_skoru, o.kalite_skoru = float(m), float(b), float(k)
+    secildi=ftablo["secildi"].to_numpy(); zorunlu=ftablo["zorunlu"].to_numpy(dtype=bool)
+    secilen_oz=([o for o, z in zip(ozetler, zorunlu) if z] +
+                [o for o, sec, z in zip(ozetler, secildi, zorunlu) if sec and not z])
+    elinen_oz =[o for o, sec in zip(ozetler, secildi) if not sec]
+
+    pozitif=int((ftablo["degisim_3ay"]>0).sum())
     bist_ozet=(f"BIST100 Özet ({len(ozetler)} hisse tarandı):\n"
                f"- Pozitif 3Ay: {pozitif}/{len(ozetler)} (%{pozitif/max(len(ozetler),1)*100:.0f})\n"
-               f"- Ort 3Ay getiri: %{sum(o.degisim_3ay for o in ozetler)/max(len(ozetler),1):.1f}\n"
-               f"- Manipülasyon şüphesi: {sum(1 for o in ozetler if o.manipulasyon_skoru>=MANIPULASYON_ESIK)}\n"
-               f"- Balon şüphesi: {sum(1 for o in ozetler if o.balon_skoru>=BALON_ESIK)}\n"
+               f"- Ort 3Ay getiri: %{ftablo['degisim_3ay'].sum()/max(len(ozetler),1):.1f}\n"
+               f"- Manipülasyon şüphesi: {int((ftablo['manipulasyon_skoru']>=MANIPULASYON_ESIK).sum())}\n"
+               f"- Balon şüphesi: {int((ftablo['balon_skoru']>=BALON_ESIK).sum())}\n"
                f"- Derin analize: {len(secilen_oz)}")
-    console.print(f"\n[green]✓ {len(ozetler)} tarandı | {len(secilen_oz)} seçildi | {len(elinen_oz)} elindi[/green]\n")
+    ist=temel_istatistik()
+    console.print(f"\n[green]✓ {len(ozetler)} tarandı | {len(secilen_oz)} seçildi | {len(elinen_oz)} elindi[/green]"
+                  f" [dim](temel önbellek: {ist['isabet']} isabet / {ist['iska']} ıska)[/dim]")
+    console.print(f"[dim]Veri sağlayıcı gecikmeleri:\n{gecikme_raporu()}[/dim]\n")
     filtre_tablosu(ozetler,secilen_oz,elinen_oz)
+    mum_ist=mum_istatistik_raporu(paket.matris())
 
     # ── 2. Derin Veri + Kural Motoru + Hedef Fiyat ──────────
     console.print("\n[bold cyan]📡 Derin veri + Kural Motoru + Çoklu Hedef Analizi...[/bold cyan]")
     secilen_map={o.ticker+".IS":o for o in secilen_oz}
-    derin=[]
+    # Paralel: her ticker ayrı iş parçacığında; Yahoo istekleri YAHOO_KOVA ile sınırlı.
+    # Sonuçlar seçim sırasına göre toplanır → çıktı deterministik.
+    sonuclar={}
     with Progress(SpinnerColumn(),TextColumn("{task.description}"),console=console) as prog:
         task=prog.add_task("Çekiliyor...",total=len(secilen_oz))
-        for ticker_is,ozet in secilen_map.items():
-            prog.update(task,description=f"Derin: {ticker_is}")
-            d=hisse_derin_cek(ticker_is,ozet)
-            if d: derin.append(d)
-            time.sleep(0.3); prog.advance(task)
-    console.print(f"\n[green]✓ {len(derin)} hisse hazır (6-yöntem hedef fiyat dahil).[/green]\n")
+        with ThreadPoolExecutor(max_workers=DERIN_PARALEL) as ex:
+            isler={ex.submit(hisse_derin_cek,ticker_is,ozet,
+                             info=paket.bilgiler.get(ticker_is),paket=paket):ticker_is
+                   for ticker_is,ozet in secilen_map.items()}
+            for is_ in as_completed(isler):
+                ticker_is=isler[is_]
+                sonuclar[ticker_is]=is_.result()
+                prog.update(task,description=f"Derin: {ticker_is}")
+                prog.advance(task)
+    derin=[sonuclar[t] for t in secilen_map if sonuclar.get(t)]
+    # Kural puanları tüm seçilenler için tek tabloda
+    for h, kr in zip(derin, kural_motoru_toplu(derin)):
+        h.kural_sonuc = kr
+    # Çoklu yöntem hedef fiyat — tek vektörel geçiş (analist konsensüsü info'dan)
+    hedefler = hedef_toplu(derin, paket.bilgiler)
+    console.print(f"\n[green]✓ {len(derin)} hisse hazır (6-yöntem hedef fiyat dahil).[/green]")
+    console.print(f"[dim]Gösterge süreleri (hisse başına):\n{gosterge_sure_raporu()}[/dim]\n")
     kural_tablosu(derin)
     derin_tablo(derin)
 
     # ── Korelasyon ──────────────────────────────────────────
     console.print("\n[cyan]📐 Korelasyon matrisi hesaplanıyor...[/cyan]")
     with console.status("[cyan]Korelasyon...[/cyan]"):
-        kor_df=korelasyon_matrisi_hesapla(derin)
+        kor_df=korelasyon_matrisi_hesapla(derin, paket)
     if not kor_df.empty:
         yuksek=[(a,b,round(float(kor_df.loc[a,b]),2)) for a,b in combinations(kor_df.columns,2)
                 if abs(float(kor_df.loc[a,b]))>0.8]
@@ -1779,8 +1868,7 @@ def main():
     console.print("\n"); console.rule("[bold magenta]🔴 AGENT 3 — Haber & Sentiment[/bold magenta]")
     portfoy_tickers=[h.ticker for h in derin]
     with console.status("[magenta]Haberler + KAP bildirimleri...[/magenta]"):
-        kap_h = kap_bildirim_cek(portfoy_tickers)
-        tum_h = rss_cek() + resmi_cek() + kap_h
+        tum_h, kap_h = haberleri_topla(portfoy_tickers)
     console.print(f"[green]✓ {len(tum_h)} haber ({len(kap_h)} KAP bildirimi)[/green]")
     secili=[h.ticker for h in derin]
     haber_oz=haber_ozeti(tum_h,secili)
@@ -1799,8 +1887,9 @@ def main():
             fk = _to_float(o.fk_orani)
             return f"Balon şüphesi (FK:{f'{fk:.0f}' if fk else 'N/A'}, puan:{o.balon_skoru:.0f})"
         return f"Filtre limit ({FILTRE_LIMIT}) — kalite:{o.kalite_skoru:.0f}"
+    # Sebep metni yalnızca Agent 1'e gösterilen satırlar için üretilir
     elinen_bilgi=[{"ticker":o.ticker,"m_skor":o.manipulasyon_skoru,
-                   "b_skor":o.balon_skoru,"sebep":elenme_sebebi(o)} for o in elinen_oz]
+                   "b_skor":o.balon_skoru,"sebep":elenme_sebebi(o)} for o in elinen_oz[:ELINEN_GOSTER]]
     with console.status("[blue]Agent 1...[/blue]"):
         analiz=ajanlar.agent1(piyasa_oz,sentiment,elinen_bilgi,bist_ozet,kor_ozet)
     console.print(Panel(analiz,title="Agent 1 — Analiz",border_style="blue",padding=(1,2)))
@@ -1815,20 +1904,33 @@ def main():
     portfoy_kaydet(portfoy, derin)
     console.print(f"[green]✓ Pozisyonlar kaydedildi → {PORTFOY_KAYIT_DOSYA}[/green]")
     console.print("\n"); console.rule("[bold green]📊 PORTFÖY P&L TAKİBİ[/bold green]")
-    pnl_hesapla_goster(derin)
+    pnl_hesapla_goster(derin, hedefler)
 
     # ── 6. JSON Rapor ────────────────────────────────────────
     cikti={"tarih":datetime.now().isoformat(),"versiyon":"4.1","bist_ozet":bist_ozet,
            "kural_motoru":[{"ticker":h.ticker,**vars(h.kural_sonuc)} for h in derin if h.kural_sonuc],
            "hisseler":[{k:v for k,v in vars(h).items() if k not in ("kural_sonuc",)} for h in derin],
            "agent3":sentiment,"agent1":analiz,"agent2":portfoy,
+           "mum_istatistik":mum_ist,
            "elinen":[{"ticker":o.ticker,"m":o.manipulasyon_skoru,"b":o.balon_skoru} for o in elinen_oz],
            "haberler":[vars(h) for h in tum_h[:50]]}
     dosya=f"bist_rapor_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
     with open(dosya,"w",encoding="utf-8") as f:
         json.dump(cikti,f,ensure_ascii=False,indent=2,default=str)
     console.print(f"\n[green]✓ Rapor → {dosya}[/green]")
+    if KURAL_GECMISI_YIL:
+        try:
+            gecmis, _ = kural_gecmisi_guncelle()
+            console.print(f"[dim]Kural puanı geçmişi: {gecmis['toplam'].shape[0]} gün × "
+                          f"{gecmis['toplam'].shape[1]} hisse[/dim]")
+        except Exception as e:
+            console.print(f"[yellow]Kural puanı geçmişi güncellenemedi: {e}[/yellow]")
     console.rule("[bold]✅ Tamamlandı[/bold]")
 
 if __name__=="__main__":
-    main()
+    kayit_oynat.argv_isle()
+    if "--kural-gecmisi" in sys.argv:
+        gecmis, veriler = kural_gecmisi_guncelle(yil=KURAL_GECMISI_YIL or 5)
+        kural_gecmisi_raporu(gecmis, veriler)
+    else:
+        main()
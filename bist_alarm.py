@@ -15,6 +15,7 @@ Sinyaller:
 Skor 5/5 → KESİN ALIM | 3-4/5 → KISMİ ALIM | 0-2/5 → BEKLE
 
 Telegram: TELEGRAM_BOT_TOKEN + TELEGRAM_CHAT_ID env değişkeni gerekli
+Eşikler ve S5/S8 kuralları: kurallar.json (bkz. kural_derleyici)
 """
 
 import os, sys, json, warnings
@@ -24,16 +25,22 @@ from typing import Optional
 warnings.filterwarnings("ignore")
 
 try:
-    import yfinance as yf
     import pandas as pd
     import numpy as np
-    import requests
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError as e:
     print(f"Eksik: {e}\npip install yfinance pandas numpy requests python-dotenv")
     sys.exit(1)
 
+from fiyat_onbellek import fiyat_gecmisi
+import http_istemci
+import kayit_oynat
+from indikatorler import rsi_serisi
+from gosterge_bellegi import gosterge
+from kesit_matrisi import piyasa_matrisi, PiyasaMatrisi
+from kural_derleyici import plan_yukle_yedekli
+
 # ── Sabitler ────────────────────────────────────────────────────────────────
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
@@ -48,23 +55,48 @@ BIST_TICKERS = [
 
 ALARM_LOG = "bist_alarm_log.json"
 
+# Sinyal eşikleri (S1–S7) ve S5/S8 kuralları kurallar.json'da ("alarm" parametresi,
+# "alarm_makro" / "alarm_giris" bölümleri) — ayar için kod değişikliği gerekmez.
+# Aşağıdaki değerler yalnızca kural dosyası yüklenemezse kullanılır; yüklenen
+# dosyada bu alanların hepsi zorunludur (derlemede doğrulanır).
+ALARM_VARSAYILAN = {
+    "S1": {"dusus_orani": 0.97},
+    "S2": {"yukselen_degisim": 0.3, "breadth_min": 45},
+    "S3": {"dip_rsi": 42, "toparlanma_alt": 38, "toparlanma_ust": 62},
+    "S4": {"rsi_alt": 35, "rsi_ust": 65, "son3_min": -2, "hazir_min": 8},
+    "S5": {"puan_min": 3},
+    "S6": {"endeks_ust": 13000, "rsi_ust": 38, "asiri_satim_rsi": 35, "asiri_satim_min": 5},
+    "S7": {"endeks_alt": 14400, "breadth_min": 40, "hacim_orani_min": 1.3},
+}
+KURAL_PLANI = plan_yukle_yedekli(gerekli={"alarm": {s: tuple(e) for s, e in ALARM_VARSAYILAN.items()}})
+ESIK = {s: {**e, **KURAL_PLANI.parametre("alarm", s, varsayilan={})}
+        for s, e in ALARM_VARSAYILAN.items()}
+
+_MATRIS: Optional[PiyasaMatrisi] = None
+
 
 # ════════════════════════════════════════════════════════════════════════════
 # YARDIMCI
 # ════════════════════════════════════════════════════════════════════════════
 
 def _fiyat_cek(ticker: str, period: str = "3mo") -> Optional[pd.DataFrame]:
-    try:
-        h = yf.Ticker(ticker).history(period=period, auto_adjust=True)
-        return h if not h.empty else None
-    except:
-        return None
+    return fiyat_gecmisi(ticker, period=period, auto_adjust=True)
+
+def _rsi_seri(s: pd.Series, p: int = 14) -> pd.Series:
+    return rsi_serisi(s, p, sifir_yerine=np.nan)
 
 def _rsi(s: pd.Series, p: int = 14) -> float:
-    d = s.diff()
-    g = d.clip(lower=0).rolling(p).mean()
-    k = (-d.clip(upper=0)).rolling(p).mean()
-    return round(float((100 - 100 / (1 + g / k.replace(0, np.nan))).iloc[-1]), 1)
+    return round(float(_rsi_seri(s, p).iloc[-1]), 1)
+
+def _bist_matrisi() -> PiyasaMatrisi:
+    """BIST_TICKERS için tarih × ticker matrisi — S2/S4/S6/S7 aynı veriyi paylaşır."""
+    global _MATRIS
+    if _MATRIS is None:
+        _MATRIS = piyasa_matrisi(BIST_TICKERS, period="3mo")
+    return _MATRIS
+
+def _evren(seri: pd.Series, tickers: list = BIST_TICKERS) -> pd.Series:
+    return seri.reindex(pd.Index(tickers))
 
 def _telegram_gonder(mesaj: str):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
@@ -74,7 +106,7 @@ def _telegram_gonder(mesaj: str):
         return False
     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
     try:
-        r = requests.post(url, json={
+        r = http_istemci.post(url, json={
             "chat_id": TELEGRAM_CHAT_ID,
             "text": mesaj,
             "parse_mode": "HTML",
@@ -116,7 +148,7 @@ def s1_momentum_donus(xu100: pd.DataFrame) -> tuple[bool, str]:
     onceki10_max = float(kapanis.iloc[-15:-5].max())
 
     # Önce düşüş olmuş olmalı
-    dusus_oldu = son5_min < onceki10_max * 0.97  # %3+ düşüş
+    dusus_oldu = son5_min < onceki10_max * ESIK["S1"]["dusus_orani"]  # %3+ düşüş
 
     # Şimdi yukarı dönüyor mu?
     bugun = float(kapanis.iloc[-1])
@@ -142,23 +174,18 @@ def s2_breadth_toparlanma() -> tuple[bool, str]:
     S2: Genişlik toparlaması
     Yükselen hisse sayısı > %45 VE önceki güne göre arttı.
     """
-    yukselenler = 0
-    toplam = 0
-
-    for ticker in BIST_TICKERS:
-        h = _fiyat_cek(ticker, "5d")
-        if h is None or len(h) < 2:
-            continue
-        toplam += 1
-        degisim = (float(h["Close"].iloc[-1]) / float(h["Close"].iloc[-2]) - 1) * 100
-        if degisim > 0.3:
-            yukselenler += 1
+    e = ESIK["S2"]
+    m = _bist_matrisi()
+    gecerli = _evren(m.bar_sayisi).fillna(0) >= 2
+    degisim = _evren(m.son_getiri()) * 100
+    toplam      = int(gecerli.sum())
+    yukselenler = int((gecerli & (degisim > e["yukselen_degisim"])).sum())
 
     if toplam == 0:
         return False, "Veri yok"
 
     breadth = yukselenler / toplam * 100
-    sinyal = breadth >= 45
+    sinyal = breadth >= e["breadth_min"]
     detay = f"Yükselen:{yukselenler}/{toplam} Breadth:%{breadth:.1f}"
     return sinyal, detay
 
@@ -173,26 +200,22 @@ def s3_rsi_dip_donus(xu100: pd.DataFrame) -> tuple[bool, str]:
 
     kapanis = xu100["Close"]
 
-    # Son 10 günün RSI'larını hesapla
-    rsi_serisi = []
-    for i in range(10, 0, -1):
-        try:
-            r = _rsi(kapanis.iloc[:-i] if i > 0 else kapanis)
-            rsi_serisi.append(r)
-        except:
-            pass
+    # Son 10 günün RSI'ları — tüm seri tek geçişte, önceki 10 günün değerleri okunur
+    rsi_tum    = _rsi_seri(kapanis)
+    rsi_serisi = [round(float(r), 1) for r in rsi_tum.iloc[-11:-1]]
 
     if not rsi_serisi:
         return False, "RSI hesplanamadı"
 
-    rsi_bugun = _rsi(kapanis)
+    rsi_bugun = round(float(rsi_tum.iloc[-1]), 1)
     rsi_min10  = min(rsi_serisi) if rsi_serisi else rsi_bugun
 
+    e = ESIK["S3"]
     # Önce dibe vurmuş olmalı (RSI < 40)
-    dibe_vurdu = rsi_min10 < 42
+    dibe_vurdu = rsi_min10 < e["dip_rsi"]
 
     # Şimdi toparlanıyor (40-60 arası)
-    toparlanma = 38 <= rsi_bugun <= 62
+    toparlanma = e["toparlanma_alt"] <= rsi_bugun <= e["toparlanma_ust"]
 
     # RSI yükseliyor mu?
     rsi_dun = rsi_serisi[-1] if len(rsi_serisi) >= 1 else rsi_bugun
@@ -209,24 +232,17 @@ def s4_hisse_hazirlik() -> tuple[bool, str]:
     En az 8 hisse bireysel olarak yukarı momentum gösteriyor.
     (RSI 40-60 arası + son 3 günde yükselen)
     """
-    hazir = []
-
-    for ticker in BIST_TICKERS:
-        h = _fiyat_cek(ticker, "2mo")
-        if h is None or len(h) < 20:
-            continue
-
-        try:
-            rsi = _rsi(h["Close"])
-            son3_degisim = (float(h["Close"].iloc[-1]) / float(h["Close"].iloc[-3]) - 1) * 100
+    e = ESIK["S4"]
+    m = _bist_matrisi()
+    gecerli      = _evren(m.bar_sayisi).fillna(0) >= 20
+    rsi          = _evren(m.son(m.rsi(sifir_yerine=np.nan))).round(1)
+    son3_degisim = _evren(m.son_getiri(2)) * 100
 
-            # Kriterleri: RSI 35-65 arası + son 3 gün pozitif + hacim normal
-            if 35 <= rsi <= 65 and son3_degisim > -2:  # %-2 tolerans
-                hazir.append(ticker.replace(".IS",""))
-        except:
-            pass
+    # Kriterleri: RSI 35-65 arası + son 3 gün pozitif (%-2 tolerans)
+    maske = gecerli & rsi.between(e["rsi_alt"], e["rsi_ust"]) & (son3_degisim > e["son3_min"])
+    hazir = [t.replace(".IS","") for t in maske.index[maske]]
 
-    sinyal = len(hazir) >= 8
+    sinyal = len(hazir) >= e["hazir_min"]
     detay  = f"Hazır:{len(hazir)}/30 — {', '.join(hazir[:6])}"
     return sinyal, detay
 
@@ -237,55 +253,30 @@ def s5_makro_temizlendi() -> tuple[bool, str]:
     VIX < 20 VE Altın son 5 günde düşüyor (risk iştahı açıldı)
     VE USDTRY stabil
     """
-    bulgular = []
-    puan = 0
-
-    # VIX
-    try:
-        vix_data = _fiyat_cek("^VIX", "1mo")
-        if vix_data is not None:
-            vix = float(vix_data["Close"].iloc[-1])
-            if vix < 18:
-                puan += 2
-                bulgular.append(f"VIX:{vix:.1f}✓")
-            elif vix < 22:
-                puan += 1
-                bulgular.append(f"VIX:{vix:.1f}~")
+    # Son değerler (VIX seviyesi, altın / USDTRY 5 günlük % değişim); puan ve
+    # bulgu metinleri kurallar.json "alarm_makro" bölümünden
+    degerler, hatali = {}, set()
+    for sutun, sembol in (("vix", "^VIX"), ("altin_degisim", "GC=F"), ("usd_degisim", "USDTRY=X")):
+        try:
+            h = _fiyat_cek(sembol, "1mo")
+            if sutun == "vix":
+                degerler[sutun] = float(h["Close"].iloc[-1]) if h is not None else np.nan
+            elif h is not None and len(h) >= 5:
+                degerler[sutun] = (float(h["Close"].iloc[-1]) / float(h["Close"].iloc[-5]) - 1) * 100
             else:
-                bulgular.append(f"VIX:{vix:.1f}✗")
-    except:
-        bulgular.append("VIX:?")
+                degerler[sutun] = np.nan
+        except:
+            degerler[sutun] = np.nan
+            hatali.add(sutun)
 
-    # Altın (düşüyorsa risk iştahı var)
-    try:
-        altin = _fiyat_cek("GC=F", "1mo")
-        if altin is not None and len(altin) >= 5:
-            altin_degisim = (float(altin["Close"].iloc[-1]) / float(altin["Close"].iloc[-5]) - 1) * 100
-            if altin_degisim < -1:
-                puan += 2
-                bulgular.append(f"Altın:{altin_degisim:.1f}%✓")
-            elif altin_degisim < 1:
-                puan += 1
-                bulgular.append(f"Altın:{altin_degisim:.1f}%~")
-            else:
-                bulgular.append(f"Altın:{altin_degisim:.1f}%✗")
-    except:
-        bulgular.append("Altın:?")
+    tablo = pd.DataFrame({k: [v] for k, v in degerler.items()})
+    puan  = int(KURAL_PLANI.puanla("alarm_makro", tablo)[0])
+    metin = dict(KURAL_PLANI.mesajlar("alarm_makro", tablo, grup_adi=True)[0])
+    etiket = {"vix": "VIX", "altin_degisim": "Altın", "usd_degisim": "USDTRY"}
+    bulgular = [f"{etiket[s]}:?" if s in hatali else metin[s] for s in degerler
+                if s in hatali or s in metin]
 
-    # USDTRY stabil (son 5 günde <%1 değişim)
-    try:
-        usd = _fiyat_cek("USDTRY=X", "1mo")
-        if usd is not None and len(usd) >= 5:
-            usd_degisim = (float(usd["Close"].iloc[-1]) / float(usd["Close"].iloc[-5]) - 1) * 100
-            if abs(usd_degisim) < 1:
-                puan += 1
-                bulgular.append(f"USDTRY:{usd_degisim:.1f}%✓")
-            else:
-                bulgular.append(f"USDTRY:{usd_degisim:.1f}%✗")
-    except:
-        bulgular.append("USDTRY:?")
-
-    sinyal = puan >= 3
+    sinyal = puan >= ESIK["S5"]["puan_min"]
     detay  = " | ".join(bulgular) + f" (Puan:{puan}/5)"
     return sinyal, detay
 
@@ -294,7 +285,7 @@ def s8_hisse_giris_sinyali() -> list:
     """
     S8: Portföy önerisindeki hisseler için bireysel giriş sinyali.
     portfoy_pozisyonlar.json okur, AL kararı olan hisseleri tarar.
-    Her hisse için 3 koşul:
+    Her hisse için 3 koşul (kurallar.json "alarm_giris"):
       A) Dip Giriş: RSI 35-48 + destek yakın + toparlanıyor
       B) Kırılma:   10G yüksek kırıldı + hacim 1.5x + RSI 50-65
       C) MACD Dönüş: histogram negatiften pozitife + RSI 40+
@@ -315,7 +306,7 @@ def s8_hisse_giris_sinyali() -> list:
     if not tickers:
         return []
 
-    sinyaller = []
+    satirlar = []
 
     for ticker in tickers[:8]:
         h = _fiyat_cek(ticker, "3mo")
@@ -325,67 +316,53 @@ def s8_hisse_giris_sinyali() -> list:
         try:
             kapanis = h["Close"]
             hacim   = h["Volume"]
-            son     = float(kapanis.iloc[-1])
-            dun     = float(kapanis.iloc[-2])
-            evvelsi = float(kapanis.iloc[-3])
 
-            rsi = _rsi(kapanis)
-            rsi_dun = _rsi(kapanis.iloc[:-1])
-
-            # Destek: son 20 günün en düşüğü
-            destek = float(kapanis.iloc[-20:].min())
-            destek_yakin = abs(son - destek) / destek < 0.04  # %4 içinde
+            # Bellekteki ortak RSI (varsayılan parametre); ortalama kayıp 0 → 100 çıkar,
+            # S8 bu durumu eskisi gibi tanımsız (NaN) sayar
+            rsi_tum = gosterge(ticker, "1d", h, "rsi").replace(100.0, np.nan)
 
             # Hacim
             son_hacim = float(hacim.iloc[-1])
             ort_hacim = float(hacim.iloc[-20:-1].mean())
-            hacim_x = son_hacim / ort_hacim if ort_hacim > 0 else 0
-
-            # 10G yüksek
-            max_10g = float(kapanis.iloc[-12:-2].max())
-            kirilma = son > max_10g
-
-            # MACD
-            ema12 = kapanis.ewm(span=12).mean()
-            ema26 = kapanis.ewm(span=26).mean()
-            macd_line = ema12 - ema26
-            signal_line = macd_line.ewm(span=9).mean()
-            histo = macd_line - signal_line
-            histo_son = float(histo.iloc[-1])
-            histo_dun = float(histo.iloc[-2])
-
-            isim = ticker.replace(".IS", "")
-            tip = None
-            detay = ""
-
-            # A) Dip Giriş
-            if 35 <= rsi <= 48 and destek_yakin and son > dun and dun > evvelsi:
-                tip = "DİP GİRİŞ"
-                detay = f"RSI:{rsi:.0f} | Destek:{destek:.1f} | Toparlanıyor"
-
-            # B) Kırılma Girişi
-            elif kirilma and hacim_x >= 1.5 and 50 <= rsi <= 68:
-                tip = "KIRILMA"
-                detay = f"10G kırdı:{son:.1f}>{max_10g:.1f} | Hacim:{hacim_x:.1f}x | RSI:{rsi:.0f}"
-
-            # C) MACD Dönüş
-            elif histo_dun < 0 and histo_son > 0 and rsi >= 40:
-                tip = "MACD DÖNÜŞ"
-                detay = f"Histogram +{histo_son:.3f} | RSI:{rsi:.0f}"
-
-            if tip:
-                sinyaller.append({
-                    "ticker": isim,
-                    "tip": tip,
-                    "detay": detay,
-                    "fiyat": son,
-                    "rsi": rsi,
-                })
-                print(f"  🚀 {isim}: {tip} — {detay}")
 
+            # MACD (bellek: aynı 3 aylık pencereyle çalışan S8 turlarıyla paylaşılır)
+            _, _, histo = gosterge(ticker, "1d", h, "macd", adjust=True)
+
+            satirlar.append({
+                "ticker":    ticker.replace(".IS", ""),
+                "son":       float(kapanis.iloc[-1]),
+                "dun":       float(kapanis.iloc[-2]),
+                "evvelsi":   float(kapanis.iloc[-3]),
+                "rsi":       round(float(rsi_tum.iloc[-1]), 1),
+                "destek":    float(kapanis.iloc[-20:].min()),     # son 20 günün en düşüğü
+                "hacim_x":   son_hacim / ort_hacim if ort_hacim > 0 else 0,
+                "max_10g":   float(kapanis.iloc[-12:-2].max()),  # 10G yüksek
+                "histo_son": float(histo.iloc[-1]),
+                "histo_dun": float(histo.iloc[-2]),
+            })
         except Exception as e:
             continue
 
+    if not satirlar:
+        return []
+
+    # A) Dip Giriş  B) Kırılma  C) MACD Dönüş — kurallar.json "alarm_giris" (ilk uyan)
+    tablo = pd.DataFrame(satirlar)
+    tipler = KURAL_PLANI.etiketler("alarm_giris", tablo, "giris")
+    detaylar = KURAL_PLANI.mesajlar("alarm_giris", tablo)
+
+    sinyaller = []
+    for satir, tip, detay in zip(satirlar, tipler, detaylar):
+        if tip:
+            sinyaller.append({
+                "ticker": satir["ticker"],
+                "tip": tip,
+                "detay": detay[0] if detay else "",
+                "fiyat": satir["son"],
+                "rsi": satir["rsi"],
+            })
+            print(f"  🚀 {satir['ticker']}: {tip} — {sinyaller[-1]['detay']}")
+
     return sinyaller
 
 
@@ -400,23 +377,21 @@ def s6_dip_alim_senaryosu(xu100) -> tuple:
     son = float(xu100["Close"].iloc[-1])
     rsi = _rsi(xu100["Close"])
 
-    asiri_satim = 0
-    for ticker in BIST_TICKERS[:20]:
-        h = _fiyat_cek(ticker, "1mo")
-        if h is not None and len(h) >= 14:
-            try:
-                if _rsi(h["Close"]) < 35:
-                    asiri_satim += 1
-            except:
-                pass
+    e = ESIK["S6"]
+    m = _bist_matrisi()
+    ilk20 = BIST_TICKERS[:20]
+    gecerli = _evren(m.bar_sayisi, ilk20).fillna(0) >= 14
+    rsi_h   = _evren(m.son(m.rsi(sifir_yerine=np.nan)), ilk20).round(1)
+    asiri_satim = int((gecerli & (rsi_h < e["asiri_satim_rsi"])).sum())
 
-    kosul1 = son < 13000
-    kosul2 = rsi < 38
-    kosul3 = asiri_satim >= 5
+    kosul1 = son < e["endeks_ust"]
+    kosul2 = rsi < e["rsi_ust"]
+    kosul3 = asiri_satim >= e["asiri_satim_min"]
 
     sinyal = kosul1 and kosul2 and kosul3
-    detay = (f"BIST:{son:,.0f}({'<13K ✓' if kosul1 else '>13K ✗'}) "
-             f"RSI:{rsi:.1f}({'<38 ✓' if kosul2 else '>38 ✗'}) "
+    endeks_k, rsi_e = f"{e['endeks_ust'] / 1000:g}K", f"{e['rsi_ust']:g}"
+    detay = (f"BIST:{son:,.0f}({f'<{endeks_k} ✓' if kosul1 else f'>{endeks_k} ✗'}) "
+             f"RSI:{rsi:.1f}({f'<{rsi_e} ✓' if kosul2 else f'>{rsi_e} ✗'}) "
              f"AşırıSatım:{asiri_satim}/20({'✓' if kosul3 else '✗'})")
     return sinyal, detay
 
@@ -435,23 +410,19 @@ def s7_kirilma_senaryosu(xu100: pd.DataFrame) -> tuple:
     ort20_h = float(hacim.iloc[-22:-2].mean())
     hacim_oran = son3_h / ort20_h if ort20_h > 0 else 0
 
-    yukselen = 0
-    for ticker in BIST_TICKERS:
-        h = _fiyat_cek(ticker, "5d")
-        if h is not None and len(h) >= 2:
-            try:
-                if float(h["Close"].iloc[-1]) > float(h["Close"].iloc[-2]):
-                    yukselen += 1
-            except:
-                pass
+    m = _bist_matrisi()
+    gecerli  = _evren(m.bar_sayisi).fillna(0) >= 2
+    yukselen = int((gecerli & (_evren(m.son_getiri()) > 0)).sum())
     breadth = yukselen / len(BIST_TICKERS) * 100
 
-    kosul1 = son > 14400
-    kosul2 = breadth > 40
-    kosul3 = hacim_oran > 1.3
+    e = ESIK["S7"]
+    kosul1 = son > e["endeks_alt"]
+    kosul2 = breadth > e["breadth_min"]
+    kosul3 = hacim_oran > e["hacim_orani_min"]
 
     sinyal = kosul1 and kosul2 and kosul3
-    detay = (f"BIST:{son:,.0f}({'>14.4K ✓' if kosul1 else '<14.4K ✗'}) "
+    endeks_k = f"{e['endeks_alt'] / 1000:g}K"
+    detay = (f"BIST:{son:,.0f}({f'>{endeks_k} ✓' if kosul1 else f'<{endeks_k} ✗'}) "
              f"Breadth:%{breadth:.0f}({'✓' if kosul2 else '✗'}) "
              f"Hacim:{hacim_oran:.2f}x({'✓' if kosul3 else '✗'})")
     return sinyal, detay
@@ -607,6 +578,7 @@ def _telegram_mesaj_olustur(tarih, endeks, skor, karar, emoji,
 # ════════════════════════════════════════════════════════════════════════════
 
 if __name__ == "__main__":
+    kayit_oynat.argv_isle()
     sonuc = alarm_kontrol()
     # GitHub Actions exit code: 0 = başarılı
     sys.exit(0)
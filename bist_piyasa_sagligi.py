@@ -21,10 +21,8 @@ from typing import Optional
 warnings.filterwarnings("ignore")
 
 try:
-    import yfinance as yf
     import pandas as pd
     import numpy as np
-    import requests
     from bs4 import BeautifulSoup
     from rich.console import Console
     from rich.table import Table
@@ -38,6 +36,10 @@ except ImportError as e:
     print("pip install yfinance pandas numpy requests beautifulsoup4 rich python-dotenv groq")
     sys.exit(1)
 
+from fiyat_onbellek import fiyat_gecmisi
+from kesit_matrisi import piyasa_matrisi
+import http_istemci
+
 console = Console()
 
 # ── Sabitler ────────────────────────────────────────────────────────────────
@@ -84,12 +86,7 @@ def _rsi(s: pd.Series, p: int = 14) -> float:
     return round(float((100 - 100 / (1 + rs)).iloc[-1]), 1)
 
 def _yfinance_cek(ticker: str, period: str = "3mo") -> Optional[pd.DataFrame]:
-    try:
-        t = yf.Ticker(ticker)
-        h = t.history(period=period, auto_adjust=True)
-        return h if not h.empty else None
-    except:
-        return None
+    return fiyat_gecmisi(ticker, period=period, auto_adjust=True)
 
 def _llm_yorum(prompt: str) -> str:
     key = os.getenv("GROQ_API_KEY")
@@ -122,57 +119,37 @@ def genisl_analizi() -> dict:
 
     rprint("  [dim]BIST hisseleri taranıyor...[/dim]")
 
-    yukselenler = []
-    dusenler    = []
-    yataylar    = []
-    hacim_agir_yukseliyor = 0  # Ağır hisseler yükseliyor mu?
-    hacim_agir_dusuyor    = 0
-    rsi_asiri_yuksel = []      # RSI > 70
-    rsi_asiri_dusuk  = []      # RSI < 30
-    ust_20_gun = []            # 20 günlük yüksekte
-    alt_20_gun = []            # 20 günlük düşükte
-
-    toplam = 0
-    hata   = 0
-
-    for ticker in BIST100_TICKERS:
-        h = _yfinance_cek(ticker, "2mo")
-        if h is None or len(h) < 5:
-            hata += 1
-            continue
-        toplam += 1
-
-        bugunki  = float(h["Close"].iloc[-1])
-        dunku    = float(h["Close"].iloc[-2])
-        degisim  = (bugunki - dunku) / dunku * 100
-
-        t_kisa = ticker.replace(".IS","")
-
-        if degisim > 0.5:
-            yukselenler.append((t_kisa, round(degisim, 2)))
-            if ticker in AGIR_HISSELER:
-                hacim_agir_yukseliyor += 1
-        elif degisim < -0.5:
-            dusenler.append((t_kisa, round(degisim, 2)))
-            if ticker in AGIR_HISSELER:
-                hacim_agir_dusuyor += 1
-        else:
-            yataylar.append(t_kisa)
-
-        # RSI
-        if len(h) >= 15:
-            try:
-                rsi = _rsi(h["Close"])
-                if rsi > 70: rsi_asiri_yuksel.append((t_kisa, rsi))
-                if rsi < 30: rsi_asiri_dusuk.append((t_kisa, rsi))
-            except: pass
-
-        # 20 günlük yüksek/düşük
-        if len(h) >= 20:
-            max20 = float(h["High"].iloc[-20:].max())
-            min20 = float(h["Low"].iloc[-20:].min())
-            if bugunki >= max20 * 0.995: ust_20_gun.append(t_kisa)
-            if bugunki <= min20 * 1.005: alt_20_gun.append(t_kisa)
+    # Tüm evren tek tarih × ticker matrisinde; göstergeler sütun bazlı hesaplanır
+    m       = piyasa_matrisi(BIST100_TICKERS, period="2mo")
+    evren   = pd.Index(BIST100_TICKERS)
+    n_bar   = m.bar_sayisi.reindex(evren).fillna(0)
+    bugunki = m.son(m.close).reindex(evren)
+    degisim = (m.son_getiri() * 100).reindex(evren)
+    rsi     = m.son(m.rsi(sifir_yerine=np.nan)).round(1).reindex(evren)
+    max20   = m.son(m.zirve(20)).reindex(evren)
+    min20   = m.son(m.dip(20)).reindex(evren)
+
+    gecerli = n_bar >= 5
+    toplam  = int(gecerli.sum())
+    hata    = len(evren) - toplam
+    agir    = evren.isin(list(AGIR_HISSELER))
+    yuk_m   = gecerli & (degisim > 0.5)
+    dus_m   = gecerli & (degisim < -0.5)
+    rsi_m   = gecerli & (n_bar >= 15)
+    bar20_m = gecerli & (n_bar >= 20)
+
+    def _kisa(maske): return [t.replace(".IS","") for t in evren[maske]]
+    def _degerli(maske, seri, nd): return [(t.replace(".IS",""), round(float(seri[t]), nd)) for t in evren[maske]]
+
+    yukselenler = _degerli(yuk_m, degisim, 2)
+    dusenler    = _degerli(dus_m, degisim, 2)
+    yataylar    = _kisa(gecerli & ~yuk_m & ~dus_m)
+    hacim_agir_yukseliyor = int((yuk_m & agir).sum())   # Ağır hisseler yükseliyor mu?
+    hacim_agir_dusuyor    = int((dus_m & agir).sum())
+    rsi_asiri_yuksel = _degerli(rsi_m & (rsi > 70), rsi, 1)       # RSI > 70
+    rsi_asiri_dusuk  = _degerli(rsi_m & (rsi < 30), rsi, 1)       # RSI < 30
+    ust_20_gun = _kisa(bar20_m & (bugunki >= max20 * 0.995))      # 20 günlük yüksekte
+    alt_20_gun = _kisa(bar20_m & (bugunki <= min20 * 1.005))      # 20 günlük düşükte
 
     # Advance-Decline çizgisi
     adl_oran = len(yukselenler) / max(len(dusenler), 1)
@@ -266,7 +243,7 @@ def yabanci_analizi() -> dict:
     # Alternatif: BIST istatistik sayfası
     try:
         url = "https://borsaistanbul.com/tr/sayfa/1151/yabancilar"
-        r = requests.get(url, headers=HEADERS, timeout=10)
+        r = http_istemci.get(url, headers=HEADERS, timeout=10)
         soup = BeautifulSoup(r.text, "html.parser")
 
         # Tablo bul
@@ -336,7 +313,7 @@ def yabanci_analizi() -> dict:
     try:
         # Son hafta verisi için alternatif kaynak
         url2 = "https://www.isyatirim.com.tr/analiz-ve-raporlar/veriler/hisse/yabanci-yatirimci"
-        r2 = requests.get(url2, headers=HEADERS, timeout=8)
+        r2 = http_istemci.get(url2, headers=HEADERS, timeout=8)
         if r2.status_code == 200 and "yabancı" in r2.text.lower():
             rprint("  [green]✓ İş Yatırım yabancı veri sayfasına erişildi[/green]")
     except:
@@ -20,15 +20,18 @@ from pathlib import Path
 warnings.filterwarnings("ignore")
 
 try:
-    import requests
     import pandas as pd
-    import yfinance as yf
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError as e:
     print(f"Eksik: {e}")
     sys.exit(1)
 
+from fiyat_onbellek import fiyat_gecmisi
+from akis_gostergeleri import AkisRSI, AkisSMA, AkisMACD, akis_takip
+import http_istemci
+import kayit_oynat
+
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 RAPORLAR_DIR     = Path("raporlar")
@@ -46,7 +49,7 @@ def _telegram(mesaj: str, parse_mode: str = "HTML") -> bool:
     try:
         if len(mesaj) > 4096:
             mesaj = mesaj[:4090] + "..."
-        r = requests.post(
+        r = http_istemci.post(
             f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
             json={"chat_id": TELEGRAM_CHAT_ID, "text": mesaj, "parse_mode": parse_mode},
             timeout=15,
@@ -58,7 +61,7 @@ def _telegram(mesaj: str, parse_mode: str = "HTML") -> bool:
             print(f"  HTML parse hatası, düz metin deneniyor...")
             import re
             temiz = re.sub(r"<[^>]+>", "", mesaj)
-            r2 = requests.post(
+            r2 = http_istemci.post(
                 f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
                 json={"chat_id": TELEGRAM_CHAT_ID, "text": temiz},
                 timeout=15,
@@ -115,12 +118,9 @@ def _alarm_json_oku(dosya: str) -> dict:
 
 def _yf_cek(ticker: str, period: str = "2d", interval: str = "1d"):
     for _ in range(3):
-        try:
-            df = yf.Ticker(ticker).history(period=period, interval=interval, auto_adjust=True)
-            if not df.empty:
-                return df
-        except:
-            pass
+        df = fiyat_gecmisi(ticker, period=period, interval=interval, auto_adjust=True)
+        if df is not None:
+            return df
         time.sleep(1)
     return None
 
@@ -178,14 +178,6 @@ def _yf_cek_endeks() -> dict:
     dun = float(df["Close"].iloc[-2])
     return {"son": son, "degisim": (son / dun - 1) * 100}
 
-def _rsi(seri, period=14):
-    delta  = seri.diff()
-    kazan  = delta.clip(lower=0).rolling(period).mean()
-    kayip  = (-delta).clip(lower=0).rolling(period).mean()
-    rs     = kazan / kayip
-    return float(100 - (100 / (1 + rs)).iloc[-1])
-
-
 def _teknik_durum(ticker: str, giris: float = None, hedef: float = None, stop: float = None) -> dict:
     """Her hisse için RSI, MA, MACD, destek/direnç, uyarı hesapla."""
     t = ticker if ticker.endswith(".IS") else ticker + ".IS"
@@ -198,25 +190,27 @@ def _teknik_durum(ticker: str, giris: float = None, hedef: float = None, stop: f
     dun     = float(kapanis.iloc[-2])
     degisim = (son / dun - 1) * 100
 
-    # RSI
+    # RSI / MA / MACD — durumu kayıtlı akış göstergeleri, sadece yeni barlar işlenir
+    akis = akis_takip(f"{t}_1d_teknik", df, lambda: {
+        "rsi":  AkisRSI(14),
+        "ma20": AkisSMA(20),
+        "ma50": AkisSMA(50),
+        "macd": AkisMACD(12, 26, 9, adjust=True),
+    })
     try:
-        rsi     = _rsi(kapanis)
-        rsi_dun = _rsi(kapanis.iloc[:-1])
+        rsi     = float(akis["rsi"][-1])
+        rsi_dun = float(akis["rsi"][-2])
         rsi_yon = "↑" if rsi > rsi_dun else "↓"
     except:
         rsi, rsi_yon = 50, "?"
 
     # MA
-    ma20 = float(kapanis.rolling(20).mean().iloc[-1])
-    ma50 = float(kapanis.rolling(50).mean().iloc[-1]) if len(kapanis) >= 50 else None
+    ma20 = float(akis["ma20"][-1])
+    ma50 = float(akis["ma50"][-1]) if len(kapanis) >= 50 else None
 
-    # MACD
-    ema12  = kapanis.ewm(span=12).mean()
-    ema26  = kapanis.ewm(span=26).mean()
-    macd   = ema12 - ema26
-    sinyal = macd.ewm(span=9).mean()
-    histo  = macd - sinyal
-    macd_yon = "↑" if float(histo.iloc[-1]) > float(histo.iloc[-2]) else "↓"
+    # MACD (histogram yönü)
+    histo  = [h for _, _, h in akis["macd"]]
+    macd_yon = "↑" if float(histo[-1]) > float(histo[-2]) else "↓"
 
     # Destek / direnç (son 2 ay)
     son2ay  = kapanis.iloc[-44:] if len(kapanis) >= 44 else kapanis
@@ -585,4 +579,5 @@ def main():
 
 
 if __name__ == "__main__":
+    kayit_oynat.argv_isle()   # mod ortam değişkeniyle alt script'lere de geçer
     main()
@@ -0,0 +1,334 @@
+"""
+ORTAK FİYAT ÖNBELLEĞİ
+======================
+Tüm script'lerin yfinance geçmiş verisini tek yerden çekmesi için disk önbelleği.
+Aynı sabah çalışmasında XU100 hisseleri 5-6 kez indiriliyordu; artık her
+(ticker, interval, auto_adjust) üçlüsü bir kez indirilip tüm pipeline'da paylaşılır.
+
+Depolama:
+  .onbellek/fiyat/<TICKER>__<interval>__<adj|ham>.npz
+  Sütun bazlı sıkıştırılmış numpy arşivi (zaman damgası + OHLCV dizileri).
+
+Artımlı güncelleme:
+  Önbellek bayatladığında tüm dönem yeniden indirilmez; son kayıtlı bardan
+  birkaç gün geriden başlayan kuyruk çekilir ve seriye birleştirilir.
+  Günün kısmi barı yeni gelenle değiştirilir. Çakışan kapanmış barlar
+  farklıysa (temettü/bölünme düzeltmesi) seri baştan indirilir.
+
+Kullanım:
+    from fiyat_onbellek import fiyat_gecmisi
+    df = fiyat_gecmisi("THYAO.IS", period="3mo")            # yf.Ticker(...).history ile aynı şekil
+    df = fiyat_gecmisi("GC=F", period="60d", interval="30m")
+    dfs = toplu_fiyat_gecmisi(["THYAO.IS", "ASELS.IS"], period="3mo")   # {ticker: df}
+"""
+
+import os, re, time, threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import kayit_oynat
+from veri_saglayici import gecmis_getir, toplu_getir
+
+# ── Sabitler ────────────────────────────────────────────────────────────────
+ONBELLEK_DIZIN = Path(os.getenv("BIST_ONBELLEK_DIZIN", ".onbellek")) / "fiyat"
+SUTUNLAR       = ["Open", "High", "Low", "Close", "Volume"]
+
+# Önbellekteki verinin "taze" sayıldığı süre (saniye) — interval bazlı
+TAZELIK_SN = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 600, "30m": 900,
+    "60m": 900, "90m": 900, "1h": 900,
+    "1d": 1800, "5d": 3600, "1wk": 3600, "1mo": 3600,
+}
+VARSAYILAN_TAZELIK = 900
+
+# Artımlı çekimde kayıtlı son bardan kaç takvim günü geriye gidilir
+# (çakışan kapanmış barlar düzeltme kontrolü için kullanılır)
+BINDIRME_GUN = {"1d": 7, "5d": 14, "1wk": 21, "1mo": 62}
+GUN_ICI_BINDIRME = 1
+
+# Yahoo'nun gün içi veri sınırı (gün) — kuyruk bundan eskiyse tam indirme yapılır
+GUN_ICI_LIMIT = {"1m": 7, "2m": 59, "5m": 59, "15m": 59, "30m": 59,
+                 "60m": 729, "90m": 59, "1h": 729}
+GUN_ICI_SAKLAMA_GUN = 100     # gün içi seriler diskte en fazla bu kadar tutulur
+DUZELTME_TOLERANS   = 1e-3    # çakışan barlarda izin verilen göreli kapanış farkı
+TOPLU_PARCA         = 100     # toplu indirmede tek yf.download çağrısındaki ticker sayısı
+
+_BELLEK: dict = {}            # süreç içi katman: anahtar → (df, meta)
+_KILIT = threading.Lock()
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# YARDIMCI
+# ════════════════════════════════════════════════════════════════════════════
+
+def _simdi() -> pd.Timestamp:
+    return pd.Timestamp(kayit_oynat.zaman(), unit="s", tz="UTC")
+
+def _anahtar(ticker: str, interval: str, auto_adjust: bool) -> str:
+    return f"{ticker}__{interval}__{'adj' if auto_adjust else 'ham'}"
+
+def _dosya_yolu(anahtar: str) -> Path:
+    guvenli = re.sub(r"[^A-Za-z0-9_.=-]", "_", anahtar)
+    return ONBELLEK_DIZIN / f"{guvenli}.npz"
+
+def _donem_baslangic(period: str, simdi: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """yfinance period metnini ("5d", "3mo", "1y", "max") başlangıç zamanına çevirir."""
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", period or "")
+    if not m:
+        return None  # "max" / "ytd" → tam geçmiş
+    n, birim = int(m.group(1)), m.group(2)
+    if birim == "d":
+        # Yahoo "Nd" = N işlem günü → takvimde ~N*7/5 gün + tatil payı
+        return simdi - pd.Timedelta(days=int(n * 7 / 5) + 3)
+    if birim == "wk":
+        return simdi - pd.Timedelta(weeks=n)
+    if birim == "mo":
+        return simdi - pd.DateOffset(months=n)
+    return simdi - pd.DateOffset(years=n)
+
+def _donem_kes(df: pd.DataFrame, period: str, baslangic: Optional[pd.Timestamp]) -> pd.DataFrame:
+    """Önbellekteki seriden istenen dönemi kes (yfinance period davranışına yakın)."""
+    m = re.fullmatch(r"(\d+)d", period or "")
+    if m:
+        gunler = pd.Index(df.index.normalize()).unique()
+        son_n  = gunler[-int(m.group(1)):]
+        return df[df.index.normalize().isin(son_n)]
+    if baslangic is None:
+        return df
+    return df[df.index >= baslangic]
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# DİSK KATMANI
+# ════════════════════════════════════════════════════════════════════════════
+
+def _yaz(anahtar: str, df: pd.DataFrame, meta: dict):
+    if kayit_oynat.aktif():
+        return  # kayıt/oynatmada disk katmanı kapalı
+    yol = _dosya_yolu(anahtar)
+    try:
+        yol.parent.mkdir(parents=True, exist_ok=True)
+        idx = df.index
+        tz  = str(idx.tz) if idx.tz is not None else ""
+        utc = idx.tz_convert("UTC").tz_localize(None) if idx.tz is not None else idx
+        diziler = {k: df[k].to_numpy() for k in SUTUNLAR if k in df.columns}
+        gecici = yol.with_suffix(".tmp.npz")
+        np.savez_compressed(
+            gecici,
+            zaman=utc.to_numpy(dtype="datetime64[ns]").astype("int64"),
+            tz=np.array(tz), isim=np.array(idx.name or ""),
+            cekim=np.array(meta["cekim"]), baslangic=np.array(meta["baslangic"]),
+            **diziler,
+        )
+        os.replace(gecici, yol)
+    except Exception as e:
+        print(f"  Önbellek yazılamadı ({anahtar}): {e}")
+
+def _oku(anahtar: str) -> Optional[tuple]:
+    yol = _dosya_yolu(anahtar)
+    if kayit_oynat.aktif() or not yol.exists():
+        return None
+    try:
+        with np.load(yol, allow_pickle=False) as z:
+            idx = pd.DatetimeIndex(z["zaman"].astype("datetime64[ns]"))
+            tz  = str(z["tz"])
+            if tz:
+                idx = idx.tz_localize("UTC").tz_convert(tz)
+            idx.name = str(z["isim"]) or None
+            df = pd.DataFrame({k: z[k] for k in SUTUNLAR if k in z.files}, index=idx)
+            meta = {"cekim": float(z["cekim"]), "baslangic": float(z["baslangic"])}
+        return df, meta
+    except Exception:
+        return None
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ANA API
+# ════════════════════════════════════════════════════════════════════════════
+
+def _indir(ticker: str, period: str, interval: str, auto_adjust: bool,
+           start: Optional[pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+    bas    = start.strftime("%Y-%m-%d") if start is not None else None
+    kapsam = start if start is not None else _donem_baslangic(period, _simdi())
+    try:
+        return kayit_oynat.kayitli("fiyat", (ticker, period, bas, interval, auto_adjust),
+                                   lambda: gecmis_getir(ticker, interval, auto_adjust, period, start, kapsam))
+    except Exception:
+        return None
+
+def _gun_ici(interval: str) -> bool:
+    return interval in GUN_ICI_LIMIT
+
+def _kuyruk_baslangic(eski: pd.DataFrame, interval: str) -> Optional[pd.Timestamp]:
+    """Artımlı çekimin başlayacağı tarih; kuyruk Yahoo sınırından eskiyse None."""
+    son_bar = eski.index[-1]
+    if _gun_ici(interval):
+        if (_simdi() - son_bar).days >= GUN_ICI_LIMIT[interval] - GUN_ICI_BINDIRME:
+            return None
+        bindirme = GUN_ICI_BINDIRME
+    else:
+        bindirme = BINDIRME_GUN.get(interval, 7)
+    return son_bar.normalize() - pd.Timedelta(days=bindirme)
+
+def _kuyruk_birlestir(eski: pd.DataFrame, yeni: pd.DataFrame, interval: str) -> Optional[pd.DataFrame]:
+    """
+    Yeni kuyruğu kayıtlı seriye ekler, kısmi son barı değiştirir.
+    Çakışan kapanmış barlarda düzeltme farkı varsa None (tam indirme gerekir).
+    """
+    # Düzeltme kontrolü — son kayıtlı bar hariç (kısmi olabilir) çakışan kapanışlar aynı mı?
+    ortak = eski.index[:-1].intersection(yeni.index)
+    if len(ortak) and "Close" in eski.columns:
+        e = eski.loc[ortak, "Close"].to_numpy(dtype=float)
+        y = yeni.loc[ortak, "Close"].to_numpy(dtype=float)
+        fark = np.abs(y - e) / np.where(np.abs(e) > 0, np.abs(e), 1.0)
+        if np.nanmax(fark) > DUZELTME_TOLERANS:
+            return None
+
+    birlesik = pd.concat([eski[eski.index < yeni.index[0]], yeni])
+    if not _gun_ici(interval):
+        # Günlük+ barlarda kısmi bar farklı saat damgasıyla gelebilir → tarih bazında tekilleştir
+        birlesik = birlesik[~birlesik.index.normalize().duplicated(keep="last")]
+    else:
+        birlesik = birlesik[~birlesik.index.duplicated(keep="last")]
+        saklama  = _simdi() - pd.Timedelta(days=GUN_ICI_SAKLAMA_GUN)
+        birlesik = birlesik[birlesik.index >= saklama]
+    return birlesik.sort_index()
+
+def _kuyruk_meta(meta: dict, interval: str) -> dict:
+    baslangic = meta["baslangic"]
+    if _gun_ici(interval):
+        saklama   = (_simdi() - pd.Timedelta(days=GUN_ICI_SAKLAMA_GUN)).timestamp()
+        baslangic = max(baslangic, saklama)
+    return {"cekim": time.time(), "baslangic": baslangic}
+
+def _kayit_al(anahtar: str) -> Optional[tuple]:
+    with _KILIT:
+        kayit = _BELLEK.get(anahtar)
+    if kayit is None:
+        kayit = _oku(anahtar)
+        if kayit is not None:
+            with _KILIT:
+                _BELLEK[anahtar] = kayit
+    return kayit
+
+def _kaydet(anahtar: str, df: pd.DataFrame, meta: dict):
+    with _KILIT:
+        _BELLEK[anahtar] = (df, meta)
+    _yaz(anahtar, df, meta)
+
+def fiyat_gecmisi(ticker: str, period: str = "3mo", interval: str = "1d",
+                  auto_adjust: bool = True, tazelik: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    yf.Ticker(ticker).history(period, interval, auto_adjust) yerine kullanılır.
+    Önbellek taze ve istenen dönemi kapsıyorsa ağ isteği yapılmaz; bayatsa
+    sadece eksik kuyruk çekilir. Hata / boş veri → None.
+    """
+    anahtar = _anahtar(ticker, interval, auto_adjust)
+    istenen = _donem_baslangic(period, _simdi())
+    ist_ts  = istenen.timestamp() if istenen is not None else 0.0
+    tazelik = TAZELIK_SN.get(interval, VARSAYILAN_TAZELIK) if tazelik is None else tazelik
+
+    kayit = _kayit_al(anahtar)
+    df = None
+    if kayit is not None:
+        eski, meta = kayit
+        kapsiyor = meta["baslangic"] <= ist_ts
+        if kapsiyor and time.time() - meta["cekim"] < tazelik:
+            return _donem_kes(eski, period, istenen).copy()
+        baslangic = _kuyruk_baslangic(eski, interval) if kapsiyor else None
+        if baslangic is not None:
+            kuyruk = _indir(ticker, "", interval, auto_adjust, start=baslangic)
+            if kuyruk is None:
+                return _donem_kes(eski, period, istenen).copy()   # ağ hatası → bayat veri
+            df = _kuyruk_birlestir(eski, kuyruk, interval)
+            if df is not None:
+                meta = _kuyruk_meta(meta, interval)
+
+    if df is None:
+        df = _indir(ticker, period, interval, auto_adjust)
+        if df is None:
+            return None
+        meta = {"cekim": time.time(), "baslangic": ist_ts}
+    _kaydet(anahtar, df, meta)
+    return _donem_kes(df, period, istenen).copy()
+
+def _toplu_indir(tickers: list, interval: str, auto_adjust: bool, period: str = "",
+                 start: Optional[pd.Timestamp] = None) -> dict:
+    """Çoklu ticker çekimi (TOPLU_PARCA'lık gruplar) → {ticker: OHLCV DataFrame}."""
+    if not tickers:
+        return {}
+    kw = {"start": start.strftime("%Y-%m-%d")} if start is not None else {"period": period}
+    kapsam = start if start is not None else _donem_baslangic(period, _simdi())
+    sonuc = {}
+    for i in range(0, len(tickers), TOPLU_PARCA):
+        parca = tickers[i:i + TOPLU_PARCA]
+        try:
+            sonuc.update(kayit_oynat.kayitli(
+                "fiyat", (tuple(parca), kw, interval, auto_adjust),
+                lambda: toplu_getir(parca, interval, auto_adjust, period, start, kapsam)))
+        except Exception:
+            continue
+    return sonuc
+
+def toplu_fiyat_gecmisi(tickers: list, period: str = "3mo", interval: str = "1d",
+                        auto_adjust: bool = True, tazelik: Optional[int] = None) -> dict:
+    """
+    Çok sayıda ticker için fiyat_gecmisi — eksik/bayat olanlar tek tek değil,
+    TOPLU_PARCA'lık gruplar halinde yf.download ile çekilir.
+    Dönüş: {ticker: DataFrame}; verisi alınamayanlar sözlükte yer almaz.
+    """
+    istenen = _donem_baslangic(period, _simdi())
+    ist_ts  = istenen.timestamp() if istenen is not None else 0.0
+    tazelik = TAZELIK_SN.get(interval, VARSAYILAN_TAZELIK) if tazelik is None else tazelik
+
+    sonuc, eksik, kuyruklu = {}, [], {}
+    for t in dict.fromkeys(tickers):
+        kayit = _kayit_al(_anahtar(t, interval, auto_adjust))
+        if kayit is None or kayit[1]["baslangic"] > ist_ts:
+            eksik.append(t); continue
+        eski, meta = kayit
+        if time.time() - meta["cekim"] < tazelik:
+            sonuc[t] = _donem_kes(eski, period, istenen).copy(); continue
+        baslangic = _kuyruk_baslangic(eski, interval)
+        if baslangic is None:
+            eksik.append(t)
+        else:
+            kuyruklu[t] = (eski, meta, baslangic)
+
+    # Bayat seriler: en eski kuyruk başlangıcından itibaren tek toplu çekim
+    if kuyruklu:
+        bas = min(v[2] for v in kuyruklu.values())
+        kuyruklar = _toplu_indir(list(kuyruklu), interval, auto_adjust, start=bas)
+        for t, (eski, meta, _) in kuyruklu.items():
+            if t not in kuyruklar:
+                sonuc[t] = _donem_kes(eski, period, istenen).copy()   # ağ hatası → bayat veri
+                continue
+            df = _kuyruk_birlestir(eski, kuyruklar[t], interval)
+            if df is None:
+                eksik.append(t); continue
+            _kaydet(_anahtar(t, interval, auto_adjust), df, _kuyruk_meta(meta, interval))
+            sonuc[t] = _donem_kes(df, period, istenen).copy()
+
+    if eksik:
+        tam = _toplu_indir(eksik, interval, auto_adjust, period=period)
+        for t, df in tam.items():
+            _kaydet(_anahtar(t, interval, auto_adjust), df, {"cekim": time.time(), "baslangic": ist_ts})
+            sonuc[t] = _donem_kes(df, period, istenen).copy()
+    return sonuc
+
+def donem_kes(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Uzun bir seriden yfinance period metnine karşılık gelen kısmı keser."""
+    return _donem_kes(df, period, _donem_baslangic(period, _simdi()))
+
+def onbellek_temizle(bellek: bool = True, disk: bool = False):
+    """Süreç içi ve/veya disk önbelleğini boşalt."""
+    if bellek:
+        with _KILIT:
+            _BELLEK.clear()
+    if disk and ONBELLEK_DIZIN.exists():
+        for yol in ONBELLEK_DIZIN.glob("*.npz"):
+            try: yol.unlink()
+            except OSError: pass
@@ -0,0 +1,205 @@
+"""
+GÖSTERGE BELLEĞİ
+================
+Aynı hissenin aynı verisi üzerinde RSI/MACD/MA gibi göstergeler bir
+orkestrasyon turunda birkaç kez hesaplanıyordu (bist_alarm S8,
+hisse_analiz.teknik_analiz). Sonuçlar burada
+
+    (ticker, interval, ilk bar, son bar zaman damgası, gösterge, parametreler)
+
+anahtarıyla saklanır; tekrar eden hesap bir sözlük aramasına döner.
+Anahtar gerçek veri penceresidir (ilk–son bar): EWM tabanlı göstergeler
+pencere başına bağlı olduğundan farklı dönemle çekilmiş seriler ayrı kayıt
+tutar, birbirinin kaydını ezmez. Aynı pencereyle çeken çağıranlar (ör. aynı
+turda ayrı süreçlerde çalışan S8'ler, hisse_analiz çağrıları; dönem
+sabitleri GOSTERGE_DONEMI gibi) kaydı paylaşır. Göstergeyi varsayılan
+parametrelerle isteyip türetilmiş biçimi kendisi üretmek (ör. S8'in NaN'lı
+RSI'ı) paylaşımı artırır. (bist_sistem kendi akış göstergelerini kullanır,
+bkz. akis_gostergeleri.)
+
+Her kayıt, üretildiği verinin izini (bar sayısı, son kapanış) taşır. İz
+tutmazsa kayıt kullanılmaz, yeniden hesaplanıp üzerine yazılır. Böylece
+gün içinde değişen kısmi bar veya düzeltilmiş veri eski sonucu döndürmez.
+
+Katmanlar:
+  - Süreç içi LRU (BELLEK_KAPASITE kayıt)
+  - Disk: .onbellek/gosterge/<özet>.npz — script'ler ayrı süreçlerde
+    çalıştığı için turun geri kalanı diskten okur. DISK_KAPASITE dosyayı
+    aşınca en eski erişilenler, DISK_OMUR_GUN günden eskiler silinir.
+    Kayıt/oynatma modunda disk kullanılmaz.
+
+Kullanım:
+    from gosterge_bellegi import gosterge, GOSTERGE_DONEMI
+    df  = fiyat_gecmisi("THYAO.IS", period=GOSTERGE_DONEMI)
+    rsi = gosterge("THYAO.IS", "1d", df, "rsi")                 # pd.Series
+    m, s, h = gosterge("THYAO.IS", "1d", df, "macd", adjust=True)
+    ma50 = gosterge("THYAO.IS", "1d", df, "sma", w=50)
+    ma20, ma50, ma200 = gosterge("THYAO.IS", "1d", df, "sma_bankasi", pencereler=(20, 50, 200))
+"""
+
+import os, hashlib, inspect, threading, time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import kayit_oynat
+from indikatorler import rsi_serisi, gercek_aralik, sma_bankasi
+
+# ── Sabitler ────────────────────────────────────────────────────────────────
+BELLEK_DIZIN    = Path(os.getenv("BIST_ONBELLEK_DIZIN", ".onbellek")) / "gosterge"
+BELLEK_KAPASITE = int(os.getenv("BIST_GOSTERGE_LRU", "512"))    # süreç içi kayıt sayısı
+DISK_KAPASITE   = int(os.getenv("BIST_GOSTERGE_DISK", "4000"))  # disk dosya sayısı
+DISK_OMUR_GUN   = 3
+GOSTERGE_DONEMI = "6mo"  # hisse_analiz göstergelerinin fiyat penceresi
+TAHLIYE_ARALIK  = 50     # kaç disk yazımında bir tahliye taraması yapılır
+
+_LRU: OrderedDict = OrderedDict()
+_KILIT = threading.Lock()
+_SAYAC = {"bellek": 0, "disk": 0, "hesap": 0, "yazim": 0}
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# GÖSTERGE TANIMLARI — df (OHLCV) → Series veya Series demeti
+# ════════════════════════════════════════════════════════════════════════════
+
+def _macd(df, hizli=12, yavas=26, sinyal=9, adjust=False):
+    c = df["Close"]
+    m = c.ewm(span=hizli, adjust=adjust).mean() - c.ewm(span=yavas, adjust=adjust).mean()
+    s = m.ewm(span=sinyal, adjust=adjust).mean()
+    return m, s, m - s
+
+def _bollinger(df, w=20, k=2.0):
+    orta = df["Close"].rolling(w).mean(); sapma = df["Close"].rolling(w).std()
+    ust = orta + k*sapma; alt = orta - k*sapma
+    return ust, orta, alt, (df["Close"] - alt) / (ust - alt)
+
+GOSTERGELER = {
+    "rsi":       lambda df, p=14, wilder=False, sifir_yerine=None:
+                     rsi_serisi(df["Close"], p, wilder, sifir_yerine),
+    "sma":       lambda df, w: df["Close"].rolling(w).mean(),
+    "sma_bankasi": lambda df, pencereler: tuple(sma_bankasi(df["Close"], pencereler).values()),
+    "std":       lambda df, w: df["Close"].rolling(w).std(),
+    "ema":       lambda df, span, adjust=False: df["Close"].ewm(span=span, adjust=adjust).mean(),
+    "macd":      _macd,
+    "bollinger": _bollinger,
+    "atr":       lambda df, p=14: gercek_aralik(df["High"], df["Low"], df["Close"]).rolling(p).mean(),
+}
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ANAHTAR / DİSK
+# ════════════════════════════════════════════════════════════════════════════
+
+def _anahtar(ticker: str, interval: str, df: pd.DataFrame, ad: str, parametreler: dict) -> str:
+    ilk_bar, son_bar = (int(df.index.asi8[0]), int(df.index.asi8[-1])) if len(df) else (None, None)
+    # Varsayılanlar doldurulur: gosterge(..., "rsi") ile gosterge(..., "rsi", p=14) aynı kayıttır
+    baglama = inspect.signature(GOSTERGELER[ad]).bind_partial(**parametreler)
+    baglama.apply_defaults()
+    # repr: np.nan parametresi de kararlı anahtar üretir
+    return repr((ticker, interval, ilk_bar, son_bar, ad, sorted(baglama.arguments.items())))
+
+def _iz(df: pd.DataFrame) -> tuple:
+    """Kaydın üretildiği veri: bar sayısı, son kapanış (pencere anahtarda)."""
+    return (len(df), float(df["Close"].iloc[-1])) if len(df) else ()
+
+def _yol(anahtar: str) -> Path:
+    return BELLEK_DIZIN / (hashlib.sha1(anahtar.encode("utf-8")).hexdigest() + ".npz")
+
+def _diskten(anahtar: str, iz: tuple, index: pd.Index):
+    yol = _yol(anahtar)
+    if kayit_oynat.aktif() or not yol.exists():
+        return None
+    try:
+        with np.load(yol, allow_pickle=False) as z:
+            if str(z["anahtar"]) != anahtar or str(z["iz"]) != repr(iz):
+                return None
+            seriler = [pd.Series(z[f"d{i}"], index=index) for i in range(int(z["adet"]))]
+            demet = bool(z["demet"])
+        os.utime(yol)   # erişim zamanı — tahliye sırası
+        return tuple(seriler) if demet else seriler[0]
+    except Exception:
+        return None
+
+def _diske(anahtar: str, iz: tuple, deger):
+    if kayit_oynat.aktif():
+        return
+    yol = _yol(anahtar)
+    seriler = deger if isinstance(deger, tuple) else (deger,)
+    try:
+        yol.parent.mkdir(parents=True, exist_ok=True)
+        gecici = yol.with_suffix(f".{threading.get_ident()}.tmp.npz")
+        np.savez(gecici, anahtar=np.array(anahtar), iz=np.array(repr(iz)), adet=np.array(len(seriler)),
+                 demet=np.array(isinstance(deger, tuple)),
+                 **{f"d{i}": np.asarray(s, dtype=float) for i, s in enumerate(seriler)})
+        os.replace(gecici, yol)
+        with _KILIT:
+            _SAYAC["yazim"] += 1
+            tara = _SAYAC["yazim"] % TAHLIYE_ARALIK == 1
+        if tara:
+            _tahliye()
+    except Exception as e:
+        print(f"  Gösterge belleği yazılamadı: {e}")
+
+def _tahliye():
+    """DISK_OMUR_GUN'den eski dosyaları ve kapasiteyi aşan en eski erişilenleri siler."""
+    dosyalar = sorted((e.stat().st_mtime, e.path) for e in os.scandir(BELLEK_DIZIN)
+                      if e.name.endswith(".npz") and ".tmp" not in e.name)
+    sinir = time.time() - DISK_OMUR_GUN * 86400
+    fazla = len(dosyalar) - DISK_KAPASITE
+    for i, (mtime, yol) in enumerate(dosyalar):
+        if i >= fazla and mtime >= sinir:
+            break
+        try:
+            os.remove(yol)
+        except OSError:
+            pass
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ANA API
+# ════════════════════════════════════════════════════════════════════════════
+
+def gosterge(ticker: str, interval: str, df: pd.DataFrame, ad: str,
+             disk: bool = True, **parametreler):
+    """
+    GOSTERGELER[ad](df, **parametreler) sonucunu bellekten döner, yoksa
+    hesaplayıp saklar. Dönen Series'ler paylaşılır — değiştirilmemeli.
+    """
+    anahtar = _anahtar(ticker, interval, df, ad, parametreler)
+    iz = _iz(df)
+    with _KILIT:
+        kayit = _LRU.get(anahtar)
+        if kayit is not None and kayit[0] == iz:
+            _LRU.move_to_end(anahtar)
+            _SAYAC["bellek"] += 1
+            return kayit[1]
+    deger = _diskten(anahtar, iz, df.index) if disk else None
+    kaynak = "disk"
+    if deger is None:
+        deger = GOSTERGELER[ad](df, **parametreler)
+        kaynak = "hesap"
+        if disk:
+            _diske(anahtar, iz, deger)
+    with _KILIT:
+        _SAYAC[kaynak] += 1
+        _LRU[anahtar] = (iz, deger)
+        _LRU.move_to_end(anahtar)
+        while len(_LRU) > BELLEK_KAPASITE:
+            _LRU.popitem(last=False)
+    return deger
+
+def bellek_istatistik() -> dict:
+    """Bu süreçteki isabet sayıları: {"bellek", "disk", "hesap"}."""
+    return {k: _SAYAC[k] for k in ("bellek", "disk", "hesap")}
+
+def bellegi_temizle(disk: bool = False):
+    with _KILIT:
+        _LRU.clear()
+    if disk and BELLEK_DIZIN.exists():
+        for yol in BELLEK_DIZIN.glob("*.npz"):
+            try:
+                yol.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,69 @@
+"""
+PARALEL HABER TOPLAYICI
+=======================
+RSS / KAP / resmi kurum kaynaklarını asyncio ile aynı anda ister.
+Tüm kaynaklar ortak bir son süre (SON_SURE) içinde beklenir; o ana kadar
+gelenler döner, yetişmeyenler atlanır. Tek bir ölü kaynak artık adımın
+toplam süresine kendi zaman aşımını eklemez.
+
+HTTP istekleri ortak http_istemci oturumuyla ayrı bir iş parçacığı havuzunda
+yapılır (aiohttp bağımlılığı eklenmeden); asyncio katmanı bekleme/son süreyi yönetir.
+
+Kullanım:
+    from haber_toplayici import kaynaklari_getir
+    yanitlar = kaynaklari_getir([(url1, headers), (url2, headers)])
+    r = yanitlar.get(url1)        # requests.Response | None
+    feed = feedparser.parse(r.content)
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import requests
+
+import http_istemci
+
+SON_SURE       = 15.0   # tüm kaynaklar için toplam bekleme (saniye)
+ISTEK_ZAMAN    = 12     # tek istek zaman aşımı (saniye)
+MAKS_PARALEL   = 16
+
+
+def _istek(url: str, headers: Optional[dict], zaman_asimi: float) -> Optional[requests.Response]:
+    try:
+        return http_istemci.get(url, headers=headers or {}, timeout=zaman_asimi)
+    except Exception:
+        return None
+
+async def _hepsini_iste(istekler: list, son_sure: float, zaman_asimi: float,
+                        havuz: ThreadPoolExecutor) -> dict:
+    loop = asyncio.get_running_loop()
+    gorevler = {
+        loop.run_in_executor(havuz, _istek, url, headers, zaman_asimi): url
+        for url, headers in istekler
+    }
+    biten, bekleyen = await asyncio.wait(gorevler, timeout=son_sure)
+    for g in bekleyen:
+        g.cancel()
+    yanitlar = {}
+    for g in biten:
+        r = g.result()
+        if r is not None:
+            yanitlar[gorevler[g]] = r
+    return yanitlar
+
+def kaynaklari_getir(istekler: list, son_sure: float = SON_SURE,
+                     zaman_asimi: float = ISTEK_ZAMAN) -> dict:
+    """
+    istekler: [(url, headers), ...] — aynı URL bir kez istenir.
+    Dönüş: {url: requests.Response}; hata / son süreyi aşan kaynaklar yer almaz.
+    """
+    istekler = list(dict(istekler).items())
+    if not istekler:
+        return {}
+    havuz = ThreadPoolExecutor(max_workers=min(MAKS_PARALEL, len(istekler)))
+    try:
+        return asyncio.run(_hepsini_iste(istekler, son_sure, zaman_asimi, havuz))
+    finally:
+        # Son süreyi aşan istekleri bekleme — iş parçacıkları kendi zaman aşımında biter
+        havuz.shutdown(wait=False, cancel_futures=True)
@@ -22,10 +22,11 @@ warnings.filterwarnings("ignore")
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
-import requests
 from dotenv import load_dotenv
 
+from fiyat_onbellek import fiyat_gecmisi
+import http_istemci
+
 load_dotenv()
 
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN", "")
@@ -160,7 +161,7 @@ BIST100_TICKERS = [
 def _yf_haftalik(ticker: str) -> Optional[float]:
     """Son 7 günlük değişim yüzdesi."""
     try:
-        df = yf.Ticker(ticker).history(period="10d", interval="1d", auto_adjust=True)
+        df = fiyat_gecmisi(ticker, period="10d", interval="1d", auto_adjust=True)
         if df is None or len(df) < 2:
             return None
         son  = float(df["Close"].iloc[-1])
@@ -173,7 +174,7 @@ def _yf_haftalik(ticker: str) -> Optional[float]:
 def _yf_fiyat_hafta_once(ticker: str) -> tuple:
     """(hafta_once_fiyat, bugun_fiyat) döndür."""
     try:
-        df = yf.Ticker(ticker).history(period="10d", interval="1d", auto_adjust=True)
+        df = fiyat_gecmisi(ticker, period="10d", interval="1d", auto_adjust=True)
         if df is None or len(df) < 2:
             return None, None
         return float(df["Close"].iloc[0]), float(df["Close"].iloc[-1])
@@ -186,7 +187,7 @@ def _telegram(mesaj: str) -> bool:
         print(mesaj)
         return False
     try:
-        r = requests.post(
+        r = http_istemci.post(
             f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
             json={"chat_id": TELEGRAM_CHAT_ID, "text": mesaj, "parse_mode": "HTML"},
             timeout=15,
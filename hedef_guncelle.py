@@ -1,51 +1,46 @@
 """
 Portföydeki tüm hisseler için hedef ve stop-loss otomatik hesapla.
-Yöntem: Fibonacci 1.272 uzantısı (hedef) + ATR x1.5 (stop)
+Yöntem: hedef motorunun çoklu yöntem konsensüsü (hedef) + ATR x1.5 (stop)
+Fiyatlar derin aşamayla aynı pencereden (PERIOD) tek PiyasaMatrisi'ne
+toplu çekilir (fiyat_onbellek), info temel_onbellek'ten gelir; hedefler
+hedef_motoru.hedefleri_hesapla ile tüm pozisyonlar için tek geçişte,
+hedef/stop pozisyon_hedef_stop ile girişe göre sıkıştırılarak hesaplanır.
 """
 import json, warnings
 from pathlib import Path
 warnings.filterwarnings("ignore")
 import numpy as np
-import yfinance as yf
 
-PORTFOY_DOSYA = "portfoy_pozisyonlar.json"
-
-def atr_hesapla(df, period=14):
-    h = df["High"]; l = df["Low"]; c = df["Close"]
-    tr = np.maximum(h - l, np.maximum(abs(h - c.shift(1)), abs(l - c.shift(1))))
-    return float(tr.rolling(period).mean().iloc[-1])
+from kesit_matrisi import piyasa_matrisi
+from temel_onbellek import temel_bilgi, temel_isit
+from hedef_motoru import matris_girdileri, hedefleri_hesapla, pozisyon_hedef_stop
 
-def fibonacci_hedef(giris, destek, direnc):
-    """Fib 1.272 uzantısı: giris + (direnc-destek)*1.272"""
-    hedef = giris + (direnc - destek) * 1.272
-    return round(hedef, 2)
+PORTFOY_DOSYA = "portfoy_pozisyonlar.json"
+PERIOD        = "6mo"    # bist_agents.PERIOD — derin aşamanın hedef penceresi
+
+def _is(ticker):
+    return ticker if ticker.endswith(".IS") else ticker + ".IS"
+
+def hedef_stop_toplu(girisler: dict) -> dict:
+    """
+    {ticker: giriş fiyatı} → {ticker: (hedef, stop)}; tüm pozisyonlar tek
+    toplu indirme ve tek vektörel hedef motoru çağrısıyla hesaplanır.
+    Verisi yetersiz ticker sonuçta yer almaz.
+    """
+    tickers = [_is(t) for t in girisler]
+    m = piyasa_matrisi(tickers, period=PERIOD)
+    temel_isit(m.tickers)
+    h = hedefleri_hesapla(matris_girdileri(m, {t: temel_bilgi(t) for t in m.tickers}))
+    if not len(h):
+        return {}
+    adlar = [str(t).removesuffix(".IS") for t in h["ticker"]]
+    giris = np.array([girisler.get(t, girisler.get(_is(t))) for t in adlar], dtype=float)
+    hedef, stop = pozisyon_hedef_stop(giris, h["hedef"], h["atr"])
+    return {t: (float(hd), float(s)) for t, hd, s in zip(adlar, hedef, stop)
+            if not (np.isnan(hd) or np.isnan(s))}
 
 def hedef_stop_hesapla(ticker, giris):
-    t = ticker if ticker.endswith(".IS") else ticker + ".IS"
-    try:
-        df = yf.Ticker(t).history(period="3mo", interval="1d", auto_adjust=True)
-        if df is None or len(df) < 20:
-            return None, None
-
-        son    = float(df["Close"].iloc[-1])
-        destek = float(df["Low"].iloc[-44:].min()  if len(df) >= 44 else df["Low"].min())
-        direnc = float(df["High"].iloc[-44:].max() if len(df) >= 44 else df["High"].max())
-        atr    = atr_hesapla(df)
-
-        # Hedef: Fibonacci 1.272 uzantısı — giriş fiyatından
-        hedef = fibonacci_hedef(giris, destek, direnc)
-        # Hedef en az %8, en fazla %40 yukarıda olsun
-        hedef = max(round(giris * 1.08, 2), min(hedef, round(giris * 1.40, 2)))
-
-        # Stop: ATR × 1.5
-        stop = round(giris - 1.5 * atr, 2)
-        # Stop en fazla -%12, en az -%6
-        stop = max(round(giris * 0.88, 2), min(stop, round(giris * 0.94, 2)))
-
-        return hedef, stop
-    except Exception as e:
-        print(f"  {ticker} hata: {e}")
-        return None, None
+    return hedef_stop_toplu({ticker: giris}).get(ticker, (None, None))
 
 def main():
     portfoy_yol = None
@@ -60,15 +55,19 @@ def main():
     kayit = json.loads(Path(portfoy_yol).read_text(encoding="utf-8"))
     poz   = kayit.get("pozisyonlar", {})
 
+    girisler = {t: v.get("giris_fiyati") or v.get("guncel_fiyat") for t, v in poz.items()}
+    girisler = {t: g for t, g in girisler.items() if g}
+    sonuc    = hedef_stop_toplu(girisler) if girisler else {}
+
     print(f"{'Hisse':<8} {'Giris':>8} {'Yeni Hedef':>12} {'Yeni Stop':>10} {'Hedef%':>8} {'Stop%':>8}")
     print("-" * 60)
 
     for ticker, v in poz.items():
-        giris = v.get("giris_fiyati") or v.get("guncel_fiyat")
+        giris = girisler.get(ticker)
         if not giris:
             continue
 
-        hedef, stop = hedef_stop_hesapla(ticker, giris)
+        hedef, stop = sonuc.get(ticker, (None, None))
         if not hedef or not stop:
             print(f"  {ticker}: hesaplanamadi, eski deger korunuyor")
             continue
@@ -92,7 +91,7 @@ def main():
 if __name__ == "__main__":
     print("="*60)
     print("  HEDEF & STOP-LOSS OTOMATİK GÜNCELLE")
-    print("  Yöntem: Fibonacci 1.272 + ATR x1.5")
+    print("  Yöntem: Hedef konsensüsü + ATR x1.5")
     print("="*60)
     main()
     print("="*60)
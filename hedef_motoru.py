@@ -0,0 +1,255 @@
+"""
+HEDEF FİYAT MOTORU
+==================
+Çoklu yöntem hedef fiyatını (Fibonacci 1.272 / 1.618 uzantısı, direnç,
+ATR R/R 1:3, Bollinger üst bandı, analist konsensüsü, sektör F/K
+değerlemesi) ve ağırlıklı konsensüsü çok sayıda hisse için tek seferde,
+sütun bazında hesaplar. Girdi, derin aşamanın zaten hesapladığı gösterge
+değerlerinden (girdi_tablosu) ya da aynı tanımlarla PiyasaMatrisi
+dizilerinden (matris_girdileri) kurulan tablodur (satır = hisse); çıktı
+yöntem başına hedefi ve konsensüsü taşıyan numpy yapılandırılmış dizisidir.
+Derin aşama (hedef_analiz), P&L hedef güncellemesi ve hedef_guncelle betiği
+aynı hesabı kullanır.
+
+  - Bir yöntem yalnızca hedefi fiyatın üstündeyse konsensüse girer; aksi
+    halde alanı NaN'dır.
+  - Hiçbir yöntem çalışmazsa hedef = fiyat × 1.08; aksi halde ağırlıklı
+    ortalama, en az fiyat × 1.05.
+  - Pozisyon hedef/stop'u (hedef_guncelle): hedef konsensüs hedefidir,
+    girişin %8–%40 üstüne; stop giriş − 1.5 × ATR (aynı dizinin atr alanı),
+    −%6 ile −%12 arasına sıkıştırılır.
+
+Kullanım:
+    from hedef_motoru import girdi_tablosu, hedefleri_hesapla, hedef_sonucu
+    g = girdi_tablosu(hisseler, bilgiler)     # HisseDerin listesi + {ticker: info}
+    h = hedefleri_hesapla(g)                  # yapılandırılmış dizi, satır = hisse
+    h["hedef"], h["fib127"], h["yontem_sayisi"]
+    hedef_sonucu(h[0])                        # {"hedef", "yontem", "detay"}
+
+    h = hedefleri_hesapla(matris_girdileri(m, bilgiler))   # m: PiyasaMatrisi
+    hedef, stop = pozisyon_hedef_stop(girisler, h["hedef"], h["atr"])
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from indikatorler import uc_bankasi
+from kesit_matrisi import PiyasaMatrisi
+
+# ── Sabitler ────────────────────────────────────────────────────────────────
+# Sektör bazlı F/K hedefleri (F/K değerleme yöntemi)
+SEKTOR_FK_HEDEF = {
+    "Banking": 8, "Financial Services": 10, "Insurance": 9,
+    "Energy": 10, "Utilities": 12, "Basic Materials": 8,
+    "Technology": 25, "Communication Services": 18,
+    "Consumer Defensive": 14, "Consumer Cyclical": 12,
+    "Industrials": 12, "Real Estate": 15,
+    "Healthcare": 20, "default": 12,
+}
+# Bu sektörlerde F/K değerlemesi yapılmaz
+HOLDING_SEKTORLER = {"holding", "conglomerates", "diversified"}
+
+# (yöntem, konsensüs ağırlığı) — sıra, detay sözlüğünün sırasıdır
+YONTEMLER = [
+    ("fib127",    0.20),
+    ("fib162",    0.10),   # daha uzak hedef, düşük ağırlık
+    ("direnc",    0.20),
+    ("atr_rr3",   0.15),
+    ("bollinger", 0.10),
+    ("analist",   0.25),
+    ("fk_deger",  0.20),
+]
+ATR_STOP_KAT   = 1.5     # stop mesafesi = 1.5 × ATR
+ATR_RR         = 3       # ATR hedefi = fiyat + 3 × stop mesafesi
+FK_ISKONTO     = 0.80    # F/K, sektör hedefinin en az %20 altında olmalı
+VARSAYILAN_KAT = 1.08    # hiçbir yöntem çalışmazsa
+ASGARI_KAT     = 1.05    # konsensüsün alt sınırı
+
+# Pozisyon hedef/stop (hedef_guncelle)
+POZ_HEDEF_ARALIK = (1.08, 1.40)
+POZ_STOP_ARALIK  = (0.88, 0.94)
+ASGARI_BAR     = 60      # derin aşama bundan kısa geçmişe hedef üretmez
+
+GIRDI_ALANLARI = ["fiyat", "fib127", "fib162", "direnc", "atr", "bb_ust",
+                  "analist_hedef", "fk_orani", "hedef_fk"]
+HEDEF_DTYPE = np.dtype([("ticker", "U16"), ("fiyat", "f8"), ("atr", "f8"),
+                        *[(ad, "f8") for ad, _ in YONTEMLER],
+                        ("konsensus", "f8"), ("hedef", "f8"), ("yontem_sayisi", "i1")])
+
+
+def _sayi(v) -> float:
+    try: return float(v) if v is not None else np.nan
+    except (TypeError, ValueError): return np.nan
+
+def _yuvarla(a, basamak: int = 2) -> np.ndarray:
+    """
+    Python round() ile eleman bazında yuvarlama — info/JSON'dan gelen Python
+    float'larında eski hesapla birebir aynı sonuç (np.round ölçekleyerek
+    yuvarladığından .xx5 sınırında bir kuruş farklı olabilir).
+    """
+    return np.array([round(x, basamak) for x in np.asarray(a, dtype=float).tolist()], dtype=float)
+
+def _var(a: np.ndarray) -> np.ndarray:
+    """Eski `if x:` kontrolü: değer var ve sıfır değil."""
+    return ~np.isnan(a) & (a != 0)
+
+def holding_mi(sektor: str) -> bool:
+    sektor = (sektor or "").lower()
+    return sektor in HOLDING_SEKTORLER or "holding" in sektor
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# GİRDİ TABLOSU
+# ════════════════════════════════════════════════════════════════════════════
+
+def girdi_tablosu(hisseler, bilgiler: Optional[dict] = None,
+                  holding: Optional[Callable[[str], bool]] = holding_mi) -> pd.DataFrame:
+    """
+    HisseDerin benzeri nesnelerden (fiyat, fib, direnc, atr, bb_ust, fk_orani,
+    sektor) GIRDI_ALANLARI tablosu; indeks ticker, eksik → NaN.
+    bilgiler: {ticker veya ticker.IS: yfinance info} — analist hedefi için.
+    holding(sektor) True olan hisselerde F/K değerlemesi yapılmaz (hedef_fk NaN).
+    """
+    bilgiler = bilgiler or {}
+    satirlar = []
+    for h in hisseler:
+        fib = h.fib or {}
+        bilgi = bilgiler.get(h.ticker) or bilgiler.get(f"{h.ticker}.IS") or {}
+        hold = holding(h.sektor) if holding else False
+        satirlar.append({
+            "fiyat":         _sayi(h.fiyat),
+            "fib127":        _sayi(fib.get("1.272")),
+            "fib162":        _sayi(fib.get("1.618")),
+            "direnc":        _sayi(h.direnc),
+            "atr":           _sayi(h.atr),
+            "bb_ust":        _sayi(h.bb_ust),
+            "analist_hedef": _sayi(bilgi.get("targetMeanPrice")),
+            "fk_orani":      _sayi(h.fk_orani),
+            "hedef_fk":      np.nan if hold else
+                             SEKTOR_FK_HEDEF.get(h.sektor, SEKTOR_FK_HEDEF["default"]),
+        })
+    return pd.DataFrame(satirlar, index=pd.Index([h.ticker for h in hisseler], name="ticker"),
+                        columns=GIRDI_ALANLARI, dtype=float)
+
+def matris_girdileri(m: PiyasaMatrisi, bilgiler: Optional[dict] = None,
+                     holding: Optional[Callable[[str], bool]] = holding_mi) -> pd.DataFrame:
+    """
+    girdi_tablosu'nun PiyasaMatrisi karşılığı: gösterge alanları derin
+    aşamanın (gostergeleri_hesapla) tanımlarıyla, tüm tickerlar için tek
+    geçişte ve her tickerın kendi son barından okunur — fiyat son kapanış,
+    fib127/fib162 60 bar kapanış tepe/dip uzantısı, direnç 20 bar kapanış
+    zirvesi, ATR 14, Bollinger (20, 2) üst bandı. Boşluksuz sütunlarda
+    değerler derin aşamayla aynıdır. bilgiler: {ticker: yfinance info}
+    (analist hedefi, trailingPE, sector). ASGARI_BAR'dan kısa geçmiş satır
+    üretmez; indeks matrisin tickerlarıdır.
+    """
+    if not len(m.close):
+        return pd.DataFrame(columns=GIRDI_ALANLARI, dtype=float,
+                            index=pd.Index(m.tickers, name="ticker"))
+    bilgiler = bilgiler or {}
+    son = m.son
+    kap = uc_bankasi(m.close, (20, 60), kisa_pencere=True)
+    tepe, dip = son(kap[60][0]), son(kap[60][1])
+    aralik = tepe - dip
+    orta = m.sma_bankasi((20,))[20]
+    bb_ust = orta + 2 * m.close.rolling(20).std()
+    info = [bilgiler.get(t) or {} for t in m.tickers]
+    sektor = [b.get("sector", "Bilinmiyor") for b in info]
+    tablo = pd.DataFrame({
+        "fiyat":         np.round(son(m.close), 2),
+        "fib127":        np.round(tepe + 0.272 * aralik, 2),
+        "fib162":        np.round(tepe + 0.618 * aralik, 2),
+        "direnc":        np.round(son(kap[20][0]), 2),
+        "atr":           np.round(son(m.atr(14)), 4),
+        "bb_ust":        np.round(son(bb_ust), 2),
+        "analist_hedef": [_sayi(b.get("targetMeanPrice")) for b in info],
+        "fk_orani":      [_sayi(b.get("trailingPE")) for b in info],
+        "hedef_fk":      [np.nan if holding and holding(s) else
+                          SEKTOR_FK_HEDEF.get(s, SEKTOR_FK_HEDEF["default"]) for s in sektor],
+    }, index=pd.Index(m.tickers, name="ticker"), columns=GIRDI_ALANLARI, dtype=float)
+    return tablo[(m.bar_sayisi >= ASGARI_BAR).reindex(tablo.index).to_numpy()]
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# HEDEFLER
+# ════════════════════════════════════════════════════════════════════════════
+
+def hedefleri_hesapla(girdi: pd.DataFrame) -> np.ndarray:
+    """
+    Tüm satırlar için yöntem hedefleri ve konsensüs → HEDEF_DTYPE dizisi.
+    Yöntem alanı NaN ise o yöntem bu hisse için çalışmadı. konsensus ağırlıklı
+    ortalamadır (yöntem yoksa NaN); hedef alt sınır / varsayılan uygulanmış
+    son değerdir. Yuvarlamalar eski hisse başına hesapla aynıdır.
+    """
+    s = {a: girdi[a].to_numpy(dtype=float) for a in GIRDI_ALANLARI}
+    fiyat, fk, hedef_fk = s["fiyat"], s["fk_orani"], s["hedef_fk"]
+    analist = s["analist_hedef"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        adaylar = {
+            "fib127":    s["fib127"],
+            "fib162":    s["fib162"],
+            "direnc":    s["direnc"],
+            "atr_rr3":   np.round(fiyat + ATR_RR * (ATR_STOP_KAT * s["atr"]), 2),
+            "bollinger": s["bb_ust"],
+            # analist hedefi yuvarlanmadan önce fiyatla karşılaştırılır
+            "analist":   np.where(analist > fiyat, _yuvarla(analist), np.nan),
+            "fk_deger":  np.where(_var(fk) & (fk > 0) & (fk < hedef_fk * FK_ISKONTO),
+                                  np.round(fiyat * (hedef_fk / fk), 2), np.nan),
+        }
+        sonuc = np.zeros(len(girdi), dtype=HEDEF_DTYPE)
+        sonuc["ticker"] = [str(t) for t in girdi.index]
+        sonuc["fiyat"] = fiyat
+        sonuc["atr"] = s["atr"]           # P&L trailing stop'u aynı diziden okur
+        toplam = np.zeros(len(girdi)); agirlik = np.zeros(len(girdi))
+        for ad, w in YONTEMLER:
+            d = adaylar[ad]
+            gecerli = _var(d) & (d > fiyat)
+            sonuc[ad] = np.where(gecerli, d, np.nan)
+            # yöntem sırasıyla biriktir (eski sum() ile aynı toplama sırası)
+            toplam  += np.where(gecerli, d * w, 0.0)
+            agirlik += np.where(gecerli, w, 0.0)
+            sonuc["yontem_sayisi"] += gecerli
+        var = sonuc["yontem_sayisi"] > 0
+        sonuc["konsensus"] = np.where(var, toplam / agirlik, np.nan)
+        sonuc["hedef"] = np.where(var, np.maximum(np.round(sonuc["konsensus"], 2),
+                                                  np.round(fiyat * ASGARI_KAT, 2)),
+                                  np.round(fiyat * VARSAYILAN_KAT, 2))
+    return sonuc
+
+def hedef_sonucu(kayit) -> dict:
+    """Dizinin tek satırından hedef_analiz sözlüğü: {"hedef", "yontem", "detay"}."""
+    hedef = float(kayit["hedef"])
+    if not kayit["yontem_sayisi"]:
+        return {"hedef": hedef, "yontem": "varsayilan_+8pct", "detay": {}}
+    fiyat = kayit["fiyat"]
+    detay = {
+        ad: {"fiyat": float(np.round(kayit[ad], 2)),
+             "agirlik_pct": round(w*100),
+             "upside_pct": float(np.round((kayit[ad]/fiyat - 1)*100, 1))}
+        for ad, w in YONTEMLER if not np.isnan(kayit[ad])
+    }
+    return {"hedef": hedef, "yontem": "agirlikli_konsensus", "detay": detay}
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# POZİSYON HEDEF / STOP
+# ════════════════════════════════════════════════════════════════════════════
+
+def pozisyon_hedef_stop(giris, hedef, atr) -> tuple:
+    """
+    Giriş fiyatlarından (hedef, stop) dizileri. hedef ve atr hedefleri_hesapla
+    dizisinin aynı adlı alanlarıdır: pozisyon hedefi konsensüs hedefi, stop
+    giriş − ATR × 1.5; ikisi de girişe göre POZ_*_ARALIK oranlarına
+    sıkıştırılır. Giriş fiyatları portföy JSON'undan geldiği için round()
+    yuvarlaması kullanılır.
+    """
+    giris, hedef, atr = (np.asarray(a, dtype=float) for a in (giris, hedef, atr))
+    stop = _yuvarla(giris - ATR_STOP_KAT * atr)
+    # fmax: NaN ara değerde alt sınır kalır
+    hedef = np.fmax(_yuvarla(giris * POZ_HEDEF_ARALIK[0]),
+                    np.minimum(hedef, _yuvarla(giris * POZ_HEDEF_ARALIK[1])))
+    stop  = np.fmax(_yuvarla(giris * POZ_STOP_ARALIK[0]),
+                    np.minimum(stop, _yuvarla(giris * POZ_STOP_ARALIK[1])))
+    return hedef, stop
@@ -7,10 +7,14 @@ from datetime import datetime
 warnings.filterwarnings("ignore")
 import numpy as np
 import yfinance as yf
-import requests
 from dotenv import load_dotenv
 load_dotenv()
 
+from fiyat_onbellek import fiyat_gecmisi
+from indikatorler import destek_direnc_bolgeleri
+from gosterge_bellegi import gosterge, GOSTERGE_DONEMI
+import http_istemci
+
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN","")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID","")
 GROQ_API_KEY     = os.getenv("GROQ_API_KEY","")
@@ -27,19 +31,9 @@ POZISYONLAR = {
 # TEKNİK ANALİZ
 # ────────────────────────────────────────────────────────────
 
-def rsi_hesapla(seri, period=14):
-    delta = seri.diff()
-    kazanc = delta.clip(lower=0)
-    kayip  = (-delta).clip(lower=0)
-    ort_k  = kazanc.rolling(period).mean()
-    ort_ka = kayip.rolling(period).mean()
-    rs     = ort_k / ort_ka
-    return 100 - (100 / (1 + rs))
-
-
 def teknik_analiz(ticker: str) -> dict:
     try:
-        df = yf.Ticker(ticker).history(period="6mo", interval="1d", auto_adjust=True)
+        df = fiyat_gecmisi(ticker, period=GOSTERGE_DONEMI, interval="1d", auto_adjust=True)
         if df is None or len(df) < 30:
             return {}
 
@@ -60,14 +54,15 @@ def teknik_analiz(ticker: str) -> dict:
         ay3_deg  = (bugun/ay3  - 1)*100 if ay3  else None
 
         # RSI
-        rsi_seri = rsi_hesapla(kapanis)
+        rsi_seri = gosterge(ticker, "1d", df, "rsi")
         rsi      = float(rsi_seri.iloc[-1])
         rsi_dun  = float(rsi_seri.iloc[-2])
 
         # Hareketli ortalamalar
-        ma20  = float(kapanis.rolling(20).mean().iloc[-1])
-        ma50  = float(kapanis.rolling(50).mean().iloc[-1])
-        ma200 = float(kapanis.rolling(200).mean().iloc[-1]) if len(kapanis) >= 200 else None
+        s20, s50, s200 = gosterge(ticker, "1d", df, "sma_bankasi", pencereler=(20, 50, 200))
+        ma20  = float(s20.iloc[-1])
+        ma50  = float(s50.iloc[-1])
+        ma200 = float(s200.iloc[-1]) if len(kapanis) >= 200 else None
 
         # Destek: Son 3 aylık dip
         son3ay    = kapanis.iloc[-66:] if len(kapanis) >= 66 else kapanis
@@ -76,6 +71,11 @@ def teknik_analiz(ticker: str) -> dict:
         dipe_uzak = (bugun/destek - 1)*100
         zirveye   = (direnc/bugun - 1)*100
 
+        # Pivot bölgeleri: en yakın destek/direnç (yoksa 3 aylık dip/zirve)
+        bolge        = destek_direnc_bolgeleri(kapanis, df["High"], df["Low"])
+        pivot_destek = bolge["destekler"][0]["seviye"] if bolge["destekler"] else destek
+        pivot_direnc = bolge["direncler"][0]["seviye"] if bolge["direncler"] else direnc
+
         # Hacim
         hacim_bugun = float(hacim.iloc[-1])
         hacim_ort   = float(hacim.iloc[-20:].mean())
@@ -85,17 +85,13 @@ def teknik_analiz(ticker: str) -> dict:
         sar_yon = "ASAGI" if bugun < ma20 else "YUKARI"
 
         # Bollinger
-        std20   = float(kapanis.rolling(20).std().iloc[-1])
+        std20   = float(gosterge(ticker, "1d", df, "std", w=20).iloc[-1])
         bb_ust  = ma20 + 2*std20
         bb_alt  = ma20 - 2*std20
         bb_poz  = (bugun - bb_alt) / (bb_ust - bb_alt) * 100 if (bb_ust - bb_alt) > 0 else 50
 
         # MACD
-        ema12   = kapanis.ewm(span=12).mean()
-        ema26   = kapanis.ewm(span=26).mean()
-        macd    = ema12 - ema26
-        sinyal  = macd.ewm(span=9).mean()
-        histo   = macd - sinyal
+        _, _, histo = gosterge(ticker, "1d", df, "macd", adjust=True)
         macd_yon = "YUKARI" if float(histo.iloc[-1]) > float(histo.iloc[-2]) else "ASAGI"
 
         return {
@@ -117,6 +113,8 @@ def teknik_analiz(ticker: str) -> dict:
             "direnc":    direnc,
             "dipe_uzak": dipe_uzak,
             "zirveye":   zirveye,
+            "pivot_destek": pivot_destek,
+            "pivot_direnc": pivot_direnc,
             "hacim_x":   hacim_x,
             "sar_yon":   sar_yon,
             "bb_poz":    bb_poz,
@@ -339,6 +337,7 @@ def mesaj_olustur(analizler: list, makro: dict, ai: str) -> str:
         )
         s.append(
             f"  3Ay Dip:{t.get('destek',0):.2f} ({t.get('dipe_uzak',0):.1f}% uzak) | "
+            f"Pivot D/R:{t.get('pivot_destek',0):.2f}/{t.get('pivot_direnc',0):.2f} | "
             f"BB:%{t.get('bb_poz',50):.0f}"
         )
         s.append(f"  Puan: {k['puan']}/12")
@@ -357,7 +356,7 @@ def telegram_gonder(mesaj):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         return False
     try:
-        r = requests.post(
+        r = http_istemci.post(
             f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
             json={"chat_id": TELEGRAM_CHAT_ID, "text": mesaj, "parse_mode": "HTML"},
             timeout=15,
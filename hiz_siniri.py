@@ -0,0 +1,46 @@
+"""
+İSTEK HIZ SINIRLAYICI
+=====================
+Paralel çalışan iş parçacıklarının Yahoo'ya toplamda saniyede belli sayıda
+istek atmasını sağlayan token-bucket. Kova KAPASITE kadar dolabilir
+(kısa patlamalara izin), saniyede HIZ kadar token eklenir; token yoksa
+çağıran bekler.
+
+Kullanım:
+    from hiz_siniri import YAHOO_KOVA
+    YAHOO_KOVA.al()          # istekten hemen önce
+"""
+
+import os, time, threading
+
+
+class TokenKovasi:
+    def __init__(self, hiz: float, kapasite: float):
+        self.hiz      = float(hiz)
+        self.kapasite = float(kapasite)
+        self._token   = float(kapasite)
+        self._son     = time.monotonic()
+        self._kilit   = threading.Lock()
+
+    def _doldur(self):
+        simdi = time.monotonic()
+        self._token = min(self.kapasite, self._token + (simdi - self._son) * self.hiz)
+        self._son = simdi
+
+    def al(self, adet: float = 1.0):
+        """adet kadar token alınana kadar bekle."""
+        while True:
+            with self._kilit:
+                self._doldur()
+                if self._token >= adet:
+                    self._token -= adet
+                    return
+                bekle = (adet - self._token) / self.hiz
+            time.sleep(bekle)
+
+
+# Yahoo için ortak kova — tüm modüller aynı nesneyi paylaşır
+YAHOO_KOVA = TokenKovasi(
+    hiz=float(os.getenv("BIST_YAHOO_HIZ", "4")),
+    kapasite=float(os.getenv("BIST_YAHOO_KAPASITE", "8")),
+)
@@ -0,0 +1,72 @@
+"""
+ORTAK HTTP İSTEMCİSİ
+====================
+Tüm modüllerin (Telegram, KAP, gold-api, Stooq, MKK, haber kaynakları)
+paylaştığı tek requests.Session. Host başına keep-alive bağlantı havuzu
+sayesinde aynı sunucuya yapılan ardışık çağrılar yeniden TCP+TLS el
+sıkışması yapmaz.
+
+  - Zaman aşımı verilmezse VARSAYILAN_ZAMAN (bağlantı, okuma) kullanılır.
+  - GET istekleri 429/5xx ve bağlantı hatalarında üstel beklemeyle yeniden denenir.
+  - POST yalnızca bağlantı kurulamadığında yeniden denenir (Telegram mesajı
+    iki kez gitmesin diye durum koduna göre tekrar yok).
+
+Kullanım:
+    import http_istemci
+    r = http_istemci.get(url, headers=..., timeout=10)
+    r = http_istemci.post(url, json=...)
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import kayit_oynat
+
+VARSAYILAN_ZAMAN = (5, 15)     # (bağlantı, okuma) saniye
+HAVUZ_HOST       = 16          # havuzda tutulan farklı host sayısı
+HAVUZ_BOYUT      = 16          # host başına eşzamanlı bağlantı
+
+_OTURUM: requests.Session = None
+_KILIT = threading.Lock()
+
+
+def _oturum_olustur() -> requests.Session:
+    tekrar = Retry(
+        total=3, connect=3, read=1, status=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adaptor = HTTPAdapter(pool_connections=HAVUZ_HOST, pool_maxsize=HAVUZ_BOYUT, max_retries=tekrar)
+    s = requests.Session()
+    s.mount("https://", adaptor)
+    s.mount("http://", adaptor)
+    return s
+
+def oturum() -> requests.Session:
+    """Süreç genelinde paylaşılan Session (ilk çağrıda oluşturulur)."""
+    global _OTURUM
+    if _OTURUM is None:
+        with _KILIT:
+            if _OTURUM is None:
+                _OTURUM = _oturum_olustur()
+    return _OTURUM
+
+def _kasetli(yontem: str, url: str, kw: dict) -> requests.Response:
+    kw.setdefault("timeout", VARSAYILAN_ZAMAN)
+    if not kayit_oynat.aktif():
+        return oturum().request(yontem, url, **kw)
+    # POST gövdesi (tarih/saat içeren mesajlar) anahtara girmez
+    anahtar = (yontem, url, repr(sorted((kw.get("params") or {}).items())))
+    return kayit_oynat.kayitli("http", anahtar, lambda: oturum().request(yontem, url, **kw))
+
+def get(url: str, **kw) -> requests.Response:
+    return _kasetli("GET", url, kw)
+
+def post(url: str, **kw) -> requests.Response:
+    return _kasetli("POST", url, kw)
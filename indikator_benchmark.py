@@ -0,0 +1,164 @@
+"""
+GÖSTERGE MİKRO-BENCHMARK
+========================
+indikatorler.py çekirdeklerini (SAR, RSI, pivot, SMA bankası + kesişim, mum
+formasyonları) eski (pandas .iloc döngüsü /
+önek döngüsü) referans uygulamalarıyla karşılaştırır: önce çıktıların birebir
+aynı olduğunu doğrular, sonra süreleri ölçer. Ağ gerektirmez; sentetik OHLC serisi kullanır.
+
+Kullanım:
+    python indikator_benchmark.py            # 125 bar (6 ay) + 2500 bar (10 yıl)
+    python indikator_benchmark.py 5000 20    # bar sayısı, tekrar
+"""
+
+import sys, time
+
+import numpy as np
+import pandas as pd
+
+from indikatorler import (rsi_serisi, parabolic_sar_serisi, pivot_noktalari, sma_bankasi, kesisimler,
+                          mum_formasyon_taramasi)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# REFERANS (ESKİ) UYGULAMALAR
+# ════════════════════════════════════════════════════════════════════════════
+
+def _sar_iloc(h, l, c, af=0.02, max_af=0.2):
+    sar = l.copy(); trend = 1; ep = h.iloc[0]; af_cur = af
+    for i in range(2, len(c)):
+        if trend == 1:
+            sar.iloc[i] = sar.iloc[i-1] + af_cur*(ep - sar.iloc[i-1])
+            sar.iloc[i] = min(sar.iloc[i], l.iloc[i-1], l.iloc[i-2])
+            if l.iloc[i] < sar.iloc[i]:
+                trend=-1; sar.iloc[i]=ep; ep=l.iloc[i]; af_cur=af
+        else:
+            sar.iloc[i] = sar.iloc[i-1] + af_cur*(ep - sar.iloc[i-1])
+            sar.iloc[i] = max(sar.iloc[i], h.iloc[i-1], h.iloc[i-2])
+            if h.iloc[i] > sar.iloc[i]:
+                trend=1; sar.iloc[i]=ep; ep=h.iloc[i]; af_cur=af
+        if trend==1  and h.iloc[i]>ep: ep=h.iloc[i]; af_cur=min(af_cur+af,max_af)
+        if trend==-1 and l.iloc[i]<ep: ep=l.iloc[i]; af_cur=min(af_cur+af,max_af)
+    return sar
+
+def _rsi_tek(s, p=14):
+    d = s.diff(); g = d.clip(lower=0).rolling(p).mean()
+    k = (-d.clip(upper=0)).rolling(p).mean()
+    return round((100 - 100/(1+g/k)).iloc[-1], 2)
+
+def _rsi_onek(c):
+    return pd.Series([_rsi_tek(c.iloc[:i+1]) for i in range(len(c))])
+
+def _pivot_iloc(s, w=5):
+    tepe = np.zeros(len(s), dtype=bool); dip = np.zeros(len(s), dtype=bool)
+    for i in range(w, len(s)-w):
+        d = s.iloc[i-w:i+w]
+        tepe[i] = s.iloc[i] == d.max(); dip[i] = s.iloc[i] == d.min()
+    return tepe, dip
+
+def _kesisim_iloc(c, hizli=50, yavas=200, geri=4):
+    """Her bar için golden_death_cross'un eski son-5-bar döngüsü (geçmiş taraması)."""
+    h = c.rolling(hizli).mean(); y = c.rolling(yavas).mean()
+    olay = np.zeros(len(c), dtype=np.int8)
+    for t in range(len(c)):
+        simdi = h.iloc[t] - y.iloc[t]
+        for i in range(1, min(geri, t) + 1):
+            onceki = h.iloc[t-i] - y.iloc[t-i]
+            if onceki < 0 and simdi > 0: olay[t] = 1; break
+            if onceki > 0 and simdi < 0: olay[t] = -1; break
+    return olay
+
+def _mum_tek(o, h, l, c):
+    """Eski mum_formasyonlari: son üç barın .iloc okumaları."""
+    f = []
+    o1,h1,l1,c1 = o.iloc[-1],h.iloc[-1],l.iloc[-1],c.iloc[-1]
+    o2,h2,l2,c2 = o.iloc[-2],h.iloc[-2],l.iloc[-2],c.iloc[-2]
+    o3,h3,l3,c3 = o.iloc[-3],h.iloc[-3],l.iloc[-3],c.iloc[-3]
+    g1=abs(c1-o1); g2=abs(c2-o2); g3=abs(c3-o3); r1=h1-l1; r2=h2-l2
+    if r1 > 0:
+        af = min(o1,c1) - l1; uf = h1 - max(o1,c1)
+        if af >= 2*g1 and uf < g1*0.3: f.append("HAMMER(AL)")
+        if uf >= 2*g1 and af < g1*0.3: f.append("SHOOTING_STAR(SAT)")
+    if r1 > 0 and g1 < r1*0.1: f.append("DOJI(KARARSIZ)")
+    if c2 < o2 and c1 > o1 and o1 < c2 and c1 > o2: f.append("BULLISH_ENGULFING(AL)")
+    if c2 > o2 and c1 < o1 and o1 > c2 and c1 < o2: f.append("BEARISH_ENGULFING(SAT)")
+    if (c3 < o3 and g3 > (h3-l3)*0.5 if (h3-l3) > 0 else False):
+        if g2 < r2*0.3 and c1 > o1 and c1 > (o3+c3)/2: f.append("MORNING_STAR(AL)")
+    if c3 > o3 and g3 > (h3-l3)*0.5:
+        if g2 < r2*0.3 and c1 < o1 and c1 < (o3+c3)/2: f.append("EVENING_STAR(SAT)")
+    if c1>o1 and c2>o2 and c3>o3 and c1>c2>c3 and o1>o2>o3: f.append("THREE_WHITE_SOLDIERS(GUCLU_AL)")
+    if c1<o1 and c2<o2 and c3<o3 and c1<c2<c3 and o1<o2<o3: f.append("THREE_BLACK_CROWS(GUCLU_SAT)")
+    return f
+
+def _mum_onek(o, h, l, c):
+    return [_mum_tek(o.iloc[:i+1], h.iloc[:i+1], l.iloc[:i+1], c.iloc[:i+1]) for i in range(2, len(c))]
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ÖLÇÜM
+# ════════════════════════════════════════════════════════════════════════════
+
+def sentetik_ohlc(n: int, tohum: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(tohum)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    aralik = np.abs(rng.normal(0, 0.01, n)) * c
+    return pd.DataFrame({"High": c + aralik, "Low": c - aralik, "Close": c},
+                        index=pd.bdate_range("2015-01-01", periods=n))
+
+def _sure(fn, tekrar: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(tekrar):
+        fn()
+    return (time.perf_counter() - t0) / tekrar * 1000
+
+def olc(n: int, tekrar: int):
+    df = sentetik_ohlc(n)
+    h, l, c = df["High"], df["Low"], df["Close"]
+
+    eski_sar = _sar_iloc(h, l, c).to_numpy()
+    yeni_sar, _ = parabolic_sar_serisi(h.to_numpy(), l.to_numpy())
+    assert np.array_equal(eski_sar, yeni_sar), "SAR çıktısı farklı!"
+    t_eski = _sure(lambda: _sar_iloc(h, l, c), tekrar)
+    t_yeni = _sure(lambda: parabolic_sar_serisi(h.to_numpy(), l.to_numpy()), tekrar)
+    print(f"  SAR   n={n:<5} eski {t_eski:9.2f} ms | yeni {t_yeni:7.3f} ms | x{t_eski/t_yeni:,.0f}")
+
+    eski_rsi = _rsi_onek(c).to_numpy()
+    yeni_rsi = rsi_serisi(c).round(2).to_numpy()
+    assert np.array_equal(eski_rsi, yeni_rsi, equal_nan=True), "RSI çıktısı farklı!"
+    t_eski = _sure(lambda: _rsi_onek(c), max(1, tekrar // 10))
+    t_yeni = _sure(lambda: rsi_serisi(c).round(2), tekrar)
+    print(f"  RSI   n={n:<5} eski {t_eski:9.2f} ms | yeni {t_yeni:7.3f} ms | x{t_eski/t_yeni:,.0f}")
+
+    eski_t, eski_d = _pivot_iloc(c)
+    yeni_t, yeni_d = pivot_noktalari(c)
+    assert np.array_equal(eski_t, yeni_t) and np.array_equal(eski_d, yeni_d), "Pivot çıktısı farklı!"
+    t_eski = _sure(lambda: _pivot_iloc(c), max(1, tekrar // 10))
+    t_yeni = _sure(lambda: pivot_noktalari(c), tekrar)
+    print(f"  PIVOT n={n:<5} eski {t_eski:9.2f} ms | yeni {t_yeni:7.3f} ms | x{t_eski/t_yeni:,.0f}")
+
+    def _yeni_kesisim():
+        b = sma_bankasi(c, (20, 50, 200))
+        return kesisimler(b[50], b[200], geri=4).to_numpy()
+    b = sma_bankasi(c, (20, 50, 200))
+    for w in (20, 50, 200):
+        assert np.allclose(b[w], c.rolling(w).mean(), rtol=1e-12, equal_nan=True), "SMA çıktısı farklı!"
+    assert np.array_equal(_kesisim_iloc(c), _yeni_kesisim()), "Kesişim çıktısı farklı!"
+    t_eski = _sure(lambda: _kesisim_iloc(c), max(1, tekrar // 10))
+    t_yeni = _sure(_yeni_kesisim, tekrar)
+    print(f"  MA+X  n={n:<5} eski {t_eski:9.2f} ms | yeni {t_yeni:7.3f} ms | x{t_eski/t_yeni:,.0f}")
+
+    o = c.shift().bfill()
+    tarama = mum_formasyon_taramasi(o, h, l, c)
+    yeni_mum = [[ad for ad, m in tarama.items() if m[i]] for i in range(2, len(c))]
+    assert _mum_onek(o, h, l, c) == yeni_mum, "Mum formasyonu çıktısı farklı!"
+    t_eski = _sure(lambda: _mum_onek(o, h, l, c), max(1, tekrar // 10))
+    t_yeni = _sure(lambda: mum_formasyon_taramasi(o, h, l, c), tekrar)
+    print(f"  MUM   n={n:<5} eski {t_eski:9.2f} ms | yeni {t_yeni:7.3f} ms | x{t_eski/t_yeni:,.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        olc(int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 10)
+    else:
+        olc(125, 20)
+        olc(2500, 3)
@@ -0,0 +1,352 @@
+"""
+ORTAK GÖSTERGE ÇEKİRDEKLERİ
+===========================
+Birden fazla modülün kullandığı, tüm seriyi tek geçişte hesaplayan
+vektörel gösterge fonksiyonları. Modüllerdeki tek değer döndüren yardımcılar
+(hesapla_rsi, _rsi ...) bu serilerin son elemanını alır; önek (prefix)
+döngüleriyle tek tek hesaplamak yerine serinin ilgili konumu okunur.
+
+Gösterge serileri nedenseldir: i. değer sadece 0..i verisine bağlıdır, bu yüzden
+seri[i] == eski_fonksiyon(s.iloc[:i+1]). Pivot tespiti istisnadır; merkezlenmiş
+pencere kullandığı için son w bar henüz pivot olamaz. Mum formasyonu ileri
+getiri istatistikleri de tanım gereği geleceğe bakar (sadece geçmiş analizi).
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def rsi_serisi(s: pd.Series, p: int = 14, wilder: bool = False,
+               sifir_yerine: Optional[float] = None) -> pd.Series:
+    """
+    Tüm seri için RSI.
+      wilder=False → kazanç/kayıp için basit hareketli ortalama (rolling)
+      wilder=True  → Wilder yumuşatması (ewm alpha=1/p, adjust=False)
+      sifir_yerine → ortalama kayıp 0 ise yerine konacak değer
+                     (None: dokunma → RSI 100, np.nan → RSI NaN, 1e-9 → ~100)
+    """
+    d = s.diff()
+    g = d.clip(lower=0)
+    k = -d.clip(upper=0)
+    if wilder:
+        g = g.ewm(alpha=1/p, adjust=False).mean()
+        k = k.ewm(alpha=1/p, adjust=False).mean()
+    else:
+        g = g.rolling(p).mean()
+        k = k.rolling(p).mean()
+    if sifir_yerine is not None:
+        k = k.replace(0, sifir_yerine)
+    return 100 - 100 / (1 + g / k)
+
+
+def gercek_aralik(h, l, c):
+    """
+    True range: max(H-L, |H-C₋₁|, |L-C₋₁|). ATR ve ADX ortak ara değeri.
+    Series veya DataFrame (tarih × ticker) alır; NaN bileşenler atlanır.
+    """
+    onceki = c.shift()
+    return np.fmax(np.fmax(h-l, (h-onceki).abs()), (l-onceki).abs())
+
+
+def obv_serisi(c: pd.Series, v: pd.Series) -> pd.Series:
+    """On-balance volume kümülatif toplamı (ilk bar ve değişmeyen kapanış yönü 0)."""
+    return (np.sign(c.diff().fillna(0)).astype(int) * v).cumsum()
+
+
+def sma_bankasi(s, pencereler) -> dict:
+    """
+    Birden çok pencere için basit hareketli ortalama — tek kümülatif toplamdan.
+    s.rolling(w).mean() ile aynı NaN kuralı (pencerede NaN varsa NaN); pencere
+    tamamen sabitse değer serinin kendisidir (pandas'ın eş değer kısayolu gibi).
+    Diğer değerler rolling ile ~1e-12 göreli farka kadar aynıdır.
+    Series veya DataFrame (tarih × ticker) alır. Dönüş: {pencere: seri}.
+    """
+    x  = np.asarray(s, dtype=float)
+    x2 = x.reshape(len(x), -1)
+    n  = len(x2)
+    gecerli = ~np.isnan(x2)
+    sifir   = np.zeros((1, x2.shape[1]))
+    toplam  = np.vstack([sifir, np.cumsum(np.where(gecerli, x2, 0.), axis=0)])
+    adet    = np.vstack([sifir, np.cumsum(gecerli, axis=0)])
+    degisim = np.ones_like(x2)
+    degisim[1:] = x2[1:] != x2[:-1]                 # NaN da değişim sayılır
+    degisim = np.cumsum(degisim, axis=0)
+    sonuc = {}
+    for w in pencereler:
+        ort = np.full_like(x2, np.nan)
+        if 0 < w <= n:
+            dolu  = adet[w:] - adet[:-w] == w
+            sabit = degisim[w-1:] - degisim[:n-w+1] == 0
+            deger = (toplam[w:] - toplam[:-w]) / w
+            ort[w-1:] = np.where(dolu, np.where(sabit, x2[w-1:], deger), np.nan)
+        ort = ort.reshape(x.shape)
+        if isinstance(s, pd.DataFrame):
+            sonuc[w] = pd.DataFrame(ort, index=s.index, columns=s.columns)
+        elif isinstance(s, pd.Series):
+            sonuc[w] = pd.Series(ort, index=s.index)
+        else:
+            sonuc[w] = ort
+    return sonuc
+
+
+def uc_bankasi(s, pencereler, kisa_pencere: bool = False) -> dict:
+    """
+    Kayan en yüksek / en düşük değerler: {pencere: (max serisi, min serisi)}.
+    Stokastik, Ichimoku, Fibonacci ve destek/direnç aynı bankadan okur.
+    kisa_pencere=True ise ilk pencere-1 barda da eldeki barlarla değer
+    üretilir (son değer s.tail(pencere).max()/min() ile aynıdır).
+    """
+    sonuc = {}
+    for w in dict.fromkeys(pencereler):
+        r = s.rolling(w, min_periods=1 if kisa_pencere else w)
+        sonuc[w] = (r.max(), r.min())
+    return sonuc
+
+
+def kesisimler(hizli, yavas, geri: int = 1):
+    """
+    Tüm geçmiş için kesişim olayları: +1 yukarı (golden), -1 aşağı (death), 0 yok.
+    t. barda fark = hizli - yavas > 0 ve önceki `geri` barın herhangi birinde
+    fark < 0 ise +1 (tersi -1). geri=1 klasik ardışık bar kesişimidir; sıfıra
+    değip dönen farklar kesişim sayılmaz. Girdi tipinde (Series/DataFrame/dizi) int8 döner.
+    """
+    fark = pd.DataFrame(np.asarray(hizli, dtype=float).reshape(len(hizli), -1)
+                        - np.asarray(yavas, dtype=float).reshape(len(yavas), -1))
+    onceki = fark.shift(1)
+    en_dusuk  = onceki.rolling(geri, min_periods=1).min().to_numpy()
+    en_yuksek = onceki.rolling(geri, min_periods=1).max().to_numpy()
+    f = fark.to_numpy()
+    olay = np.where((f > 0) & (en_dusuk < 0), 1, np.where((f < 0) & (en_yuksek > 0), -1, 0)).astype(np.int8)
+    if isinstance(hizli, pd.DataFrame):
+        return pd.DataFrame(olay, index=hizli.index, columns=hizli.columns)
+    olay = olay.reshape(np.shape(hizli))
+    return pd.Series(olay, index=hizli.index) if isinstance(hizli, pd.Series) else olay
+
+
+def parabolic_sar_serisi(h, l, af: float = 0.02, max_af: float = 0.2) -> tuple:
+    """
+    Parabolic SAR — düz dizilerle tek geçiş.
+    Dönüş: (sar, trend) numpy dizileri; trend +1 yükselen, -1 düşen.
+    İlk iki bar başlangıç değeridir (sar = low, trend = +1).
+    """
+    hl = np.asarray(h, dtype=float).tolist()
+    ll = np.asarray(l, dtype=float).tolist()
+    n = len(hl)
+    sar = list(ll)
+    trend_d = [1] * n
+    if n == 0:
+        return np.array(sar, dtype=float), np.array(trend_d, dtype=np.int8)
+    trend = 1; ep = hl[0]; af_cur = af
+    for i in range(2, n):
+        if trend == 1:
+            s = sar[i-1] + af_cur*(ep - sar[i-1])
+            s = min(s, ll[i-1], ll[i-2])
+            if ll[i] < s:
+                trend = -1; s = ep; ep = ll[i]; af_cur = af
+        else:
+            s = sar[i-1] + af_cur*(ep - sar[i-1])
+            s = max(s, hl[i-1], hl[i-2])
+            if hl[i] > s:
+                trend = 1; s = ep; ep = hl[i]; af_cur = af
+        sar[i] = s
+        if trend == 1  and hl[i] > ep: ep = hl[i]; af_cur = min(af_cur+af, max_af)
+        if trend == -1 and ll[i] < ep: ep = ll[i]; af_cur = min(af_cur+af, max_af)
+        trend_d[i] = trend
+    return np.array(sar, dtype=float), np.array(trend_d, dtype=np.int8)
+
+
+def pivot_noktalari(s, w: int = 5) -> tuple:
+    """
+    Merkezlenmiş kayan ekstremumlarla pivot tepe/dip tespiti.
+    i. bar, [i-w, i+w) penceresinin maksimumuna eşitse tepe, minimumuna
+    eşitse diptir (eski s.iloc[i-w:i+w].max() döngüsüyle aynı pencere).
+    Aday barlar w .. len-w-1; pencere sağa taştığı için son w bar pivot olamaz.
+    Dönüş: (tepe, dip) bool numpy dizileri.
+    """
+    x = pd.Series(np.asarray(s, dtype=float))
+    n = len(x)
+    gecerli = np.zeros(n, dtype=bool)
+    gecerli[w:max(w, n - w)] = True
+    mx = x.rolling(2*w, min_periods=1).max().shift(-(w-1)).to_numpy()
+    mn = x.rolling(2*w, min_periods=1).min().shift(-(w-1)).to_numpy()
+    d  = x.to_numpy()
+    return gecerli & (d == mx), gecerli & (d == mn)
+
+
+IRAKSAMA_TIPLERI = ("POZ_IRAKSAMA", "NEG_IRAKSAMA", "POZ_GIZLI", "NEG_GIZLI")
+# Son durum (kural motoru girdisi) varsayılan olarak yalnız klasik ıraksamadan;
+# gizli olaylar taramada her zaman işaretlenir, duruma BIST_GIZLI_IRAKSAMA=1 ile girer.
+GIZLI_IRAKSAMA   = os.getenv("BIST_GIZLI_IRAKSAMA", "0") == "1"
+DURUM_TIPLERI    = IRAKSAMA_TIPLERI if GIZLI_IRAKSAMA else IRAKSAMA_TIPLERI[:2]
+
+
+def iraksama_taramasi(fiyat, osilatorler: dict, w: int = 5, en_fazla_ara: int = 60) -> dict:
+    """
+    Fiyat pivotlarında osilatör karşılaştırmasıyla ıraksama olayları — tüm geçmiş.
+    Fiyat pivotları bir kez bulunur, her osilatör aynı pivotlarda okunur.
+    Ardışık iki dip (j < i, i - j <= en_fazla_ara) için:
+      POZ_IRAKSAMA  fiyat daha düşük dip, osilatör daha yüksek dip (klasik)
+      POZ_GIZLI     fiyat daha yüksek dip, osilatör daha düşük dip (trend devamı)
+    Ardışık iki tepe için NEG_IRAKSAMA / NEG_GIZLI simetriktir.
+    Olay, pivotun kesinleştiği i + w barına yazılır (nedensel; geriye test edilebilir).
+    Dönüş: {osilatör adı: {tip: bool dizisi}}.
+    """
+    p = np.asarray(fiyat, dtype=float)
+    n = len(p)
+    tepe, dip = pivot_noktalari(p, w)
+    sonuc = {}
+    for ad, osilator in osilatorler.items():
+        o = np.asarray(osilator, dtype=float)
+        olay = {tip: np.zeros(n, dtype=bool) for tip in IRAKSAMA_TIPLERI}
+        for maske, klasik, gizli, yon in ((dip, "POZ_IRAKSAMA", "POZ_GIZLI", 1),
+                                          (tepe, "NEG_IRAKSAMA", "NEG_GIZLI", -1)):
+            i = np.flatnonzero(maske)
+            if len(i) < 2:
+                continue
+            j, i = i[:-1], i[1:]
+            yakin = i - j <= en_fazla_ara
+            # yon=+1 (dip): fiyat düşük & osilatör yüksek → klasik; yon=-1 (tepe) tersi
+            df = (p[i] - p[j]) * yon; do = (o[i] - o[j]) * yon
+            kesin = np.minimum(i + w, n - 1)
+            olay[klasik][kesin[yakin & (df < 0) & (do > 0)]] = True
+            olay[gizli][kesin[yakin & (df > 0) & (do < 0)]] = True
+        sonuc[ad] = olay
+    return sonuc
+
+
+def iraksama_durumu(olaylar: dict, pencere: int = 20, tipler: tuple = DURUM_TIPLERI) -> str:
+    """
+    Son pencere bar içindeki en yeni ıraksama olayı (aynı barda klasik öncelikli);
+    yoksa "YOK". olaylar: iraksama_taramasi çıktısının bir osilatörü; sadece
+    tipler (varsayılan DURUM_TIPLERI) dikkate alınır.
+    """
+    en_yeni, durum = -1, "YOK"
+    for tip in tipler:
+        m = olaylar[tip]
+        konum = np.flatnonzero(m[max(0, len(m) - pencere):])
+        if len(konum) and konum[-1] > en_yeni:
+            en_yeni, durum = konum[-1], tip
+    return durum
+
+
+def seviye_kumele(seviyeler, tolerans: float = 0.02) -> list:
+    """
+    Birbirine %tolerans yakın seviyeleri tek bölgede toplar.
+    Dönüş: [{"seviye", "alt", "ust", "dokunma"}], seviyeye göre artan.
+    """
+    bolgeler = []
+    grup = []
+    for v in sorted(float(v) for v in seviyeler if np.isfinite(v)):
+        if grup and v > np.mean(grup) * (1 + tolerans):
+            bolgeler.append(grup); grup = []
+        grup.append(v)
+    if grup:
+        bolgeler.append(grup)
+    return [{"seviye": round(float(np.mean(g)), 2), "alt": round(g[0], 2),
+             "ust": round(g[-1], 2), "dokunma": len(g)} for g in bolgeler]
+
+
+def destek_direnc_bolgeleri(c, h=None, l=None, w: int = 5,
+                            tolerans: float = 0.02) -> dict:
+    """
+    Pivot tabanlı destek/direnç bölgeleri.
+    Tepeler High (yoksa Close), dipler Low (yoksa Close) serisinden bulunur;
+    tüm pivot seviyeleri kümelenir ve son kapanışa göre ayrılır.
+      tepeler / dipler → pencerede bulunan tüm pivot seviyeleri (kronolojik)
+      destekler        → fiyatın altındaki bölgeler, en yakından uzağa
+      direncler        → fiyatın üstündeki bölgeler, en yakından uzağa
+    """
+    c = np.asarray(c, dtype=float)
+    h = c if h is None else np.asarray(h, dtype=float)
+    l = c if l is None else np.asarray(l, dtype=float)
+    tepe, _ = pivot_noktalari(h, w)
+    _, dip  = pivot_noktalari(l, w)
+    tepeler = [round(float(v), 2) for v in h[tepe]]
+    dipler  = [round(float(v), 2) for v in l[dip]]
+    fiyat = float(c[-1]) if len(c) else np.nan
+    bolgeler = seviye_kumele(tepeler + dipler, tolerans)
+    return {
+        "tepeler":   tepeler,
+        "dipler":    dipler,
+        "destekler": sorted((b for b in bolgeler if b["seviye"] < fiyat),
+                            key=lambda b: -b["seviye"]),
+        "direncler": [b for b in bolgeler if b["seviye"] > fiyat],
+    }
+
+
+MUM_FORMASYONLARI = (
+    "HAMMER(AL)", "SHOOTING_STAR(SAT)", "DOJI(KARARSIZ)",
+    "BULLISH_ENGULFING(AL)", "BEARISH_ENGULFING(SAT)",
+    "MORNING_STAR(AL)", "EVENING_STAR(SAT)",
+    "THREE_WHITE_SOLDIERS(GUCLU_AL)", "THREE_BLACK_CROWS(GUCLU_SAT)",
+)
+
+
+def _onceki(x: np.ndarray, k: int) -> np.ndarray:
+    y = np.full_like(x, np.nan)
+    y[k:] = x[:len(x)-k]
+    return y
+
+
+def mum_formasyon_taramasi(o, h, l, c) -> dict:
+    """
+    Tüm mum formasyonlarını tüm geçmiş için tek geçişte bool dizisi olarak döner:
+    {ad: maske}, sıra MUM_FORMASYONLARI. i. eleman, son barı i olan üç mumluk
+    pencerenin eski tek-bar kontrolüyle aynı sonucudur (ilk iki bar için
+    önceki mumlar NaN sayılır). 1-B seri veya tarih × ticker matrisi alır.
+    """
+    o, h, l, c = (np.asarray(x, dtype=float) for x in (o, h, l, c))
+    o2, h2, l2, c2 = (_onceki(x, 1) for x in (o, h, l, c))
+    o3, h3, l3, c3 = (_onceki(x, 2) for x in (o, h, l, c))
+    govde1 = np.abs(c - o); govde2 = np.abs(c2 - o2); govde3 = np.abs(c3 - o3)
+    aralik1 = h - l; aralik2 = h2 - l2; aralik3 = h3 - l3
+    alt_fitil = np.minimum(o, c) - l; ust_fitil = h - np.maximum(o, c)
+    yukselen = c > o; dusen = c < o
+    yukselen2 = c2 > o2; dusen2 = c2 < o2
+    yukselen3 = c3 > o3; dusen3 = c3 < o3
+    kucuk_orta = govde2 < aralik2 * 0.3
+    return {
+        "HAMMER(AL)":             (aralik1 > 0) & (alt_fitil >= 2*govde1) & (ust_fitil < govde1*0.3),
+        "SHOOTING_STAR(SAT)":     (aralik1 > 0) & (ust_fitil >= 2*govde1) & (alt_fitil < govde1*0.3),
+        "DOJI(KARARSIZ)":         (aralik1 > 0) & (govde1 < aralik1 * 0.1),
+        "BULLISH_ENGULFING(AL)":  dusen2 & yukselen & (o < c2) & (c > o2),
+        "BEARISH_ENGULFING(SAT)": yukselen2 & dusen & (o > c2) & (c < o2),
+        "MORNING_STAR(AL)":       (aralik3 > 0) & dusen3 & (govde3 > aralik3*0.5) & kucuk_orta
+                                  & yukselen & (c > (o3+c3)/2),
+        "EVENING_STAR(SAT)":      yukselen3 & (govde3 > aralik3*0.5) & kucuk_orta
+                                  & dusen & (c < (o3+c3)/2),
+        "THREE_WHITE_SOLDIERS(GUCLU_AL)": yukselen & yukselen2 & yukselen3
+                                  & (c > c2) & (c2 > c3) & (o > o2) & (o2 > o3),
+        "THREE_BLACK_CROWS(GUCLU_SAT)":   dusen & dusen2 & dusen3
+                                  & (c < c2) & (c2 < c3) & (o < o2) & (o2 < o3),
+    }
+
+
+def formasyon_istatistikleri(c, tarama: dict, ufuklar=(1, 5, 10)) -> dict:
+    """
+    Her formasyonun geçtiği barlar ve sonraki n bar getirisi (kapanıştan kapanışa).
+    Dönüş: {ad: {"konumlar": ndarray, "adet": int,
+                 "ileri": {n: {"ornek", "ort", "medyan", "pozitif"} | None}}}
+    ort/medyan yüzde, pozitif oran (0-1). Henüz n bar geçmemiş oluşumlar örneğe girmez.
+    """
+    c = np.asarray(c, dtype=float)
+    ileri = {}
+    for n in ufuklar:
+        g = np.full_like(c, np.nan)
+        if n < len(c):                      # daha kısa geçmişte ufuk tümüyle NaN
+            g[:len(c)-n] = c[n:] / c[:len(c)-n] - 1
+        ileri[n] = g
+    sonuc = {}
+    for ad, maske in tarama.items():
+        konum = np.flatnonzero(maske)
+        ist = {}
+        for n, g in ileri.items():
+            ornek = g[konum]; ornek = ornek[~np.isnan(ornek)]
+            ist[n] = {"ornek": len(ornek), "ort": round(float(ornek.mean())*100, 2),
+                      "medyan": round(float(np.median(ornek))*100, 2),
+                      "pozitif": round(float((ornek > 0).mean()), 2)} if len(ornek) else None
+        sonuc[ad] = {"konumlar": konum, "adet": len(konum), "ileri": ist}
+    return sonuc
@@ -6,10 +6,11 @@ import os, warnings
 from datetime import datetime
 warnings.filterwarnings("ignore")
 import yfinance as yf
-import requests
 from dotenv import load_dotenv
 load_dotenv()
 
+import http_istemci
+
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN","")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID","")
 GROQ_API_KEY     = os.getenv("GROQ_API_KEY","")
@@ -290,7 +291,7 @@ def telegram_gonder(mesaj):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         return False
     try:
-        r = requests.post(
+        r = http_istemci.post(
             f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
             json={"chat_id": TELEGRAM_CHAT_ID, "text": mesaj, "parse_mode": "HTML"},
             timeout=15,
@@ -0,0 +1,122 @@
+"""
+KAYIT / OYNATMA MODU
+====================
+Tüm dış G/Ç'yi (yfinance verisi, HTTP yanıtları, LLM cevapları) yerel bir
+kasete yazar ve daha sonra ağsız, tekrarlanabilir şekilde geri oynatır.
+Göstergeler, kural motoru, portföy kuralları ve mesaj üretimi bu sayede
+laptopta API kotası harcamadan profillenebilir.
+
+Komut satırı:
+    python bist_agents.py --record            # .kaset/ dizinine kaydet
+    python bist_agents.py --replay            # .kaset/ dizininden oynat
+    python bist_sistem.py --replay=kasetler/sabah_0930
+
+Mod ve dizin ortam değişkenlerine yazılır (BIST_KAYIT_MODU, BIST_KASET_DIZIN);
+bist_sistem.py'nin subprocess ile çalıştırdığı script'ler de aynı kaseti kullanır.
+
+Anahtarlar:
+  - fiyat / temel / http  → isteğin içeriği (ticker, period, URL, parametreler)
+  - llm                   → script adı + çağrı sırası (prompt'lar tarih içerdiği için)
+
+Kayıt/oynatma sırasında fiyat ve temel veri disk önbellekleri devre dışıdır;
+aksi halde önbelleğin durumu hangi isteklerin atılacağını değiştirirdi.
+"""
+
+import os, sys, time, pickle, hashlib, threading
+from pathlib import Path
+
+KAYIT  = "kayit"
+OYNAT  = "oynat"
+VARSAYILAN_KASET = ".kaset"
+
+_SIRA: dict = {}
+_KILIT = threading.Lock()
+
+
+class KasetEksik(ConnectionError):
+    """Oynatma modunda istenen kayıt kasette yok (ağ hatası gibi ele alınır)."""
+
+
+def argv_isle():
+    """
+    sys.argv içindeki --record[=DIZIN] / --replay[=DIZIN] bayraklarını işler,
+    ortam değişkenlerine yazar ve argv'den çıkarır.
+    """
+    kalan = [sys.argv[0]]
+    for arg in sys.argv[1:]:
+        bayrak, _, dizin = arg.partition("=")
+        if bayrak in ("--record", "--replay"):
+            os.environ["BIST_KAYIT_MODU"] = KAYIT if bayrak == "--record" else OYNAT
+            if dizin:
+                os.environ["BIST_KASET_DIZIN"] = dizin
+        else:
+            kalan.append(arg)
+    sys.argv[:] = kalan
+    if mod():
+        print(f"  🎞️  {'Kayıt' if mod() == KAYIT else 'Oynatma'} modu — kaset: {kaset_dizini()}")
+
+def mod() -> str:
+    return os.getenv("BIST_KAYIT_MODU", "")
+
+def aktif() -> bool:
+    return mod() in (KAYIT, OYNAT)
+
+def oynatiliyor() -> bool:
+    return mod() == OYNAT
+
+def kaset_dizini() -> Path:
+    return Path(os.getenv("BIST_KASET_DIZIN", VARSAYILAN_KASET))
+
+def _yol(tur: str, anahtar) -> Path:
+    ozet = hashlib.sha1(repr(anahtar).encode("utf-8")).hexdigest()
+    return kaset_dizini() / tur / f"{ozet}.pkl"
+
+def sirali_anahtar(tur: str) -> tuple:
+    """Çağrı sırasına dayalı anahtar — (script adı, n)."""
+    script = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "?"
+    with _KILIT:
+        n = _SIRA.get((script, tur), 0)
+        _SIRA[(script, tur)] = n + 1
+    return (script, n)
+
+def kayitli(tur: str, anahtar, uret):
+    """
+    Normal mod: uret() sonucunu döner.
+    Kayıt modu: uret() sonucunu kasete yazar (istisnalar yazılmaz, aynen yükselir).
+    Oynatma modu: uret() çağrılmaz; kayıt yoksa KasetEksik yükselir.
+    """
+    m = mod()
+    if m == OYNAT:
+        yol = _yol(tur, anahtar)
+        try:
+            with open(yol, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            raise KasetEksik(f"Kasette yok: {tur} {anahtar!r}"[:200])
+    sonuc = uret()
+    if m == KAYIT:
+        yol = _yol(tur, anahtar)
+        try:
+            yol.parent.mkdir(parents=True, exist_ok=True)
+            gecici = yol.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(gecici, "wb") as f:
+                pickle.dump(sonuc, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(gecici, yol)
+        except Exception as e:
+            print(f"  Kaset yazılamadı ({tur}): {e}")
+    return sonuc
+
+_ZAMAN = None
+
+def zaman() -> float:
+    """
+    Şu anki epoch zamanı. Kayıt modunda çalıştırma başındaki değer kasete
+    yazılır, oynatmada aynısı döner (period dilimleri aynı kalsın diye).
+    """
+    global _ZAMAN
+    if not aktif():
+        return time.time()
+    if _ZAMAN is None:
+        script = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "?"
+        _ZAMAN = kayitli("zaman", script, time.time)
+    return _ZAMAN
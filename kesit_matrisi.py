@@ -0,0 +1,235 @@
+"""
+KESİTSEL GÖSTERGE MATRİSİ
+=========================
+Evreni tarih × ticker matrislerine (Open/High/Low/Close/Volume) hizalar ve
+RSI, MACD, Bollinger, ATR ve getirileri tüm hisseler için tek seferde,
+sütun bazlı vektörel işlemlerle hesaplar. Genişlik, aşırı satım sayıları ve
+filtre metrikleri bu matrisler üzerinde basit indirgemelerdir; hisse başına
+ayrı pandas hattı kurulmaz.
+
+  - Günlük (ve daha seyrek) barlar saat diliminden arındırılıp tarihe göre
+    hizalanır; farklı borsaların tickerları aynı matriste durabilir.
+  - Her sütunun geçerli verisi kendi ilk barından başlar (öncesi NaN).
+    Göstergeler pozisyonel olduğundan, araya boşluk girmeyen sütunlarda
+    değerler tek hisse hesabıyla birebir aynıdır (bkz. kesintisiz).
+  - son() her tickerın kendi son barındaki değeri döner; son barı bir gün
+    geride kalan hisse de kendi son değeriyle sayılır.
+
+Kullanım:
+    from kesit_matrisi import piyasa_matrisi
+    m = piyasa_matrisi(BIST_TICKERS, period="3mo")
+    rsi = m.son(m.rsi())               # ticker → son RSI
+    asiri_satim = int((rsi < 30).sum())
+    yukselen    = int((m.son_getiri() > 0).sum())      # kendi son iki barından
+    golden_say  = (m.kesisimler(50, 200) > 0).sum()   # ticker → geçmişteki golden cross sayısı
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from fiyat_onbellek import toplu_fiyat_gecmisi
+from indikatorler import (rsi_serisi, gercek_aralik, sma_bankasi, kesisimler,
+                          mum_formasyon_taramasi)
+
+ALANLAR = ["Open", "High", "Low", "Close", "Volume"]
+GUNLUK_ARALIKLAR = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+
+def _hizala(df: pd.DataFrame, gunluk: bool) -> pd.DataFrame:
+    idx = df.index
+    if idx.tz is not None:
+        idx = idx.tz_localize(None) if gunluk else idx.tz_convert("UTC")
+    if gunluk:
+        idx = idx.normalize()
+    df = df.set_axis(idx)
+    return df[~df.index.duplicated(keep="last")]
+
+
+class PiyasaMatrisi:
+    """
+    {ticker: OHLCV DataFrame} sözlüğünden tarih × ticker matrisleri.
+    Gösterge metotları DataFrame (tarih × ticker) döner ve sonuçları
+    parametreleriyle birlikte önbelleğe alır.
+    """
+
+    def __init__(self, veriler: dict, interval: str = "1d"):
+        gunluk = interval in GUNLUK_ARALIKLAR
+        hizali = {t: _hizala(df, gunluk) for t, df in veriler.items()
+                  if df is not None and len(df)}
+        self.interval = interval
+        self.tickers  = list(hizali)
+        bos = pd.DataFrame(columns=self.tickers, dtype=float)
+        for alan in ALANLAR:
+            if hizali:
+                m = pd.concat({t: df[alan] for t, df in hizali.items()}, axis=1).sort_index()
+                m = m.astype(float)
+            else:
+                m = bos
+            setattr(self, alan.lower(), m)
+        self._onbellek: dict = {}
+
+    # ── Yapı ─────────────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def bar_sayisi(self) -> pd.Series:
+        """Ticker başına geçerli kapanış sayısı."""
+        return self.close.notna().sum()
+
+    @property
+    def kesintisiz(self) -> pd.Series:
+        """
+        Ticker başına: geçerli barları ilk barından son satıra kadar boşluksuz mu?
+        True olan sütunlarda tüm göstergeler tek hisse hesabıyla aynıdır.
+        """
+        gecerli = self.close.notna()
+        ilk_sonrasi = gecerli.cummax()
+        return (gecerli == ilk_sonrasi).all() & gecerli.iloc[-1] if len(gecerli) else gecerli.any()
+
+    def son(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Her ticker için, kendi son kapanış barındaki değer (tek hisse
+        hesabındaki seri.iloc[-1] karşılığı). df, close ile aynı biçimde olmalı.
+        """
+        gecerli = self.close.notna().to_numpy()
+        if not gecerli.size:
+            return pd.Series(np.nan, index=df.columns)
+        konum = len(gecerli) - 1 - gecerli[::-1].argmax(axis=0)
+        deger = df.to_numpy(dtype=float)[konum, np.arange(df.shape[1])]
+        deger[~gecerli.any(axis=0)] = np.nan
+        return pd.Series(deger, index=df.columns)
+
+    def son_getiri(self, n: int = 1) -> pd.Series:
+        """
+        Her ticker için kendi son n+1 geçerli kapanışından n barlık getiri
+        (tek hisse hesabındaki c.iloc[-1] / c.iloc[-1-n] - 1). getiri() birleşik
+        tarih ekseninde kaydırır; önceki ortak günde barı olmayan ticker'da NaN
+        üretir. n barı olmayan ticker → NaN.
+        """
+        x = self.close.to_numpy(dtype=float)
+        if not x.size:
+            return pd.Series(np.nan, index=self.close.columns)
+        gecerli = ~np.isnan(x)
+        sira = np.cumsum(gecerli, axis=0)                 # geçerli bar numarası (1'den)
+        adet = sira[-1]
+        onceki_maske = gecerli & (sira == adet - n)
+        onceki = x[onceki_maske.argmax(axis=0), np.arange(x.shape[1])]
+        onceki[adet <= n] = np.nan
+        return self.son(self.close) / pd.Series(onceki, index=self.close.columns) - 1
+
+    def dilim(self, bas: int) -> "PiyasaMatrisi":
+        """bas. satırdan itibaren (konum) yeni matris; göstergeler yeniden hesaplanır."""
+        yeni = object.__new__(PiyasaMatrisi)
+        yeni.interval = self.interval
+        yeni.tickers  = list(self.tickers)
+        for alan in ALANLAR:
+            setattr(yeni, alan.lower(), getattr(self, alan.lower()).iloc[bas:])
+        yeni._onbellek = {}
+        return yeni
+
+    def _bellek(self, anahtar: tuple, uret):
+        if anahtar not in self._onbellek:
+            self._onbellek[anahtar] = uret()
+        return self._onbellek[anahtar]
+
+    # ── Göstergeler (tarih × ticker) ─────────────────────────────────────────
+    def getiri(self, n: int = 1) -> pd.DataFrame:
+        """n barlık basit getiri (oran)."""
+        return self._bellek(("getiri", n), lambda: self.close / self.close.shift(n) - 1)
+
+    def rsi(self, p: int = 14, wilder: bool = False,
+            sifir_yerine: Optional[float] = None) -> pd.DataFrame:
+        return self._bellek(("rsi", p, wilder, sifir_yerine),
+                            lambda: rsi_serisi(self.close, p, wilder, sifir_yerine))
+
+    def ema(self, span: int, adjust: bool = False) -> pd.DataFrame:
+        return self._bellek(("ema", span, adjust),
+                            lambda: self.close.ewm(span=span, adjust=adjust).mean())
+
+    def macd(self, hizli: int = 12, yavas: int = 26, sinyal: int = 9,
+             adjust: bool = False) -> tuple:
+        """(macd, sinyal, histogram)"""
+        def uret():
+            m = self.ema(hizli, adjust) - self.ema(yavas, adjust)
+            s = m.ewm(span=sinyal, adjust=adjust).mean()
+            return m, s, m - s
+        return self._bellek(("macd", hizli, yavas, sinyal, adjust), uret)
+
+    def sma(self, w: int) -> pd.DataFrame:
+        return self._bellek(("sma", w), lambda: self.close.rolling(w).mean())
+
+    def sma_bankasi(self, pencereler: tuple = (20, 50, 200)) -> dict:
+        """{pencere: SMA} — tüm pencereler tek kümülatif toplamdan."""
+        return self._bellek(("sma_bankasi", tuple(pencereler)),
+                            lambda: sma_bankasi(self.close, pencereler))
+
+    def kesisimler(self, hizli: int = 50, yavas: int = 200, geri: int = 1) -> pd.DataFrame:
+        """SMA kesişim olayları (tarih × ticker, int8): +1 golden, -1 death."""
+        def uret():
+            b = self.sma_bankasi((hizli, yavas))
+            return kesisimler(b[hizli], b[yavas], geri)
+        return self._bellek(("kesisimler", hizli, yavas, geri), uret)
+
+    def bollinger(self, w: int = 20, k: float = 2.0) -> tuple:
+        """(üst, orta, alt, %b)"""
+        def uret():
+            orta = self.sma(w); sapma = self.close.rolling(w).std()
+            ust = orta + k*sapma; alt = orta - k*sapma
+            return ust, orta, alt, (self.close - alt) / (ust - alt)
+        return self._bellek(("bollinger", w, k), uret)
+
+    def atr(self, p: int = 14) -> pd.DataFrame:
+        return self._bellek(("atr", p), lambda: gercek_aralik(self.high, self.low, self.close)
+                            .rolling(p).mean())
+
+    def mum_taramasi(self) -> dict:
+        """{formasyon: bool DataFrame (tarih × ticker)} — tüm evren, tüm geçmiş."""
+        def uret():
+            tarama = mum_formasyon_taramasi(self.open, self.high, self.low, self.close)
+            return {ad: pd.DataFrame(m, index=self.close.index, columns=self.close.columns)
+                    for ad, m in tarama.items()}
+        return self._bellek(("mum",), uret)
+
+    def mum_istatistikleri(self, ufuk: int = 5) -> dict:
+        """
+        Ticker başına formasyon sonrası ufuk bar getirisi:
+        {formasyon: DataFrame(index=ticker, columns=[adet, ornek, ort, pozitif])}
+        ort yüzde, pozitif oran; sonu henüz gelmemiş oluşumlar örneğe girmez.
+        """
+        def uret():
+            ileri = self.close.shift(-ufuk) / self.close - 1
+            sonuc = {}
+            for ad, maske in self.mum_taramasi().items():
+                g = ileri.where(maske)
+                ornek = g.count()
+                sonuc[ad] = pd.DataFrame({
+                    "adet":    maske.sum(),
+                    "ornek":   ornek,
+                    "ort":     (g.mean() * 100).round(2),
+                    "pozitif": ((g > 0).sum() / ornek.where(ornek > 0)).round(2),
+                })
+            return sonuc
+        return self._bellek(("mum_istatistik", ufuk), uret)
+
+    def zirve(self, w: int) -> pd.DataFrame:
+        """Son w barın en yüksek High değeri."""
+        return self._bellek(("zirve", w), lambda: self.high.rolling(w, min_periods=1).max())
+
+    def dip(self, w: int) -> pd.DataFrame:
+        """Son w barın en düşük Low değeri."""
+        return self._bellek(("dip", w), lambda: self.low.rolling(w, min_periods=1).min())
+
+
+def piyasa_matrisi(tickers: list, period: str = "3mo", interval: str = "1d",
+                   veriler: Optional[dict] = None) -> PiyasaMatrisi:
+    """
+    Tickerların fiyat geçmişini toplu çekip (fiyat_onbellek üzerinden)
+    PiyasaMatrisi kurar. veriler verilirse indirme yapılmaz.
+    Verisi alınamayan tickerlar matriste yer almaz.
+    """
+    if veriler is None:
+        veriler = toplu_fiyat_gecmisi(tickers, period=period, interval=interval)
+    return PiyasaMatrisi({t: veriler[t] for t in tickers if t in veriler}, interval)
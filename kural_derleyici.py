@@ -0,0 +1,574 @@
+"""
+KURAL DERLEYİCİ
+===============
+Puanlama kuralları kodda değil kurallar.json'da durur: her bölüm (teknik,
+temel, manipulasyon, balon, kalite, alarm_*) bir baz puan, isteğe bağlı
+alt/üst sınır ve sırayla değerlendirilen kural gruplarından oluşur. Grup
+içinde ilk sağlanan kural uygulanır (eski if/elif zincirleri); her kural
+(koşul, puan, mesaj) üçlüsüdür. Bir ağırlığı/eşiği değiştirmek için dosyayı
+düzenlemek yeterlidir.
+
+Koşullar bir kez derlenir: ifade ast ile ayrıştırılır, yalnızca izinli
+düğümler (sütun adı, sabit, karşılaştırma, and/or/not, + - * /, var/mevcut/
+say/abs) kabul edilir ve and/or/not dizi işleçlerine (& | ~), zincirli
+karşılaştırmalar ikili karşılaştırmaların &'ına çevrilir. Ortaya çıkan kod
+nesneleri tüm tabloyu (satır = hisse veya hisse-gün) tek seferde numpy
+dizileri üzerinde değerlendirir; grup puanı np.select ile seçilir.
+
+Dönüştürülmüş (doğrulanmış) ifade kaynakları diğer önbelleklerle aynı
+kökteki (BIST_ONBELLEK_DIZIN, varsayılan .onbellek) kural_plani/ altına dosya içeriğinin özetiyle (sha1 + Python
+sürümü) JSON olarak yazılır; kod nesnesi diske yazılmaz. Sonraki
+çalıştırmalar dönüştürme adımını atlar, ancak önbellekten gelen her ifade
+derlenmeden önce dönüşmüş biçimin izinli düğümlerine karşı yeniden denetlenir.
+
+Yükleme hatası (bozuk JSON, geçersiz ifade, eksik zorunlu parametre)
+plan_yukle'de KuralHatasi'dır. Modül düzeyinde yükleyenler
+plan_yukle_yedekli kullanır: uyarı basılır, paketle gelen kurallar.json'a,
+o da olmazsa boş plana düşülür; import kırılmaz, puanlama çağrısı hata verir.
+
+Eksik değer: None ve NaN aynı sayılır. var(x) eski `if x:` kontrolüdür
+(dolu ve sıfırdan farklı), mevcut(x) `x is not None` karşılığıdır.
+
+Kullanım:
+    from kural_derleyici import plan_yukle
+    plan = plan_yukle()                                 # kurallar.json, önbellekli
+    plan = plan_yukle_yedekli(gerekli={"alarm": {"S6": ("rsi_ust",)}})   # modül düzeyi
+    puan = plan.puanla("kalite", tablo)                 # np.ndarray, satır başına
+    metin = plan.mesajlar("teknik", tablo, satirlar=[0, 5])
+    esik = plan.parametre("alarm", "S6")["rsi_ust"]
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# ── Sabitler ────────────────────────────────────────────────────────────────
+VARSAYILAN_DOSYA = Path(__file__).with_name("kurallar.json")
+KURAL_DOSYASI = Path(os.getenv("BIST_KURAL_DOSYASI", VARSAYILAN_DOSYA))
+PLAN_DIZIN    = Path(os.getenv("BIST_ONBELLEK_DIZIN", ".onbellek")) / "kural_plani"
+PLAN_SURUM    = 2          # önbellek biçimi veya dönüştürme değişirse artır
+
+_KARSILASTIRMA = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_ARITMETIK     = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+FONKSIYONLAR   = {"var", "mevcut", "say", "abs"}
+# Dönüşmüş ifadede izinli düğümler (önbellekten okunan kaynağın denetimi)
+_DIZI_ISLEC    = _ARITMETIK + (ast.BitAnd, ast.BitOr)
+_TEKLI         = (ast.Invert, ast.USub, ast.UAdd)
+_CAGRILAR      = FONKSIYONLAR | {"_b"}
+
+
+class KuralHatasi(ValueError):
+    """Kural dosyasında geçersiz ifade veya yapı."""
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# DERLEME
+# ════════════════════════════════════════════════════════════════════════════
+
+def _cagri(ad: str, *argumanlar) -> ast.Call:
+    return ast.Call(func=ast.Name(id=ad, ctx=ast.Load()), args=list(argumanlar), keywords=[])
+
+def _ve(dugumler: list, islec) -> ast.AST:
+    sonuc = dugumler[0]
+    for d in dugumler[1:]:
+        sonuc = ast.BinOp(left=sonuc, op=islec(), right=d)
+    return sonuc
+
+
+class _Donusturucu(ast.NodeTransformer):
+    """İzinli düğümleri doğrular, mantıksal işleçleri dizi işleçlerine çevirir."""
+
+    def __init__(self, kaynak: str):
+        self.kaynak = kaynak
+
+    def hata(self, neden: str):
+        raise KuralHatasi(f"{neden}: {self.kaynak!r}")
+
+    def generic_visit(self, node):
+        self.hata(f"izin verilmeyen ifade ({type(node).__name__})")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (bool, int, float, str)):
+            self.hata("desteklenmeyen sabit")
+        return node
+
+    def visit_Name(self, node):
+        if node.id in FONKSIYONLAR or node.id.startswith("_"):
+            self.hata(f"geçersiz sütun adı {node.id}")
+        return node
+
+    def visit_BoolOp(self, node):
+        islec = ast.BitAnd if isinstance(node.op, ast.And) else ast.BitOr
+        return _ve([_cagri("_b", self.visit(d)) for d in node.values], islec)
+
+    def visit_UnaryOp(self, node):
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=_cagri("_b", self.visit(node.operand)))
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            node.operand = self.visit(node.operand)
+            return node
+        self.hata("izin verilmeyen tekli işleç")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _ARITMETIK):
+            self.hata("izin verilmeyen aritmetik işleç")
+        node.left, node.right = self.visit(node.left), self.visit(node.right)
+        return node
+
+    def visit_Compare(self, node):
+        if not all(isinstance(op, _KARSILASTIRMA) for op in node.ops):
+            self.hata("izin verilmeyen karşılaştırma")
+        terimler = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        ciftler = [ast.Compare(left=terimler[i], ops=[op], comparators=[terimler[i + 1]])
+                   for i, op in enumerate(node.ops)]
+        return _ve(ciftler, ast.BitAnd)
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FONKSIYONLAR:
+            self.hata("izin verilmeyen fonksiyon")
+        if node.keywords or any(isinstance(a, ast.Starred) for a in node.args):
+            self.hata("fonksiyonlar yalnızca konumsal argüman alır")
+        node.args = [self.visit(a) for a in node.args]
+        return node
+
+
+def _donmus_agac(kaynak: str) -> Optional[ast.Expression]:
+    """
+    Önbellekten gelen dönüşmüş kaynağı ayrıştırır; yalnızca _Donusturucu'nun
+    üretebileceği düğümlerden oluşuyorsa ağacı, değilse None döner.
+    """
+    try:
+        agac = ast.parse(kaynak, mode="eval")
+    except (SyntaxError, ValueError):
+        return None
+    cagrilan = set()                     # ast.walk genişlik öncelikli: Call, func'tan önce gelir
+    for d in ast.walk(agac):
+        if isinstance(d, (ast.Expression, ast.Load, ast.operator, ast.cmpop, ast.unaryop)):
+            continue
+        if isinstance(d, ast.Call):
+            cagrilan.add(id(d.func))
+            gecerli = (isinstance(d.func, ast.Name) and d.func.id in _CAGRILAR
+                       and not d.keywords
+                       and not any(isinstance(a, ast.Starred) for a in d.args))
+        elif isinstance(d, ast.Name):
+            gecerli = (d.id in _CAGRILAR if id(d) in cagrilan
+                       else d.id not in FONKSIYONLAR and not d.id.startswith("_"))
+        elif isinstance(d, ast.Constant):
+            gecerli = isinstance(d.value, (bool, int, float, str))
+        elif isinstance(d, ast.Compare):
+            gecerli = len(d.ops) == 1 and isinstance(d.ops[0], _KARSILASTIRMA)
+        elif isinstance(d, ast.BinOp):
+            gecerli = isinstance(d.op, _DIZI_ISLEC)
+        elif isinstance(d, ast.UnaryOp):
+            gecerli = isinstance(d.op, _TEKLI)
+        else:
+            gecerli = False
+        if not gecerli:
+            return None
+    return agac
+
+
+def ifade_derle(kaynak, ad: str = "<kural>", donmus: Optional[dict] = None):
+    """
+    Koşul/puan ifadesini vektörel kod nesnesine derler. Sayı verilirse
+    olduğu gibi döner (sabit puan). donmus: {ifade: dönüşmüş kaynak}
+    önbelleği; ifade oradaysa ve denetimden geçerse dönüştürme atlanır,
+    yoksa dönüştürülüp sözlüğe eklenir.
+    """
+    if isinstance(kaynak, bool) or not isinstance(kaynak, (str, int, float)):
+        raise KuralHatasi(f"geçersiz ifade: {kaynak!r}")
+    if not isinstance(kaynak, str):
+        return kaynak
+    agac = _donmus_agac(donmus[kaynak]) if donmus and kaynak in donmus else None
+    if agac is None:
+        try:
+            agac = ast.parse(kaynak.strip(), mode="eval")
+        except SyntaxError as e:
+            raise KuralHatasi(f"sözdizimi hatası: {kaynak!r} ({e.msg})") from None
+        agac = ast.fix_missing_locations(_Donusturucu(kaynak).visit(agac))
+        if donmus is not None:
+            donmus[kaynak] = ast.unparse(agac)
+    return compile(agac, ad, "eval")
+
+
+def _bolum_derle(ad: str, tanim: dict, donmus: Optional[dict] = None) -> dict:
+    gruplar = []
+    for g in tanim.get("gruplar", []):
+        gad = g.get("ad", str(len(gruplar)))
+        if "liste" in g:
+            gruplar.append({"ad": gad, "liste": g["liste"], "hazir": g.get("hazir"),
+                            "ogeler": [{"icerir": o["icerir"], "puan": float(o.get("puan", 0)),
+                                        "mesaj": o.get("mesaj")} for o in g["ogeler"]]})
+            continue
+        kurallar = []
+        for i, k in enumerate(g["kurallar"]):
+            yer = f"<kural:{ad}/{gad}/{i}>"
+            kurallar.append({"kosul": ifade_derle(k["kosul"], yer, donmus),
+                             "puan": ifade_derle(k.get("puan", 0), yer, donmus),
+                             "mesaj": k.get("mesaj"), "etiket": k.get("etiket")})
+        gruplar.append({"ad": gad, "kurallar": kurallar})
+    zorla = [{"kosul": ifade_derle(z["kosul"], f"<kural:{ad}/zorla>", donmus),
+              "deger": float(z["deger"])}
+             for z in tanim.get("zorla", [])]
+    return {"baz": float(tanim.get("baz", 0)), "alt": tanim.get("alt"), "ust": tanim.get("ust"),
+            "zorla": zorla, "gruplar": gruplar}
+
+
+def derle(tanim: dict, donmus: Optional[dict] = None) -> "KuralPlani":
+    """JSON'dan okunmuş kural tanımını plana derler (donmus: bkz. ifade_derle)."""
+    if not isinstance(tanim, dict) or not isinstance(tanim.get("bolumler"), dict):
+        raise KuralHatasi("kural dosyasında 'bolumler' sözlüğü yok")
+    try:
+        bolumler = {ad: _bolum_derle(ad, b, donmus) for ad, b in tanim["bolumler"].items()}
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        if isinstance(e, KuralHatasi):
+            raise
+        raise KuralHatasi(f"geçersiz kural yapısı ({type(e).__name__}: {e})") from None
+    return KuralPlani(bolumler, tanim.get("parametreler", {}))
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# DEĞERLENDİRME
+# ════════════════════════════════════════════════════════════════════════════
+
+class _Kodlu:
+    """
+    Metin sütununun kod + kategori hali: == / != sabit metinle tamsayı
+    karşılaştırmasına iner. Kategorik sütunlarda kodlar hazırdır; diğer
+    metin sütunları bir kez pd.factorize edilir. Diğer her kullanımda
+    nesne dizisine döner.
+    """
+
+    def __init__(self, kodlar: np.ndarray, kategoriler, degerler=None):
+        self.kodlar = np.asarray(kodlar)
+        self.sira = {v: i for i, v in enumerate(kategoriler)}
+        self._degerler = degerler
+        self._kategoriler = kategoriler
+
+    @classmethod
+    def sutundan(cls, s) -> "_Kodlu":
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            return cls(s.cat.codes.to_numpy(), list(s.cat.categories))
+        d = np.asarray(s, dtype=object)
+        kodlar, essiz = pd.factorize(d)
+        return cls(kodlar, list(essiz), d)
+
+    @property
+    def degerler(self) -> np.ndarray:
+        if self._degerler is None:
+            kat = np.array(list(self._kategoriler) + [None], dtype=object)
+            self._degerler = kat[self.kodlar]          # -1 → None
+        return self._degerler
+
+    def __array__(self, dtype=None, copy=None):
+        return self.degerler if dtype is None else self.degerler.astype(dtype)
+
+    def __eq__(self, diger):
+        if isinstance(diger, str):
+            return self.kodlar == self.sira.get(diger, -2)
+        return np.asarray(self.degerler == np.asarray(diger), dtype=bool)
+
+    def __ne__(self, diger):
+        return ~self.__eq__(diger)
+
+    __hash__ = None
+
+for _islec in ("lt", "le", "gt", "ge", "add", "sub", "mul", "truediv",
+               "radd", "rsub", "rmul", "rtruediv"):
+    setattr(_Kodlu, f"__{_islec}__",
+            lambda self, diger, _a=f"__{_islec}__": getattr(self.degerler, _a)(diger))
+
+
+def _b(x) -> np.ndarray:
+    return np.asarray(x, dtype=bool)
+
+def _mevcut(x) -> np.ndarray:
+    if isinstance(x, _Kodlu):
+        return x.kodlar >= 0
+    return np.asarray(pd.notna(x), dtype=bool)
+
+def _var(x) -> np.ndarray:
+    """Eski `if x:` kontrolü: değer var ve sıfır değil."""
+    with np.errstate(invalid="ignore"):
+        return _mevcut(x) & np.asarray(x != 0, dtype=bool)
+
+def _say(*kosullar) -> np.ndarray:
+    return sum(np.asarray(k, dtype=np.int64) for k in kosullar)
+
+_ORTAM = {"__builtins__": {}, "_b": _b, "var": _var, "mevcut": _mevcut, "say": _say, "abs": np.abs}
+
+
+class _Sutunlar(dict):
+    """eval yerel ad alanı: sütunu ilk kullanımda numpy dizisine çevirir."""
+
+    def __init__(self, tablo):
+        super().__init__()
+        self.tablo = tablo
+
+    def __missing__(self, ad):
+        if ad in _ORTAM:
+            raise KeyError(ad)                  # eval genel ad alanına (fonksiyonlar) düşer
+        if ad not in self.tablo:
+            raise KuralHatasi(f"tabloda '{ad}' sütunu yok")
+        s = self.tablo[ad]
+        if isinstance(s, pd.Series) and isinstance(s.dtype, pd.CategoricalDtype):
+            d = _Kodlu.sutundan(s)
+        else:
+            d = s.to_numpy() if isinstance(s, pd.Series) else np.asarray(s)
+            if d.dtype == object or d.dtype.kind == "U":
+                try: d = d.astype(float)        # None/sayı karışık sütunlar
+                except (TypeError, ValueError): d = _Kodlu.sutundan(d)
+        self[ad] = d
+        return d
+
+
+class KuralPlani:
+    """Derlenmiş kural bölümleri ve parametreler; tablo üzerinde vektörel."""
+
+    def __init__(self, bolumler: dict, parametreler: dict):
+        self.bolumler = bolumler
+        self.parametreler = parametreler
+
+    def parametre(self, *yol, varsayilan=None):
+        d = self.parametreler
+        for anahtar in yol:
+            if not isinstance(d, dict) or anahtar not in d:
+                return varsayilan
+            d = d[anahtar]
+        return d
+
+    def parametreleri_dogrula(self, gerekli: dict, yol: tuple = ()):
+        """
+        gerekli: iç içe {anahtar: alt sözlük | (sayısal alan, ...)}; eksik ya
+        da sayı olmayan her alan için KuralHatasi.
+        """
+        for anahtar, alt in gerekli.items():
+            y = (*yol, anahtar)
+            if isinstance(alt, dict):
+                self.parametreleri_dogrula(alt, y)
+                continue
+            for alan in alt:
+                v = self.parametre(*y, alan)
+                if isinstance(v, bool) or not isinstance(v, (int, float)):
+                    raise KuralHatasi(f"parametre {'.'.join((*y, alan))} eksik veya sayı değil: {v!r}")
+
+    def _bolum(self, ad: str) -> dict:
+        if ad not in self.bolumler:
+            raise KuralHatasi(f"kural dosyasında '{ad}' bölümü yok")
+        return self.bolumler[ad]
+
+    @staticmethod
+    def _calistir(kod, ns, n: int) -> np.ndarray:
+        if not hasattr(kod, "co_code"):
+            return np.broadcast_to(np.float64(kod), (n,))
+        with np.errstate(all="ignore"):
+            return np.broadcast_to(eval(kod, _ORTAM, ns), (n,))
+
+    def _grup_secimi(self, grup: dict, ns, n: int) -> np.ndarray:
+        """Satır başına ilk sağlanan kuralın sırası (-1: hiçbiri)."""
+        kosullar = [self._calistir(k["kosul"], ns, n).astype(bool) for k in grup["kurallar"]]
+        return np.select(kosullar, np.arange(len(kosullar)), -1)
+
+    @staticmethod
+    def _oge_sirasi(grup: dict, oge) -> int:
+        for i, o in enumerate(grup["ogeler"]):
+            if o["icerir"] in oge:
+                return i
+        return -1
+
+    def liste_puani(self, bolum: str, grup_adi: str, oge: str) -> float:
+        """Liste grubunda tek öğenin puanı (ör. tek mum formasyonu)."""
+        for g in self._bolum(bolum)["gruplar"]:
+            if g["ad"] == grup_adi and "liste" in g:
+                i = self._oge_sirasi(g, str(oge))
+                return g["ogeler"][i]["puan"] if i >= 0 else 0.0
+        raise KuralHatasi(f"'{bolum}' bölümünde '{grup_adi}' liste grubu yok")
+
+    def _liste_puani(self, grup: dict, tablo, n: int) -> np.ndarray:
+        if grup["hazir"] and grup["hazir"] in tablo:
+            return np.asarray(tablo[grup["hazir"]], dtype=float)
+        listeler = list(tablo[grup["liste"]])
+        ogeler = pd.Series([o for l in listeler for o in l], dtype=object).astype(str)
+        puan = np.zeros(len(ogeler))
+        kalan = np.ones(len(ogeler), dtype=bool)
+        for o in grup["ogeler"]:
+            eslesen = kalan & ogeler.str.contains(o["icerir"], regex=False).to_numpy()
+            puan[eslesen] = o["puan"]
+            kalan &= ~eslesen
+        satir = np.repeat(np.arange(n), [len(l) for l in listeler])
+        return np.bincount(satir, weights=puan, minlength=n)
+
+    def puanla(self, bolum: str, tablo, ham: bool = False) -> np.ndarray:
+        """
+        Bölüm puanı (satır başına float): baz + grup puanları, zorla
+        kuralları ve alt/üst sınır uygulanmış. ham=True ise sınırlar ve
+        zorla uygulanmaz.
+        """
+        b = self._bolum(bolum)
+        n = len(tablo)
+        ns = _Sutunlar(tablo)
+        puan = np.full(n, b["baz"])
+        for g in b["gruplar"]:
+            if "liste" in g:
+                puan += self._liste_puani(g, tablo, n)
+                continue
+            puanlar = [self._calistir(k["puan"], ns, n) for k in g["kurallar"]]
+            kosullar = [self._calistir(k["kosul"], ns, n).astype(bool) for k in g["kurallar"]]
+            puan += np.select(kosullar, puanlar, 0.0)
+        if ham:
+            return puan
+        if b["alt"] is not None or b["ust"] is not None:
+            puan = np.clip(puan, b["alt"], b["ust"])
+        for z in b["zorla"]:
+            puan = np.where(self._calistir(z["kosul"], ns, n).astype(bool), z["deger"], puan)
+        return puan
+
+    def eslesmeler(self, bolum: str, tablo) -> dict:
+        """grup adı → satır başına eşleşen kural sırası (-1: hiçbiri); liste grupları hariç."""
+        n = len(tablo)
+        ns = _Sutunlar(tablo)
+        return {g["ad"]: self._grup_secimi(g, ns, n)
+                for g in self._bolum(bolum)["gruplar"] if "liste" not in g}
+
+    def etiketler(self, bolum: str, tablo, grup_adi: str) -> list:
+        """Satır başına eşleşen kuralın etiketi (yoksa None)."""
+        g = next(g for g in self._bolum(bolum)["gruplar"] if g["ad"] == grup_adi)
+        secim = self._grup_secimi(g, _Sutunlar(tablo), len(tablo))
+        return [g["kurallar"][i]["etiket"] if i >= 0 else None for i in secim]
+
+    def mesajlar(self, bolum: str, tablo: pd.DataFrame, satirlar: Optional[list] = None,
+                 grup_adi: bool = False) -> list:
+        """
+        Satır başına [mesaj, ...] — grup sırasıyla, mesajı olan eşleşen kurallar.
+        satirlar konumsal indeks listesidir (varsayılan: hepsi); koşullar
+        yalnızca bu satırlar üzerinde değerlendirilir. grup_adi=True ise
+        öğeler (grup adı, mesaj) çiftidir.
+        """
+        t = tablo if satirlar is None else tablo.iloc[list(satirlar)]
+        b = self._bolum(bolum)
+        n = len(t)
+        ns = _Sutunlar(t)
+        secimler = [None if "liste" in g else self._grup_secimi(g, ns, n) for g in b["gruplar"]]
+        sonuc = []
+        for i, satir in enumerate(t.to_dict("records")):
+            metin = []
+            for g, secim in zip(b["gruplar"], secimler):
+                if secim is None:
+                    for oge in satir[g["liste"]]:
+                        j = self._oge_sirasi(g, str(oge))
+                        if j >= 0 and g["ogeler"][j]["mesaj"]:
+                            m = g["ogeler"][j]["mesaj"].format(oge=oge)
+                            metin.append((g["ad"], m) if grup_adi else m)
+                elif secim[i] >= 0:
+                    sablon = g["kurallar"][secim[i]]["mesaj"]
+                    if sablon:
+                        m = sablon.format(**satir)
+                        metin.append((g["ad"], m) if grup_adi else m)
+            sonuc.append(metin)
+        return sonuc
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# YÜKLEME + ÖNBELLEK
+# ════════════════════════════════════════════════════════════════════════════
+
+_planlar: dict = {}      # içerik özeti → KuralPlani (süreç içi)
+_uyarilar: set = set()   # aynı yükleme uyarısı süreçte bir kez basılır
+
+
+def _uyar(metin: str):
+    if metin not in _uyarilar:
+        _uyarilar.add(metin)
+        print(f"  ⚠️  {metin}")
+
+
+def _ozet(icerik: bytes) -> str:
+    h = hashlib.sha1(icerik)
+    h.update(f"{sys.version}|{PLAN_SURUM}".encode())
+    return h.hexdigest()
+
+
+def _donmus_oku(yol: Path, anahtar: str) -> dict:
+    """Önbellek dosyası bu içerik özeti ve Python sürümü içinse {ifade: kaynak}, değilse {}."""
+    try:
+        kayit = json.loads(yol.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+        return {}
+    if (not isinstance(kayit, dict) or kayit.get("ozet") != anahtar
+            or kayit.get("python") != sys.version or kayit.get("surum") != PLAN_SURUM
+            or not isinstance(kayit.get("ifadeler"), dict)):
+        return {}
+    return {k: v for k, v in kayit["ifadeler"].items() if isinstance(k, str) and isinstance(v, str)}
+
+
+def plan_yukle(yol=None, gerekli: Optional[dict] = None) -> KuralPlani:
+    """
+    Kural dosyasını derlenmiş plan olarak döner. Aynı içerik için süreç içinde
+    bir kez derlenir; dönüştürme çalıştırmalar arasında PLAN_DIZIN'den okunur.
+    gerekli verilirse parametreler doğrulanır (bkz. parametreleri_dogrula).
+    Her türlü yükleme hatası KuralHatasi'dır.
+    """
+    yol = Path(yol or KURAL_DOSYASI)
+    try:
+        icerik = yol.read_bytes()
+    except OSError as e:
+        raise KuralHatasi(f"{yol}: okunamadı ({e})") from None
+    anahtar = _ozet(icerik)
+    plan = _planlar.get(anahtar)
+    if plan is None:
+        try:
+            tanim = json.loads(icerik.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise KuralHatasi(f"{yol}: okunamadı ({e})") from None
+        onbellek = PLAN_DIZIN / f"{anahtar}.json"
+        donmus = _donmus_oku(onbellek, anahtar)
+        once = dict(donmus)
+        plan = derle(tanim, donmus)
+        if donmus != once:
+            try:
+                PLAN_DIZIN.mkdir(parents=True, exist_ok=True)
+                gecici = onbellek.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                gecici.write_text(json.dumps({"ozet": anahtar, "python": sys.version,
+                                              "surum": PLAN_SURUM, "ifadeler": donmus},
+                                             ensure_ascii=False), encoding="utf-8")
+                os.replace(gecici, onbellek)
+            except OSError:
+                pass
+        _planlar[anahtar] = plan
+    if gerekli:
+        plan.parametreleri_dogrula(gerekli)
+    return plan
+
+
+def plan_yukle_yedekli(yol=None, gerekli: Optional[dict] = None) -> KuralPlani:
+    """
+    Modül düzeyi yükleme: plan_yukle hata verirse uyarı basar ve paketle
+    gelen VARSAYILAN_DOSYA'yı dener; o da yüklenemezse boş plan döner
+    (parametre() varsayılanlarını verir, puanla() KuralHatasi fırlatır).
+    """
+    yol = Path(yol or KURAL_DOSYASI)
+    try:
+        return plan_yukle(yol, gerekli)
+    except KuralHatasi as e:
+        _uyar(f"Kural dosyası yüklenemedi: {e}")
+    if yol.resolve() != VARSAYILAN_DOSYA.resolve():
+        try:
+            plan = plan_yukle(VARSAYILAN_DOSYA, gerekli)
+            _uyar(f"Varsayılan kurallar kullanılıyor: {VARSAYILAN_DOSYA}")
+            return plan
+        except KuralHatasi as e:
+            _uyar(f"Varsayılan kural dosyası da yüklenemedi: {e}")
+    _uyar("Kural planı boş: puanlama çağrıları hata verecek")
+    return KuralPlani({}, {})
@@ -0,0 +1,294 @@
+"""
+KURAL PUANI GEÇMİŞİ
+===================
+Kural motoru puanlarının (teknik_puan / toplam_puan) evrendeki her hisse ve
+her işlem günü için geçmişi. Her tarih için hisse_derin_cek yeniden
+çalıştırılmaz: kural girdileri (ADX, Ichimoku, SAR, RSI, MACD, Stochastic,
+ıraksama, mum formasyonu, OBV, Bollinger %B, Sharpe) PiyasaMatrisi üzerinde
+tarih × ticker matrisleri olarak bir kez hesaplanır, uzun tabloya açılır ve
+kural_motoru.puanla ile tek seferde puanlanır.
+
+Canlı hesaba göre farklar:
+  - Canlı puan PERIOD (6 ay ≈ PENCERE_BAR bar) penceresinden hesaplanır.
+    Yerel göstergeler (RSI, SMA, Bollinger, ADX, Stochastic, Ichimoku, mum,
+    OBV farkı, Sharpe) pencereyle birebir aynıdır; golden/death cross dalı
+    (20/50 – 50/200) da pencere bar sayısına göre seçilir. Başlangıca bağlı
+    MACD EWM'i ve Parabolic SAR tüm geçmişten yürür; ıraksamada pencere
+    başındaki ilk pivot çifti canlıda görülmez.
+  - Temel bilgilerin geçmişi yok: ilk kurulumda verilen (bugünkü) temel
+    değerler tüm tarihlere uygulanır (toplam_puan için ileriye bakma içerir);
+    artımlı güncellemelerde her gün kendi sabahının değerleriyle kalır.
+    teknik_puan tamamen tarihseldir; eşik analizi bu yüzden teknik üzerinde yapılır.
+  - Canlıda olduğu gibi ASGARI_BAR'dan az geçmişi olan günler NaN'dır; böyle
+    bir hisse artımlı güncellemeyi bozmaz, ASGARI_BAR'a ulaştığı gün geçmiş
+    baştan kurulur.
+
+Depolama: .onbellek/kural_gecmisi.npz — tarihler, tickerlar ve float32
+teknik/toplam dizileri. guncelle() her çalıştırmada yalnızca son kayıtlı
+günden BINDIRME_BAR geriden başlayan kuyruğu (ISINMA_BAR ısınma ile)
+yeniden hesaplar; evrene yeni ticker girerse geçmiş baştan kurulur.
+
+Kullanım:
+    from kural_gecmisi import guncelle, esik_analizi
+    g = guncelle(veriler, temel=temel_df, risksiz=0.42)   # {"teknik", "toplam"} tarih × ticker
+    esik_analizi(g["teknik"], kapanis, esik=70, ufuk=20)
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import kayit_oynat
+from kesit_matrisi import PiyasaMatrisi
+from kural_motoru import SEKTOR_AGIRLIK, VARSAYILAN_TEMEL_AGIRLIK, puanla, mum_form_puani
+from indikatorler import (gercek_aralik, obv_serisi, kesisimler, parabolic_sar_serisi,
+                          iraksama_taramasi, DURUM_TIPLERI)
+
+# ── Sabitler ────────────────────────────────────────────────────────────────
+GECMIS_DOSYA = Path(os.getenv("BIST_ONBELLEK_DIZIN", ".onbellek")) / "kural_gecmisi.npz"
+PENCERE_BAR  = 126    # canlı hesabın penceresi: PERIOD="6mo" işlem günü
+ASGARI_BAR   = 60     # hisse_derin_cek bundan kısa geçmişi puanlamaz
+ISINMA_BAR   = 250    # artımlı güncellemede yeniden hesaplanan kuyruğun ısınma payı
+BINDIRME_BAR = 5      # son kayıtlı günden geriye yeniden hesaplanan gün (kısmi bar / düzeltme)
+TEMEL_ALANLAR = ["fk_orani", "roe", "borc_ozsermaye", "fcf_m", "gelir_buyume_yoy"]
+IRAKSAMA_DURUM = np.array(["YOK", *DURUM_TIPLERI], dtype=object)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# GÖSTERGE MATRİSLERİ — bist_agents.hesapla_* formüllerinin tarih × ticker hali
+# ════════════════════════════════════════════════════════════════════════════
+
+def _adx(h, l, c, p=14):
+    tr = gercek_aralik(h, l, c)
+    yukari = h.diff().clip(lower=0)
+    asagi  = (-l.diff()).clip(lower=0)
+    dm_pos = yukari.where(yukari > asagi, 0)
+    dm_neg = asagi.where(asagi > yukari, 0)
+    atr_s  = tr.rolling(p).mean()
+    di_pos = 100 * dm_pos.rolling(p).mean() / atr_s
+    di_neg = 100 * dm_neg.rolling(p).mean() / atr_s
+    dx     = 100 * (di_pos - di_neg).abs() / (di_pos + di_neg)
+    return dx.rolling(p).mean().round(2).fillna(0.0)
+
+def _ichimoku(h, c):
+    def mid(s, p): return (s.rolling(p).max() + s.rolling(p).min()) / 2
+    tenkan = mid(h, 9); kijun = mid(h, 26)
+    sa = ((tenkan + kijun) / 2).shift(26).round(2).to_numpy()
+    sb = mid(h, 52).shift(26).round(2).to_numpy()
+    ust = np.fmax(sa, sb); alt = np.fmin(sa, sb)
+    bulut = ~np.isnan(sa) & ~np.isnan(sb) & (sa != 0) & (sb != 0)
+    fiyat = c.to_numpy()
+    durum = np.select([bulut & (fiyat > ust), bulut & (fiyat < alt), bulut],
+                      ["BULUT_USTU", "BULUT_ALTI", "BULUT_ICINDE"], "BELIRSIZ")
+    tk = np.where(tenkan.round(2).to_numpy() > kijun.round(2).to_numpy(), "YUKARI", "ASAGI")
+    return durum, tk
+
+def _kesisim_durumu(sma: dict, hizli: int, yavas: int) -> np.ndarray:
+    olay = kesisimler(sma[hizli], sma[yavas], geri=4).to_numpy()
+    ust  = sma[hizli].round(2).to_numpy() > sma[yavas].round(2).to_numpy()
+    ek   = f"({hizli}/{yavas})" if yavas == 50 else ""
+    return np.select([olay > 0, olay < 0, ust],
+                     [f"GOLDEN_CROSS{ek}", f"DEATH_CROSS{ek}", f"SMA{hizli}_USTUNDE"],
+                     f"SMA{hizli}_ALTINDA")
+
+def _sharpe(c, risksiz, pencere_bar):
+    getiri = c.pct_change(fill_method=None)
+    g = getiri.rolling(pencere_bar - 1, min_periods=1)
+    ort, std, adet = g.mean() * 252, g.std() * 252**0.5, g.count()
+    sh = ((ort - risksiz) / std).round(2).where(std > 0, 0.0)
+    return sh.where(adet >= 10, 0.0).to_numpy()
+
+def _seritler(c, h, l, ob, rsi, macd):
+    """Ticker başına sıralı göstergeler: SAR yönü ve ıraksama durumu (son 20 bar)."""
+    n, k = c.shape
+    sar_yon = np.full((n, k), "?", dtype=object)
+    ira = {ad: np.zeros((n, k), dtype=np.int8) for ad in ("RSI", "MACD", "OBV")}
+    for j in range(k):
+        gecerli = np.flatnonzero(~np.isnan(c[:, j]))
+        if not len(gecerli):
+            continue
+        s = slice(gecerli[0], None)
+        sar, _ = parabolic_sar_serisi(h[s, j], l[s, j])
+        sar_yon[s, j] = np.where(c[s, j] > np.round(sar, 2), "YUKARI", "ASAGI")
+        olaylar = iraksama_taramasi(c[s, j], {"RSI": rsi[s, j], "MACD": macd[s, j], "OBV": ob[s, j]})
+        sira = np.arange(len(c[s, j]))
+        for ad, olay in olaylar.items():
+            # tip başına son olay konumu; en yeni kazanır, aynı barda DURUM_TIPLERI sırası
+            son = np.stack([np.maximum.accumulate(np.where(olay[tip], sira, -1))
+                            for tip in DURUM_TIPLERI])
+            tip = son.argmax(axis=0)
+            yakin = son.max(axis=0) >= np.maximum(sira - 19, 0)
+            ira[ad][s, j] = np.where(yakin & (son.max(axis=0) >= 0), tip + 1, 0)
+    return sar_yon, {ad: IRAKSAMA_DURUM[d] for ad, d in ira.items()}
+
+def kural_girdileri(m: PiyasaMatrisi, risksiz: float, pencere_bar: int = PENCERE_BAR,
+                    onceki_bar: Optional[pd.Series] = None) -> dict:
+    """
+    Kural tablosu sütunları → (tarih × ticker) numpy dizisi, "bar_say" ile
+    birlikte (tarihteki pencere bar sayısı). onceki_bar: matris bir dilimse,
+    dilim başından önceki geçerli bar sayıları (ticker başına).
+    """
+    c, h, l, v = m.close, m.high, m.low, m.volume
+    sayac = c.notna().cumsum()
+    if onceki_bar is not None:
+        sayac = sayac + onceki_bar.reindex(c.columns).fillna(0)
+    bar_say = np.minimum(sayac.to_numpy(), pencere_bar)
+
+    sma = m.sma_bankasi((20, 50, 200))
+    macd_m, macd_s, _ = m.macd(adjust=False)
+    rsi  = m.rsi().round(2)
+    ob   = obv_serisi(c, v)
+    st20 = c.rolling(20).std()
+    ust, alt = sma[20] + 2*st20, sma[20] - 2*st20
+    hi, lo = h.rolling(14).max(), l.rolling(14).min()
+    ich_durum, tenkan_kijun = _ichimoku(h, c)
+    sar_yon, ira = _seritler(c.to_numpy(), h.to_numpy(), l.to_numpy(), ob.to_numpy(),
+                             rsi.to_numpy(), macd_m.to_numpy())
+    kisa, uzun = _kesisim_durumu(sma, 20, 50), _kesisim_durumu(sma, 50, 200)
+    gc = np.where(bar_say < 50, "VERI_YOK", np.where(bar_say < 200, kisa, uzun))
+
+    mum = np.zeros(c.shape)
+    for ad, maske in m.mum_taramasi().items():
+        mum += mum_form_puani(ad) * maske.to_numpy()
+
+    return {
+        "bar_say": bar_say,
+        "adx": _adx(h, l, c).to_numpy(),
+        "rsi_14": rsi.to_numpy(),
+        "macd": macd_m.round(4).to_numpy(), "macd_sinyal": macd_s.round(4).to_numpy(),
+        "stoch_k": (100*(c - lo)/(hi - lo)).round(2).to_numpy(),
+        "obv_trend": ob.diff(19).round(0).to_numpy(),
+        "bb_pct": ((c - alt)/(ust - alt)).round(3).to_numpy(),
+        "sharpe": _sharpe(c, risksiz, pencere_bar),
+        "golden_cross_durum": gc, "ichimoku_durum": ich_durum, "tenkan_kijun": tenkan_kijun,
+        "sar_yon": sar_yon, "rsi_iraksama": ira["RSI"], "macd_iraksama": ira["MACD"],
+        "obv_iraksama": ira["OBV"], "mum_puani": mum,
+    }
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# PUANLAMA
+# ════════════════════════════════════════════════════════════════════════════
+
+def puan_gecmisi(m: PiyasaMatrisi, temel: Optional[pd.DataFrame] = None, risksiz: float = 0.0,
+                 pencere_bar: int = PENCERE_BAR, onceki_bar: Optional[pd.Series] = None) -> dict:
+    """
+    {"teknik": DataFrame, "toplam": DataFrame} — tarih × ticker kural puanları.
+    temel: index ticker, TEMEL_ALANLAR sütunları (HisseDerin ile aynı birimler).
+    """
+    g = kural_girdileri(m, risksiz, pencere_bar, onceki_bar)
+    n, k = g["bar_say"].shape
+    kisa = [t.replace(".IS", "") for t in m.tickers]
+    temel = (temel if temel is not None else pd.DataFrame()).reindex(index=m.tickers, columns=TEMEL_ALANLAR)
+    tablo = pd.DataFrame({ad: np.ravel(d) for ad, d in g.items() if ad != "bar_say"})
+    for ad in TEMEL_ALANLAR:
+        tablo[ad] = np.tile(temel[ad].to_numpy(dtype=float), n)
+    tablo["temel_agirlik"] = np.tile([SEKTOR_AGIRLIK.get(t, VARSAYILAN_TEMEL_AGIRLIK) for t in kisa], n)
+    puan = puanla(tablo)
+
+    gecerli = (g["bar_say"] >= ASGARI_BAR) & m.close.notna().to_numpy()
+    sonuc = {}
+    for ad, sutun in (("teknik", "teknik_puan"), ("toplam", "toplam_puan")):
+        d = puan[sutun].to_numpy(dtype=float).reshape(n, k)
+        sonuc[ad] = pd.DataFrame(np.where(gecerli, d, np.nan), index=m.close.index, columns=m.tickers)
+    return sonuc
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# DEPOLAMA / ARTIMLI GÜNCELLEME
+# ════════════════════════════════════════════════════════════════════════════
+
+def gecmisi_yukle() -> Optional[dict]:
+    """Diskteki geçmiş: {"teknik", "toplam", "pencere_bar"}; yoksa None."""
+    if kayit_oynat.aktif() or not GECMIS_DOSYA.exists():
+        return None
+    try:
+        with np.load(GECMIS_DOSYA, allow_pickle=False) as z:
+            index = pd.DatetimeIndex(z["tarihler"].astype("datetime64[ns]"))
+            tickers = z["tickers"].tolist()
+            return {ad: pd.DataFrame(z[ad].astype(float).round(1), index=index, columns=tickers)
+                    for ad in ("teknik", "toplam")} | {"pencere_bar": int(z["pencere_bar"])}
+    except Exception as e:
+        print(f"  Kural geçmişi okunamadı: {e}")
+        return None
+
+def _kaydet(gecmis: dict, pencere_bar: int):
+    if kayit_oynat.aktif():
+        return
+    try:
+        GECMIS_DOSYA.parent.mkdir(parents=True, exist_ok=True)
+        gecici = GECMIS_DOSYA.with_suffix(".tmp.npz")
+        np.savez_compressed(gecici,
+                            tarihler=gecmis["toplam"].index.values.astype("datetime64[D]"),
+                            tickers=np.array(gecmis["toplam"].columns, dtype=str),
+                            teknik=gecmis["teknik"].to_numpy(dtype=np.float32),
+                            toplam=gecmis["toplam"].to_numpy(dtype=np.float32),
+                            pencere_bar=np.array(pencere_bar))
+        os.replace(gecici, GECMIS_DOSYA)
+    except Exception as e:
+        print(f"  Kural geçmişi yazılamadı: {e}")
+
+def guncelle(veriler: dict, temel: Optional[pd.DataFrame] = None, risksiz: float = 0.0,
+             pencere_bar: int = PENCERE_BAR) -> dict:
+    """
+    veriler: {ticker: günlük OHLCV} (toplu_fiyat_gecmisi). Kayıtlı geçmiş
+    varsa sadece kuyruğu hesaplar ve birleştirir; sonucu diske yazar.
+    Dönüş: {"teknik", "toplam"} tarih × ticker.
+    """
+    m = PiyasaMatrisi(veriler)
+    eski = gecmisi_yukle()
+    if not len(m.close):
+        return {ad: eski[ad] for ad in ("teknik", "toplam")} if eski else {}
+    tam = (eski is None or eski["pencere_bar"] != pencere_bar
+           or bool(set(m.tickers) - set(eski["toplam"].columns)))
+    if not tam:
+        # yeni barı gelen her tickerın son kayıtlı puanından itibaren (geride kalan hisse dahil)
+        son_kayit = eski["teknik"].apply(pd.Series.last_valid_index)
+        son_veri  = m.close.apply(pd.Series.last_valid_index).reindex(son_kayit.index)
+        yenilenen = son_kayit[son_veri.notna() & (son_kayit.isna() | (son_veri > son_kayit))]
+        # hiç puanı olmayan hisse: ASGARI_BAR'a henüz ulaşmadıysa puanlanacak günü yok
+        # (NaN kalır); ulaştıysa ilk puanlı günü bilinmediğinden tam hesap
+        puansiz = yenilenen.index[yenilenen.isna()]
+        tam = bool((m.bar_sayisi.reindex(puansiz) >= ASGARI_BAR).any())
+        yenilenen = yenilenen.dropna()
+    if not tam:
+        son = min([eski["toplam"].index[-1], *yenilenen])
+        konum = int(m.close.index.searchsorted(son))
+        yeni_bas = max(0, konum - BINDIRME_BAR)
+        bas = max(0, yeni_bas - ISINMA_BAR)
+        yeni = puan_gecmisi(m.dilim(bas), temel, risksiz, pencere_bar,
+                            onceki_bar=m.close.iloc[:bas].notna().sum())
+        kes = m.close.index[min(yeni_bas, len(m.close) - 1)]
+        gecmis = {ad: pd.concat([eski[ad].loc[eski[ad].index < kes], yeni[ad].loc[kes:]])
+                  for ad in ("teknik", "toplam")}
+    else:
+        gecmis = puan_gecmisi(m, temel, risksiz, pencere_bar)
+    _kaydet(gecmis, pencere_bar)
+    return gecmis
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# EŞİK ANALİZİ
+# ════════════════════════════════════════════════════════════════════════════
+
+def esik_analizi(puan: pd.DataFrame, kapanis: pd.DataFrame, esik: float = 70,
+                 ufuk: int = 20) -> dict:
+    """
+    Puan ≥ esik olan (tarih, ticker) gözlemlerinin ufuk bar sonraki getirisi,
+    eşik altıyla karşılaştırmalı: {"ust"|"alt": {"ornek", "ort", "medyan", "pozitif"}}.
+    ort/medyan yüzde; sonu henüz gelmemiş gözlemler örneğe girmez.
+    """
+    kapanis = kapanis.reindex(index=puan.index, columns=puan.columns)
+    ileri = (kapanis.shift(-ufuk) / kapanis - 1).to_numpy() * 100
+    p = puan.to_numpy()
+    sonuc = {}
+    for ad, maske in (("ust", p >= esik), ("alt", p < esik)):
+        g = ileri[maske & ~np.isnan(ileri)]
+        sonuc[ad] = {"ornek": int(len(g)),
+                     "ort": round(float(g.mean()), 2) if len(g) else None,
+                     "medyan": round(float(np.median(g)), 2) if len(g) else None,
+                     "pozitif": round(float((g > 0).mean()), 2) if len(g) else None}
+    return sonuc
@@ -0,0 +1,116 @@
+"""
+KURAL MOTORU
+============
+Teknik + temel kural puanlamasını tüm evren için sütun bazında yapar.
+Gösterge değerleri bir tabloya (satır = hisse) dizilir, her kural bu tablo
+üzerinde tek bir boolean maske olarak değerlendirilir; teknik_puan,
+temel_puan ve toplam_puan bütün satırlar için aynı anda çıkar. Kurallar,
+puanlar ve sektör ağırlıkları kurallar.json'daki "teknik"/"temel" bölümleri
+ve "sektor_agirlik" parametresidir (bkz. kural_derleyici).
+
+Açıklama metinleri puanlamada üretilmez: aciklamalar() yalnızca istenen
+satırlar (ekranda gösterilen / rapora yazılan hisseler) için aynı kural
+maskelerini yeniden değerlendirip metinleri oluşturur.
+
+Eksik değer: None ve NaN aynı sayılır (kural uygulanmaz). Eski hisse başına
+fonksiyonda NaN bir MACD değeri "sinyal altında" (-4) sayılıyordu; tabloda
+NaN ile None ayırt edilemediği için bu durumda kural artık uygulanmaz.
+
+Kullanım:
+    from kural_motoru import tablo_olustur, puanla, aciklamalar
+    tablo = tablo_olustur(hisseler)            # HisseDerin listesi
+    puan  = puanla(tablo)                      # teknik_puan / temel_puan / toplam_puan
+    ilk10 = puan.nlargest(10, "toplam_puan").index
+    metin = aciklamalar(tablo, ilk10)          # ticker → [açıklama, ...]
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from kural_derleyici import plan_yukle_yedekli
+
+# ── Sabitler ────────────────────────────────────────────────────────────────
+# Kurallar, puanlar ve sektör ağırlıkları kurallar.json'dan (bir kez derlenir)
+_PLAN = plan_yukle_yedekli()
+
+# Toplam puanda temel analizin ağırlığı (kalanı teknik); listede olmayan varsayılan
+SEKTOR_AGIRLIK = dict(_PLAN.parametre("sektor_agirlik", "hisseler", varsayilan={}))
+VARSAYILAN_TEMEL_AGIRLIK = float(_PLAN.parametre("sektor_agirlik", "varsayilan", varsayilan=0.40))
+
+SAYISAL = ["adx", "rsi_14", "macd", "macd_sinyal", "stoch_k", "obv_trend", "bb_pct",
+           "fk_orani", "roe", "borc_ozsermaye", "fcf_m", "gelir_buyume_yoy", "sharpe"]
+
+
+def _sayi(v) -> float:
+    try: return float(v) if v is not None else np.nan
+    except (TypeError, ValueError): return np.nan
+
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# TABLO
+# ════════════════════════════════════════════════════════════════════════════
+
+def tablo_olustur(hisseler) -> pd.DataFrame:
+    """
+    HisseDerin benzeri nesnelerden (aynı alan adları) kural tablosu.
+    Satır indeksi ticker; sayısal alanlar float (eksik → NaN).
+    """
+    satirlar = []
+    for h in hisseler:
+        ich = h.ichimoku or {}
+        satir = {a: _sayi(getattr(h, a, None)) for a in SAYISAL}
+        satir.update(
+            golden_cross_durum=h.golden_cross_durum,
+            ichimoku_durum=ich.get("durum", "?") if ich else None,
+            tenkan_kijun=ich.get("tenkan_kijun") if ich else None,
+            sar_yon=h.sar_yon,
+            rsi_iraksama=h.rsi_iraksama, macd_iraksama=h.macd_iraksama, obv_iraksama=h.obv_iraksama,
+            mum_formasyonlari=list(h.mum_formasyonlari or []),
+            temel_agirlik=SEKTOR_AGIRLIK.get(h.ticker.replace(".IS", ""), VARSAYILAN_TEMEL_AGIRLIK),
+        )
+        satirlar.append(satir)
+    index = pd.Index([h.ticker for h in hisseler], name="ticker")
+    return pd.DataFrame(satirlar, index=index,
+                        columns=SAYISAL + ["golden_cross_durum", "ichimoku_durum", "tenkan_kijun",
+                                           "sar_yon", "rsi_iraksama", "macd_iraksama", "obv_iraksama",
+                                           "mum_formasyonlari", "temel_agirlik"])
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# KURALLAR — kurallar.json "teknik" / "temel" bölümleri (kural_derleyici)
+# ════════════════════════════════════════════════════════════════════════════
+
+def mum_form_puani(form: str) -> float:
+    """Tek formasyonun teknik puana katkısı (kural dosyasındaki mum grubu)."""
+    return _PLAN.liste_puani("teknik", "mum", form)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ANA API
+# ════════════════════════════════════════════════════════════════════════════
+
+def puanla(tablo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tüm satırlar için teknik_puan, temel_puan (0-100) ve sektör ağırlıklı
+    toplam_puan. Yuvarlamalar eski hisse başına hesapla birebir aynıdır.
+    """
+    teknik = _PLAN.puanla("teknik", tablo)
+    temel  = _PLAN.puanla("temel", tablo)
+    w = tablo["temel_agirlik"].to_numpy(dtype=float)
+    ham = teknik * (1.0 - w) + temel * w
+    # Python round (banker's değil, ikili gösterime göre) — np.round ile .x5 sınırında ayrışır
+    yuvarla = lambda a: [round(float(x), 1) for x in a]
+    return pd.DataFrame({"teknik_puan": yuvarla(teknik), "temel_puan": yuvarla(temel),
+                         "toplam_puan": yuvarla(ham)}, index=tablo.index)
+
+def aciklamalar(tablo: pd.DataFrame, satirlar: Optional[list] = None) -> pd.Series:
+    """
+    ticker → [açıklama, ...] Series'i — yalnızca satirlar (varsayılan: hepsi) için.
+    Sıra kural_motoru_hesapla / kural_motoru_toplu ile aynı: teknik kurallar, ardından temel.
+    """
+    t = tablo if satirlar is None else tablo.loc[list(satirlar)]
+    sonuc = [a + b for a, b in zip(_PLAN.mesajlar("teknik", t), _PLAN.mesajlar("temel", t))]
+    return pd.Series(sonuc, index=t.index, dtype=object)
@@ -7,10 +7,11 @@ import os, json, warnings
 from datetime import datetime
 from pathlib import Path
 warnings.filterwarnings("ignore")
-import requests
 from dotenv import load_dotenv
 load_dotenv()
 
+import http_istemci
+
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 GROQ_API_KEY     = os.getenv("GROQ_API_KEY", "")
@@ -32,7 +33,7 @@ def telegram_mesajlari_cek(limit: int = 10) -> list:
 
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates"
-        r = requests.get(url, params={"limit": 100, "allowed_updates": ["message"]}, timeout=15)
+        r = http_istemci.get(url, params={"limit": 100, "allowed_updates": ["message"]}, timeout=15)
         if r.status_code != 200:
             print(f"  Telegram hata: {r.status_code}")
             return []
@@ -216,7 +217,7 @@ def telegram_gonder(mesaj: str):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         return False
     try:
-        r = requests.post(
+        r = http_istemci.post(
             f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
             json={"chat_id": TELEGRAM_CHAT_ID, "text": mesaj, "parse_mode": "HTML"},
             timeout=15,
@@ -0,0 +1,140 @@
+"""
+TEMEL VERİ ÖNBELLEĞİ
+=====================
+yfinance Ticker.info (F/K, PD/DD, piyasa değeri, serbest dolaşım, ROE ...)
+en yavaş ve en çok kısıtlanan çağrı; bu alanlar en fazla çeyreklik değişir.
+Her ticker'ın info sözlüğü TTL süresince diskte tutulur.
+
+Depolama:
+  .onbellek/temel.json  →  {ticker: {"zaman": epoch, "bilgi": {...}}}
+  Sadece skaler alanlar (str/int/float/bool/None) saklanır.
+
+Kullanım:
+    from temel_onbellek import temel_bilgi, temel_isit, temel_istatistik
+    temel_isit(tickers)                 # eksik/bayat olanları paralel çek
+    info = temel_bilgi("THYAO.IS")      # dict | None
+    temel_istatistik()                  # {"isabet": 97, "iska": 3}
+"""
+
+import os, json, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+from hiz_siniri import YAHOO_KOVA
+import kayit_oynat
+
+# ── Sabitler ────────────────────────────────────────────────────────────────
+TEMEL_DOSYA = Path(os.getenv("BIST_ONBELLEK_DIZIN", ".onbellek")) / "temel.json"
+TEMEL_TTL_SN = int(os.getenv("BIST_TEMEL_TTL_SN", "86400"))   # varsayılan: 1 gün
+ISIT_PARALEL = 8
+
+_KAYITLAR: Optional[dict] = None   # ticker → {"zaman", "bilgi"}
+_SAYAC = {"isabet": 0, "iska": 0}
+_KILIT = threading.Lock()
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# DİSK KATMANI
+# ════════════════════════════════════════════════════════════════════════════
+
+def _yukle() -> dict:
+    global _KAYITLAR
+    with _KILIT:
+        if _KAYITLAR is None and kayit_oynat.aktif():
+            _KAYITLAR = {}   # kayıt/oynatmada disk katmanı kapalı
+        elif _KAYITLAR is None:
+            try:
+                with open(TEMEL_DOSYA, encoding="utf-8") as f:
+                    _KAYITLAR = json.load(f)
+            except Exception:
+                _KAYITLAR = {}
+        return _KAYITLAR
+
+def _kaydet():
+    if kayit_oynat.aktif():
+        return
+    with _KILIT:
+        if _KAYITLAR is None:
+            return
+        veri = dict(_KAYITLAR)
+    try:
+        TEMEL_DOSYA.parent.mkdir(parents=True, exist_ok=True)
+        gecici = TEMEL_DOSYA.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump(veri, f, ensure_ascii=False)
+        os.replace(gecici, TEMEL_DOSYA)
+    except Exception as e:
+        print(f"  Temel önbellek yazılamadı: {e}")
+
+def _skaler(info: dict) -> dict:
+    return {k: v for k, v in info.items()
+            if v is None or isinstance(v, (str, int, float, bool))}
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ANA API
+# ════════════════════════════════════════════════════════════════════════════
+
+def _cek(ticker: str) -> Optional[dict]:
+    def _yahoo():
+        if yf is None:
+            return None
+        YAHOO_KOVA.al()
+        return yf.Ticker(ticker).info
+
+    try:
+        info = kayit_oynat.kayitli("temel", ticker, _yahoo)
+    except Exception:
+        return None
+    if not info:
+        return None
+    bilgi = _skaler(info)
+    with _KILIT:
+        _KAYITLAR[ticker] = {"zaman": time.time(), "bilgi": bilgi}
+    return bilgi
+
+def _taze(kayit: Optional[dict], ttl: int) -> bool:
+    return kayit is not None and time.time() - kayit.get("zaman", 0) < ttl
+
+def temel_bilgi(ticker: str, ttl: Optional[int] = None, kaydet: bool = True) -> Optional[dict]:
+    """
+    yf.Ticker(ticker).info yerine kullanılır. TTL içindeyse ağ isteği yapılmaz;
+    çekim başarısızsa bayat kayıt döner. Hiç veri yoksa None.
+    """
+    ttl = TEMEL_TTL_SN if ttl is None else ttl
+    kayit = _yukle().get(ticker)
+    if _taze(kayit, ttl):
+        with _KILIT:
+            _SAYAC["isabet"] += 1
+        return dict(kayit["bilgi"])
+    with _KILIT:
+        _SAYAC["iska"] += 1
+    bilgi = _cek(ticker)
+    if bilgi is None:
+        return dict(kayit["bilgi"]) if kayit else None
+    if kaydet:
+        _kaydet()
+    return dict(bilgi)
+
+def temel_isit(tickers: list, ttl: Optional[int] = None, paralel: int = ISIT_PARALEL) -> int:
+    """Eksik/bayat ticker'ların info'sunu paralel çekip diske yazar. Çekilen sayısı döner."""
+    ttl = TEMEL_TTL_SN if ttl is None else ttl
+    kayitlar = _yukle()
+    eksik = [t for t in dict.fromkeys(tickers) if not _taze(kayitlar.get(t), ttl)]
+    if not eksik:
+        return 0
+    with ThreadPoolExecutor(max_workers=paralel) as ex:
+        cekilen = sum(1 for b in ex.map(_cek, eksik) if b is not None)
+    _kaydet()
+    return cekilen
+
+def temel_istatistik() -> dict:
+    """Bu süreçteki önbellek isabet / ıska sayıları."""
+    with _KILIT:
+        return dict(_SAYAC)
@@ -0,0 +1,286 @@
+"""
+PİYASA VERİSİ SAĞLAYICILARI
+===========================
+fiyat_onbellek'in ağdan/diskten OHLCV aldığı katman. Her sağlayıcı aynı
+arayüzü uygular; zincirdeki ilk sağlayıcının verisi kullanılır, veri yoksa
+bir sonrakine düşülür.
+
+  yerel  → BIST_YEREL_VERI dizinindeki CSV/Parquet dosyaları (bakımı ayrı yapılır)
+  yahoo  → yfinance (YAHOO_KOVA hız sınırıyla)
+  stooq  → stooq.com günlük CSV (sadece STOOQ_SEMBOLLER'deki / stooq adlı semboller)
+
+Zincir sırası BIST_VERI_SAGLAYICILAR ile değişir (varsayılan "yerel,yahoo,stooq").
+Yerel dizin yoksa yerel sağlayıcı zincire girmez.
+
+Yerel dosya adları:
+  <dizin>/<TICKER>.parquet | .csv              → günlük
+  <dizin>/<TICKER>__<interval>.parquet | .csv  → diğer aralıklar
+  İlk sütun tarih; Open/High/Low/Close/Volume sütunları. Saat dilimi yoksa
+  BIST_YEREL_TZ (varsayılan Europe/Istanbul) kabul edilir.
+
+Her sağlayıcı için gecikme histogramı tutulur:
+    from veri_saglayici import gecikme_raporu
+    print(gecikme_raporu())
+"""
+
+import os, time, threading
+from io import StringIO
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+import http_istemci
+from hiz_siniri import YAHOO_KOVA
+
+SUTUNLAR = ["Open", "High", "Low", "Close", "Volume"]
+
+YEREL_DIZIN       = Path(os.getenv("BIST_YEREL_VERI", "veri"))
+YEREL_TZ          = os.getenv("BIST_YEREL_TZ", "Europe/Istanbul")
+YEREL_DUZELTILMIS = os.getenv("BIST_YEREL_DUZELTILMIS", "1") == "1"   # yerel veri auto_adjust'lı mı
+YEREL_MAKS_GECIKME_GUN = {"1d": 4, "1wk": 10, "1mo": 35}   # son bar en fazla bu kadar eski olabilir
+YEREL_GUN_ICI_GECIKME  = 1
+YEREL_BAS_TOLERANS_GUN = 7                                 # ilk bar istenen başlangıçtan bu kadar geç olabilir
+
+STOOQ_SEMBOLLER = {"DX-Y.NYB": "dxy"}   # Yahoo → Stooq sembol eşlemesi
+
+# Histogram kovaları (ms) — son kova üst sınırsız
+GECIKME_KOVALARI = [50, 100, 250, 500, 1000, 2500, 5000]
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# TEMEL SINIF
+# ════════════════════════════════════════════════════════════════════════════
+
+class VeriSaglayici:
+    ad = "?"
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self.histogram = [0] * (len(GECIKME_KOVALARI) + 1)
+        self.isabet = 0
+        self.iska   = 0
+
+    # ── Alt sınıfların uyguladığı kısım ───────────────────────────
+    def _gecmis(self, ticker: str, interval: str, auto_adjust: bool, period: str,
+                start: Optional[pd.Timestamp], kapsam: Optional[pd.Timestamp]) -> Optional[pd.DataFrame]:
+        raise NotImplementedError
+
+    def _toplu(self, tickers: list, interval: str, auto_adjust: bool, period: str,
+               start: Optional[pd.Timestamp], kapsam: Optional[pd.Timestamp]) -> dict:
+        sonuc = {}
+        for t in tickers:
+            df = self._gecmis(t, interval, auto_adjust, period, start, kapsam)
+            if df is not None:
+                sonuc[t] = df
+        return sonuc
+
+    # ── Ölçümlü genel arayüz ──────────────────────────────────────
+    def _olc(self, baslangic: float, basarili: int, basarisiz: int):
+        ms = (time.perf_counter() - baslangic) * 1000
+        kova = int(np.searchsorted(GECIKME_KOVALARI, ms, side="right"))
+        with self._kilit:
+            self.histogram[kova] += 1
+            self.isabet += basarili
+            self.iska   += basarisiz
+
+    def gecmis(self, ticker: str, interval: str = "1d", auto_adjust: bool = True, period: str = "",
+               start: Optional[pd.Timestamp] = None,
+               kapsam: Optional[pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+        """
+        Tek ticker OHLCV. period ("3mo") ya da start verilir; kapsam, verinin
+        en az hangi tarihten başlaması gerektiğidir. Veri yok/yetersiz → None.
+        """
+        t0 = time.perf_counter()
+        try:
+            df = _temizle(self._gecmis(ticker, interval, auto_adjust, period, start, kapsam))
+        except Exception:
+            df = None
+        self._olc(t0, df is not None, df is None)
+        return df
+
+    def toplu(self, tickers: list, interval: str = "1d", auto_adjust: bool = True, period: str = "",
+              start: Optional[pd.Timestamp] = None, kapsam: Optional[pd.Timestamp] = None) -> dict:
+        """Çoklu ticker → {ticker: DataFrame}; verisi olmayanlar sözlükte yer almaz."""
+        t0 = time.perf_counter()
+        try:
+            ham = self._toplu(tickers, interval, auto_adjust, period, start, kapsam)
+        except Exception:
+            ham = {}
+        sonuc = {t: d for t, d in ((t, _temizle(d)) for t, d in ham.items()) if d is not None}
+        self._olc(t0, len(sonuc), len(tickers) - len(sonuc))
+        return sonuc
+
+def _temizle(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if df is None or df.empty:
+        return None
+    df = df[[k for k in SUTUNLAR if k in df.columns]].dropna(how="all")
+    if df.empty:
+        return None
+    if df.index.tz is None:
+        df = df.tz_localize("UTC")
+    return df
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# SAĞLAYICILAR
+# ════════════════════════════════════════════════════════════════════════════
+
+class YahooSaglayici(VeriSaglayici):
+    ad = "yahoo"
+
+    def _gecmis(self, ticker, interval, auto_adjust, period, start, kapsam):
+        if yf is None:
+            return None
+        YAHOO_KOVA.al()
+        if start is not None:
+            return yf.Ticker(ticker).history(start=start.strftime("%Y-%m-%d"), interval=interval,
+                                             auto_adjust=auto_adjust)
+        return yf.Ticker(ticker).history(period=period, interval=interval, auto_adjust=auto_adjust)
+
+    def _toplu(self, tickers, interval, auto_adjust, period, start, kapsam):
+        if yf is None or not tickers:
+            return {}
+        kw = {"start": start.strftime("%Y-%m-%d")} if start is not None else {"period": period}
+        YAHOO_KOVA.al()
+        ham = yf.download(tickers, interval=interval, auto_adjust=auto_adjust, group_by="ticker",
+                          threads=True, progress=False, ignore_tz=False, **kw)
+        if ham is None or ham.empty:
+            return {}
+        sonuc = {}
+        for t in tickers:
+            try:
+                sonuc[t] = ham[t] if isinstance(ham.columns, pd.MultiIndex) else ham
+            except KeyError:
+                continue
+        return sonuc
+
+
+class StooqSaglayici(VeriSaglayici):
+    """Sadece günlük veri; BIST hisselerini kapsamaz."""
+    ad = "stooq"
+
+    @staticmethod
+    def sembol(ticker: str) -> Optional[str]:
+        if ticker in STOOQ_SEMBOLLER:
+            return STOOQ_SEMBOLLER[ticker]
+        # Stooq adları küçük harf ("dxy", "xauusd"); Yahoo biçimlileri (THYAO.IS, GC=F, ^VIX) karşılıksız
+        return ticker if ticker.islower() and ticker.replace(".", "").isalnum() else None
+
+    def _gecmis(self, ticker, interval, auto_adjust, period, start, kapsam):
+        sembol = self.sembol(ticker)
+        if interval != "1d" or sembol is None:
+            return None
+        r = http_istemci.get(f"https://stooq.com/q/d/l/?s={sembol}&i=d", timeout=10,
+                             headers={"User-Agent": "Mozilla/5.0"})
+        if r.status_code != 200 or "Date" not in r.text:
+            return None
+        df = pd.read_csv(StringIO(r.text), index_col="Date", parse_dates=True).sort_index()
+        bas = start if start is not None else kapsam
+        if bas is not None:
+            df = df[df.index >= bas.tz_convert(None).normalize()]
+        return df
+
+
+class YerelSaglayici(VeriSaglayici):
+    ad = "yerel"
+
+    def __init__(self, dizin: Path = YEREL_DIZIN):
+        super().__init__()
+        self.dizin = Path(dizin)
+
+    def _dosya(self, ticker: str, interval: str) -> Optional[Path]:
+        ad = ticker if interval == "1d" else f"{ticker}__{interval}"
+        for uzanti in (".parquet", ".csv"):
+            yol = self.dizin / f"{ad}{uzanti}"
+            if yol.exists():
+                return yol
+        return None
+
+    def _gecmis(self, ticker, interval, auto_adjust, period, start, kapsam):
+        if auto_adjust != YEREL_DUZELTILMIS:
+            return None
+        yol = self._dosya(ticker, interval)
+        if yol is None:
+            return None
+        if yol.suffix == ".parquet":
+            df = pd.read_parquet(yol)     # pyarrow/fastparquet gerektirir; yoksa istisna → iska
+        else:
+            df = pd.read_csv(yol, index_col=0, parse_dates=True)
+        if df.empty:
+            return None
+        df.index = pd.DatetimeIndex(df.index)
+        if df.index.tz is None:
+            df = df.tz_localize(YEREL_TZ)
+        df = df.sort_index()
+
+        # Kapsam kontrolü — eksik başlangıç ya da bayat son bar → uzak sağlayıcıya düş
+        simdi = pd.Timestamp.now(tz="UTC")
+        bas = start if start is not None else kapsam
+        if bas is not None and df.index[0] > bas + pd.Timedelta(days=YEREL_BAS_TOLERANS_GUN):
+            return None
+        maks = YEREL_MAKS_GECIKME_GUN.get(interval, YEREL_GUN_ICI_GECIKME)
+        if (simdi - df.index[-1]).days > maks:
+            return None
+        return df[df.index >= start] if start is not None else df
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# ZİNCİR
+# ════════════════════════════════════════════════════════════════════════════
+
+_TUMU = {"yerel": YerelSaglayici, "yahoo": YahooSaglayici, "stooq": StooqSaglayici}
+
+def _zincir_olustur() -> list:
+    zincir = []
+    for ad in os.getenv("BIST_VERI_SAGLAYICILAR", "yerel,yahoo,stooq").split(","):
+        ad = ad.strip()
+        if ad == "yerel" and not YEREL_DIZIN.is_dir():
+            continue
+        if ad in _TUMU:
+            zincir.append(_TUMU[ad]())
+    return zincir
+
+ZINCIR = _zincir_olustur()
+
+def saglayici(ad: str) -> Optional[VeriSaglayici]:
+    return next((s for s in ZINCIR if s.ad == ad), None)
+
+def gecmis_getir(ticker: str, interval: str = "1d", auto_adjust: bool = True, period: str = "",
+                 start: Optional[pd.Timestamp] = None,
+                 kapsam: Optional[pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+    """Zincirdeki ilk veri veren sağlayıcının sonucu."""
+    for s in ZINCIR:
+        df = s.gecmis(ticker, interval, auto_adjust, period, start, kapsam)
+        if df is not None:
+            return df
+    return None
+
+def toplu_getir(tickers: list, interval: str = "1d", auto_adjust: bool = True, period: str = "",
+                start: Optional[pd.Timestamp] = None, kapsam: Optional[pd.Timestamp] = None) -> dict:
+    """Her sağlayıcı bir öncekinin veremediği ticker'ları dener."""
+    sonuc, kalan = {}, list(tickers)
+    for s in ZINCIR:
+        if not kalan:
+            break
+        sonuc.update(s.toplu(kalan, interval, auto_adjust, period, start, kapsam))
+        kalan = [t for t in kalan if t not in sonuc]
+    return sonuc
+
+def gecikme_raporu() -> str:
+    """Sağlayıcı başına çağrı gecikmesi histogramı + isabet/ıska sayıları."""
+    etiketler = [f"<{k}ms" for k in GECIKME_KOVALARI] + [f"≥{GECIKME_KOVALARI[-1]}ms"]
+    satirlar = []
+    for s in ZINCIR:
+        toplam = sum(s.histogram)
+        if not toplam:
+            continue
+        dagilim = " ".join(f"{e}:{n}" for e, n in zip(etiketler, s.histogram) if n)
+        satirlar.append(f"  {s.ad:<6} {toplam:>4} çağrı | veri {s.isabet} / yok {s.iska} | {dagilim}")
+    return "\n".join(satirlar) or "  (sağlayıcı çağrısı yok)"